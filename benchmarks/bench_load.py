@@ -0,0 +1,73 @@
+"""
+Benchmark: cold vs warm load_tasks().
+
+- Writes a tasks file with 1k, 10k, 100k and 1M tasks in a temporary folder.
+- Cold: parse the JSON file (cache disabled, like --no-cache).
+- Warm: reuse the parsed-state cache written by save_tasks().
+- Each run is load_tasks() plus building the indexes (what a command needs
+  before its first lookup); prints milliseconds (best of a few runs).
+
+Run from the project root:
+
+    python benchmarks/bench_load.py
+"""
+
+import os
+import tempfile
+import time
+
+import task_tracker_cli.cli as app
+
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REPEAT = 3
+
+
+def make_data(count: int) -> dict:
+    """Build a {"last_id", "tasks"} structure with 'count' tasks."""
+    date = 1735689600  # 01/01/2025 00:00:00 UTC
+    statuses = ["todo", "in-progress", "done"]
+    tasks = [
+        {
+            "id": task_id,
+            "description": f"Task number {task_id}",
+            "status": statuses[task_id % 3],
+            "createdAt": date,
+            "updatedAt": date,
+        }
+        for task_id in range(1, count + 1)
+    ]
+    return {"last_id": count, "tasks": tasks}
+
+
+def best_load_ms(use_cache: bool) -> float:
+    """Return the best time of REPEAT loads (with indexes), in milliseconds."""
+    app.USE_CACHE = use_cache
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        data = app.load_tasks()
+        app.count_tasks_by_status(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    print(f"{'tasks':>10} | {'cold (ms)':>10} | {'warm (ms)':>10} | {'speedup':>8}")
+    print("-" * 48)
+
+    with tempfile.TemporaryDirectory() as folder:
+        app.TASKS_FILE = os.path.join(folder, "tasks.json")
+
+        for size in SIZES:
+            # save_tasks() writes the file and the cache
+            app.USE_CACHE = True
+            app.save_tasks(make_data(size))
+
+            cold = best_load_ms(use_cache=False)
+            warm = best_load_ms(use_cache=True)
+            print(f"{size:>10} | {cold:>10.1f} | {warm:>10.1f} | {cold / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
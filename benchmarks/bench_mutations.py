@@ -0,0 +1,82 @@
+"""
+Benchmark: cost of the mutation functions as the number of tasks grows.
+
+- Builds an in-memory dataset of 1k, 10k, 100k and 1M tasks.
+- Times update_task, set_task_status, delete_task and add_task on random ids.
+- Prints microseconds per call; with the id index the numbers should stay flat.
+
+Run from the project root:
+
+    python benchmarks/bench_mutations.py
+"""
+
+import gc
+import random
+import time
+
+import task_tracker_cli.cli as app
+
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS = 1_000
+
+
+def make_data(count: int) -> dict:
+    """Build a {"last_id", "tasks"} structure with 'count' todo tasks."""
+    date = 1735689600  # 01/01/2025 00:00:00 UTC
+    tasks = [
+        {
+            "id": task_id,
+            "description": f"Task {task_id}",
+            "status": "todo",
+            "createdAt": date,
+            "updatedAt": date,
+        }
+        for task_id in range(1, count + 1)
+    ]
+    return {"last_id": count, "tasks": tasks}
+
+
+def time_per_call(func, arguments: list) -> float:
+    """Call func(*args) for each args tuple and return microseconds per call."""
+    start = time.perf_counter()
+    for args in arguments:
+        func(*args)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(arguments) * 1_000_000
+
+
+def main() -> None:
+    rng = random.Random(42)
+
+    print(f"{'tasks':>10} | {'update':>8} | {'status':>8} | {'delete':>8} | {'add':>8}")
+    print("-" * 56)
+
+    for size in SIZES:
+        data = make_data(size)
+        # First lookup builds the index (same cost as a load, not measured)
+        app.update_task(data, 1, "warm up")
+        # Collect now so the GC pass over the new dataset is not timed below
+        gc.collect()
+
+        ids = rng.sample(range(1, size + 1), OPERATIONS)
+
+        update_us = time_per_call(
+            app.update_task, [(data, task_id, "New description") for task_id in ids]
+        )
+        status_us = time_per_call(
+            app.set_task_status, [(data, task_id, "done") for task_id in ids]
+        )
+        delete_us = time_per_call(app.delete_task, [(data, task_id) for task_id in ids])
+        add_us = time_per_call(app.add_task, [(data, "New task")] * OPERATIONS)
+
+        print(
+            f"{size:>10} | {update_us:>8.2f} | {status_us:>8.2f} | "
+            f"{delete_us:>8.2f} | {add_us:>8.2f}"
+        )
+
+    print("\n(microseconds per call)")
+
+
+if __name__ == "__main__":
+    main()
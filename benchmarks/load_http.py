@@ -0,0 +1,184 @@
+"""
+Load test: many clients using 'task-cli http' at once over keep-alive
+connections on localhost.
+
+- Starts 'task-cli http --port 0' on a temporary tasks file (or uses a
+  running server with --url).
+- Each client thread keeps one connection open and sends a mix of reads
+  (GET /tasks?limit=20, GET /tasks/ID) and writes (POST /tasks,
+  PATCH /tasks/ID).
+- Prints throughput, latency percentiles per kind of request and, for the
+  server it started, how many saves the writes cost (the file version).
+
+Run from the project root:
+
+    python benchmarks/load_http.py
+    python benchmarks/load_http.py --clients 16 --requests 2000 --writes 0.5
+    python benchmarks/load_http.py --tasks 100000 --storage journal
+    python benchmarks/load_http.py --url http://127.0.0.1:8080
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import task_tracker_cli
+from task_tracker_cli import reader
+
+
+def start_server(directory: str, args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """Start 'task-cli http' on a free port in 'directory'; return (process, url)."""
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(task_tracker_cli.__file__)))
+    env = dict(os.environ, PYTHONPATH=package_root, TASK_CLI_STORAGE=args.storage)
+    command = [sys.executable, "-m", "task_tracker_cli.cli"]
+    if args.tasks:
+        subprocess.run(
+            [*command, "gen-fixture", "--count", str(args.tasks)],
+            cwd=directory,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    server = subprocess.Popen(
+        [*command, "http", "--port", "0", "--workers", str(args.workers)],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # "Serving tasks.json on http://127.0.0.1:PORT (Ctrl+C to stop)"
+    line = server.stdout.readline()
+    if " on http://" not in line:
+        server.kill()
+        raise SystemExit(f"the server did not start: {line.strip()}")
+    return server, line.split(" on ", 1)[1].split()[0]
+
+
+def client(url: str, requests: int, write_ratio: float, seed: int, results: list) -> None:
+    """Send 'requests' requests over one keep-alive connection; append (kind, seconds, ok)."""
+    rng = random.Random(seed)
+    address = urlsplit(url)
+    connection = http.client.HTTPConnection(address.hostname, address.port, timeout=60)
+    known_ids = [1]
+    timings = []
+
+    for number in range(requests):
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                kind, method, path = "add", "POST", "/tasks"
+                body = {"description": f"load {seed}-{number}"}
+            else:
+                kind, method = "update", "PATCH"
+                path = f"/tasks/{rng.choice(known_ids)}"
+                body = {"status": rng.choice(["todo", "in-progress", "done"])}
+        else:
+            body = None
+            if rng.random() < 0.5:
+                kind, method, path = "list", "GET", f"/tasks?offset={rng.randint(0, 100)}&limit=20"
+            else:
+                kind, method, path = "get", "GET", f"/tasks/{rng.choice(known_ids)}"
+
+        # bytes: http.client then sends headers and body in one packet
+        content = None if body is None else json.dumps(body).encode("utf-8")
+        headers = {} if body is None else {"Content-Type": "application/json"}
+        started = time.perf_counter()
+        connection.request(method, path, body=content, headers=headers)
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        elapsed = time.perf_counter() - started
+
+        # 404 for a task deleted elsewhere is a valid answer, not a failure
+        ok = response.status in (200, 201, 404)
+        if kind == "add" and response.status == 201:
+            known_ids.append(payload["id"])
+        timings.append((kind, elapsed, ok))
+
+    connection.close()
+    results.extend(timings)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None, help="Use a running server instead of starting one")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent connections")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per client")
+    parser.add_argument("--writes", type=float, default=0.2, help="Share of writes (0-1)")
+    parser.add_argument("--workers", type=int, default=8, help="Server threads (started server)")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks to start with (started server)")
+    parser.add_argument(
+        "--storage", default="json", choices=["json", "journal", "sqlite", "sharded"]
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        url = args.url
+        if url is None:
+            server, url = start_server(directory, args)
+        tasks_file = os.path.join(directory, "tasks.json")
+        version_before = (reader.read_header(tasks_file) or {}).get("version", 0)
+
+        print(
+            f"{args.clients} clients x {args.requests} requests, "
+            f"{args.writes:.0%} writes -> {url}"
+        )
+        results: list = []
+        threads = [
+            threading.Thread(
+                target=client,
+                args=(url, args.requests, args.writes, args.seed + number, results),
+            )
+            for number in range(args.clients)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if server is not None:
+            server.terminate()
+            server.wait()
+            version_after = (reader.read_header(tasks_file) or {}).get("version", 0)
+
+    # Report
+    failed = sum(1 for _, _, ok in results if not ok)
+    print(f"{len(results)} requests in {elapsed:.2f} s: {len(results) / elapsed:,.0f} req/s")
+    print(f"{'request':>8} | {'count':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    print("-" * 53)
+    for kind in ("list", "get", "add", "update"):
+        times = sorted(seconds * 1000 for name, seconds, _ in results if name == kind)
+        if times:
+            print(
+                f"{kind:>8} | {len(times):>7} | {statistics.median(times):>8.2f} | "
+                f"{percentile(times, 0.95):>8.2f} | {percentile(times, 0.99):>8.2f}"
+            )
+
+    writes = sum(1 for name, _, _ in results if name in ("add", "update"))
+    if server is not None and args.storage == "json":
+        # Every json save rewrites the file with the next version
+        saves = version_after - version_before
+        if saves:
+            print(f"{writes} writes cost {saves} saves ({writes / saves:.1f} writes per save)")
+    if failed:
+        print(f"[FAIL] {failed} requests failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark suite: every domain function, load/save and both table printers.
+
+- Datasets come from task_tracker_cli.fixtures (same seed -> same tasks).
+- Default sizes: 1k, 100k and 1M tasks (use --sizes to change them).
+- Writes a JSON report that can be compared with an older one:
+
+    python benchmarks/suite.py --output report.json
+    python benchmarks/suite.py --sizes 1000,100000 --compare report.json
+
+With --compare, every benchmark more than --threshold slower than in the old
+report is listed as a regression and the script exits with status 1.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import fixtures
+
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# Calls timed for the single-task functions (time is reported per call)
+OPERATIONS = 1_000
+
+SEED = 42
+
+
+def best_of(func, repeat: int = 3) -> float:
+    """Return the best wall time of 'repeat' calls to func(), in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_call(func, arguments: list) -> float:
+    """Call func(*args) for each args tuple; return seconds per call."""
+    gc.collect()
+    start = time.perf_counter()
+    for args in arguments:
+        func(*args)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def run_size(size: int, folder: str) -> dict[str, float]:
+    """Run every benchmark on a dataset of 'size' tasks; return {name: seconds}."""
+    results = {}
+    rng = random.Random(SEED)
+    app.TASKS_FILE = os.path.join(folder, f"tasks-{size}.json")
+
+    # --- persistence ---
+    data = fixtures.generate_data(size, SEED)
+    app.USE_CACHE = False
+    results["save_tasks"] = best_of(lambda: app.save_tasks(data), repeat=1)
+    results["load_tasks.cold"] = best_of(app.load_tasks)
+    app.USE_CACHE = True
+    app.save_tasks(data)
+    results["load_tasks.warm"] = best_of(app.load_tasks)
+
+    # --- read-only domain functions ---
+    data = app.load_tasks()
+    app.count_tasks_by_status(data)  # builds the indexes
+    for status in ["all", "todo", "in-progress", "done"]:
+        results[f"list_tasks_by_status.{status}"] = best_of(
+            lambda: app.list_tasks_by_status(data, status)
+        )
+    results["count_tasks_by_status"] = best_of(lambda: app.count_tasks_by_status(data))
+
+    # --- printers (output discarded) ---
+    tasks = app.list_tasks_by_status(data, "all")
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        results["print_tasks_table"] = best_of(
+            lambda: app.print_tasks_table(tasks, max_width=0, stream=devnull)
+        )
+        sample = rng.sample(tasks, min(OPERATIONS, len(tasks)))
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["print_task_table"] = per_call(
+                app.print_task_table, [(task,) for task in sample]
+            )
+
+    # --- mutations (per call, on random existing ids) ---
+    ids = [task["id"] for task in rng.sample(tasks, min(OPERATIONS, len(tasks)))]
+    results["update_task"] = per_call(
+        app.update_task, [(data, task_id, "Updated description") for task_id in ids]
+    )
+    results["set_task_status"] = per_call(
+        app.set_task_status, [(data, task_id, "in-progress") for task_id in ids]
+    )
+    results["delete_task"] = per_call(app.delete_task, [(data, task_id) for task_id in ids])
+    results["add_task"] = per_call(app.add_task, [(data, "New task")] * OPERATIONS)
+
+    return results
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Return a line per benchmark that got slower than 'threshold' (e.g. 0.2 = 20%)."""
+    old_results = {(r["size"], r["name"]): r["seconds"] for r in old["results"]}
+    regressions = []
+    for result in new["results"]:
+        before = old_results.get((result["size"], result["name"]))
+        if not before:
+            continue
+        ratio = result["seconds"] / before
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result['name']} @ {result['size']}: "
+                f"{before * 1000:.3f} ms -> {result['seconds'] * 1000:.3f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Task Tracker benchmark suite")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated dataset sizes (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Old JSON report to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown reported as a regression (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": SEED,
+        },
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            print(f"== {size} tasks ==", file=sys.stderr)
+            for name, seconds in run_size(size, folder).items():
+                report["results"].append({"name": name, "size": size, "seconds": seconds})
+                print(f"  {name:<32} {seconds * 1000:>12.3f} ms", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        regressions = compare(old, report, args.threshold)
+        if regressions:
+            print("\nRegressions:", file=sys.stderr)
+            for line in regressions:
+                print("  " + line, file=sys.stderr)
+            sys.exit(1)
+        print("\nNo regressions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cold storage for done tasks (task-cli archive).
+
+Archived tasks leave the tasks file and go to segment files in a directory
+next to it (TASKS_FILE + ".archive"):
+
+    manifest.json            list of segments with their task count and ids
+    segment-000001.jsonl.gz  gzip-compressed JSON lines, one task per line,
+    segment-000002.jsonl.gz  sorted by id
+
+Segments are immutable: every archive run appends a new one and never
+rewrites an old one. Only the manifest (a few bytes per segment) is
+replaced. Segments are read lazily, one task at a time, and only by the
+commands that ask for done tasks (list done / list all).
+"""
+
+import json
+import operator
+import os
+
+from task_tracker_cli import fileio
+
+ARCHIVE_SUFFIX = ".archive"
+MANIFEST_NAME = "manifest.json"
+
+
+def archive_path(tasks_file: str) -> str:
+    """Return the archive directory that belongs to 'tasks_file'."""
+    return tasks_file + ARCHIVE_SUFFIX
+
+
+def read_manifest(path: str) -> dict:
+    """Return the manifest of the archive at 'path' ({"segments": []} if there is none)."""
+    try:
+        with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"segments": []}
+
+
+def archived_count(path: str) -> int:
+    """Return the number of archived tasks (read from the manifest only)."""
+    return sum(segment["count"] for segment in read_manifest(path)["segments"])
+
+
+def write_segment(path: str, tasks: list[dict]) -> str:
+    """
+    Append a new segment with 'tasks' and register it in the manifest.
+    - The segment is complete on disk before the manifest points to it, so
+      readers never see a partial segment.
+    - Return the name of the new segment.
+    """
+    import gzip
+
+    os.makedirs(path, exist_ok=True)
+    manifest = read_manifest(path)
+    name = f"segment-{len(manifest['segments']) + 1:06d}.jsonl.gz"
+
+    tasks = sorted(tasks, key=operator.itemgetter("id"))
+    lines = "".join(
+        json.dumps(task, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for task in tasks
+    )
+    fileio.replace_file(os.path.join(path, name), gzip.compress(lines.encode("utf-8")))
+
+    manifest["segments"].append(
+        {
+            "file": name,
+            "count": len(tasks),
+            "first_id": tasks[0]["id"] if tasks else None,
+            "last_id": tasks[-1]["id"] if tasks else None,
+        }
+    )
+    fileio.replace_file(
+        os.path.join(path, MANIFEST_NAME),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+    return name
+
+
+def _iter_segment(path: str):
+    import gzip
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def iter_tasks(path: str):
+    """
+    Yield every archived task in id order, decompressing lazily.
+    - Segments can overlap in ids (a task may be done long after newer ones
+      were archived), so they are merged instead of read one after another.
+    """
+    import heapq
+
+    segments = [
+        _iter_segment(os.path.join(path, segment["file"]))
+        for segment in read_manifest(path)["segments"]
+        if segment["count"]
+    ]
+    return heapq.merge(*segments, key=operator.itemgetter("id"))
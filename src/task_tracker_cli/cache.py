@@ -0,0 +1,93 @@
+"""
+Parsed-state cache for the tasks JSON file.
+
+Decoding a big tasks.json is the slowest part of most commands. After the
+file is parsed (or written), its data and the in-memory indexes are dumped
+with marshal to a sidecar file (TASKS_FILE + ".cache"). The next load reuses
+them if the file still has the same mtime, size and content hash, skipping
+JSON decoding and index building entirely.
+"""
+
+import marshal
+import os
+
+try:
+    # The built-in blake2 module; hashlib would also load OpenSSL on every run
+    from _blake2 import blake2b
+except ImportError:
+    from hashlib import blake2b
+
+
+CACHE_SUFFIX = ".cache"
+
+# Bump when the layout of the cached tuple changes
+CACHE_FORMAT = 4
+
+
+def cache_path(tasks_file: str) -> str:
+    """Return the path of the cache that belongs to 'tasks_file'."""
+    return tasks_file + CACHE_SUFFIX
+
+
+def make_key(content: bytes, info: os.stat_result) -> tuple:
+    """Return the key that identifies one version of the tasks file."""
+    digest = blake2b(content, digest_size=16).hexdigest()
+    return (info.st_mtime_ns, info.st_size, digest)
+
+
+def load(path: str, key: tuple) -> tuple | None:
+    """
+    Return (data, positions, by_status, by_time) from the cache at 'path'.
+    - Return None if there is no cache, it is unreadable or its key differs.
+    """
+    try:
+        with open(path, "rb") as f:
+            # One read: marshal.load() on a file object reads in tiny pieces
+            cached = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if not isinstance(cached, tuple) or not cached or cached[0] != CACHE_FORMAT:
+        return None
+    _, cached_key, data, positions, by_status, by_time = cached
+    if cached_key != key:
+        return None
+    return data, positions, by_status, by_time
+
+
+def store(
+    path: str,
+    key: tuple,
+    data: dict,
+    positions: dict,
+    by_status: dict,
+    by_time: dict,
+) -> None:
+    """
+    Write the cache for the file version 'key'.
+    - by_status maps a status to its ids in increasing order.
+    - by_time maps a timestamp field to the (keys, ids, stale) of its index.
+    - Written to a temporary file first, so a reader never sees half a cache.
+    - Failing to write the cache is not an error: it is only an optimization.
+    """
+    # One temporary file per process: concurrent readers may refresh it at once
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(
+                marshal.dumps((CACHE_FORMAT, key, data, positions, by_status, by_time))
+            )
+        os.replace(temp_path, path)
+    except (OSError, ValueError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def remove(path: str) -> None:
+    """Delete the cache file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
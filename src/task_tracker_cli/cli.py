@@ -1,10 +1,26 @@
-import argparse
+# Annotations stay unevaluated, so argparse is only imported to parse the
+# command lines that the fast path (_fast_parse) does not recognize
+from __future__ import annotations
+
+import contextlib
+import io
+import itertools
 import json
+import operator
 import os
-from datetime import datetime
+import sys
+import threading
+import time
+import types
+
+# Everyday commands need these; archive, history, search and the heavier
+# standard modules are imported by the functions that use them
+from task_tracker_cli import cache, fileio, journal, locking, profiling, reader, timestamps
+from task_tracker_cli.locking import ConflictError
 
 
 # ===== CLI LAYER: command handlers / Interface =====
+@profiling.timed("print_task_table")
 def print_task_table(task: dict) -> None:
     """
     Print a table with a single task with columns:
@@ -15,8 +31,8 @@ def print_task_table(task: dict) -> None:
         str(task["id"]),
         task["description"],
         task["status"],
-        task["createdAt"],
-        task["updatedAt"],
+        timestamps.display(task["createdAt"]),
+        timestamps.display(task["updatedAt"]),
     ]
 
     # Compute column widths (max between header and value)
@@ -35,6 +51,7 @@ def print_task_table(task: dict) -> None:
     border = make_border()
     header_line = make_row(headers)
     row_line = make_row(row)
+    profiling.count("tasks", 1)
 
     print(border)
     print(header_line)
@@ -43,31 +60,70 @@ def print_task_table(task: dict) -> None:
     print(border)
 
 
-def print_tasks_table(tasks: list[dict]) -> None:
+# Rows rendered at a time by print_tasks_table (widths come from the first page)
+PAGE_SIZE = 1000
+
+# Space taken by the table borders and cell padding (5 columns)
+_TABLE_CHROME = 3 * 5 + 1
+
+
+def _fit(text: str, width: int) -> str:
+    """Cut 'text' to 'width' characters, marking the cut with '…'."""
+    if len(text) <= width:
+        return text
+    return text[: width - 1] + "…"
+
+
+@profiling.timed("print_tasks_table")
+def print_tasks_table(
+    tasks,
+    page_size: int = PAGE_SIZE,
+    max_width: int | None = None,
+    stream=None,
+) -> None:
     """
     Print a table with multiple tasks (one row per task).
+    - 'tasks' can be any iterable: rows are rendered and written one page at a
+      time, so the first rows show up right away and memory stays flat.
+    - Column widths come from the first page; longer descriptions in later
+      pages are truncated with '…' (ids, statuses and dates are never cut).
+    - max_width caps the width of the whole table by truncating descriptions.
+      None means the terminal width when writing to a terminal; 0 means no cap.
     """
+    stream = stream or sys.stdout
     headers = ["Id", "Description", "Status", "Created At", "Updated At"]
-
-    # 1) Convert all tasks into rows of strings
-    rows: list[list[str]] = []
-    for task in tasks:
-        row = [
-            str(task.get("id", "")),
-            str(task.get("description", "")),
-            str(task.get("status", "")),
-            str(task.get("createdAt", "")),
-            str(task.get("updatedAt", "")),
+    task_iter = iter(tasks)
+
+    def next_page() -> list[list[str]]:
+        # Convert the next page of tasks into rows of strings
+        return [
+            [
+                str(task.get("id", "")),
+                str(task.get("description", "")),
+                str(task.get("status", "")),
+                timestamps.display(task.get("createdAt", "")),
+                timestamps.display(task.get("updatedAt", "")),
+            ]
+            for task in itertools.islice(task_iter, page_size)
         ]
-        rows.append(row)
 
-    # 2) Compute widths per column considering all rows
+    # 1) Compute widths per column considering the first page
+    rows = next_page()
     widths = []
     for col_index in range(len(headers)):
         max_header = len(headers[col_index])
         max_cells = max(len(row[col_index]) for row in rows) if rows else 0
         widths.append(max(max_header, max_cells))
 
+    # 2) Shrink the description column if the table is too wide
+    if max_width is None and stream.isatty():
+        import shutil
+
+        max_width = shutil.get_terminal_size().columns
+    if max_width:
+        others = sum(widths) - widths[1] + _TABLE_CHROME
+        widths[1] = max(len(headers[1]), min(widths[1], max_width - others))
+
     def make_border() -> str:
         parts = ["+" + "-" * (w + 2) for w in widths]
         return "".join(parts) + "+"
@@ -75,197 +131,2220 @@ def print_tasks_table(tasks: list[dict]) -> None:
     def make_row(values: list[str]) -> str:
         cells = []
         for i, value in enumerate(values):
-            text = str(value)
+            text = _fit(value, widths[i]) if i == 1 else value
             cells.append("| " + text.ljust(widths[i]) + " ")
         return "".join(cells) + "|"
 
+    border = make_border()
+    lines = [border, make_row(headers), border]
+
+    # 3) Write page by page through one buffered stream
+    while rows:
+        profiling.count("tasks", len(rows))
+        lines.extend(make_row(row) for row in rows)
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+        lines = []
+        rows = next_page()
+
+    lines.append(border)
+    stream.write("\n".join(lines) + "\n")
+
+
+@profiling.timed("print_stats_table")
+def print_stats_table(counts: dict[str, int]) -> None:
+    """
+    Print a table with the number of tasks per status and the total.
+    """
+    rows = [[status, str(count)] for status, count in counts.items()]
+    rows.append(["total", str(sum(counts.values()))])
+    headers = ["Status", "Tasks"]
+
+    widths = [
+        max(len(headers[i]), max(len(row[i]) for row in rows))
+        for i in range(len(headers))
+    ]
+
+    def make_border() -> str:
+        parts = ["+" + "-" * (w + 2) for w in widths]
+        return "".join(parts) + "+"
+
+    def make_row(values: list[str]) -> str:
+        cells = []
+        for i, value in enumerate(values):
+            cells.append("| " + value.ljust(widths[i]) + " ")
+        return "".join(cells) + "|"
+
     border = make_border()
     print(border)
     print(make_row(headers))
     print(border)
+    for row in rows[:-1]:
+        print(make_row(row))
+    print(border)
+    print(make_row(rows[-1]))
+    print(border)
+
+
+@profiling.timed("print_summary_table")
+def print_summary_table(summary: dict[str, int]) -> None:
+    """
+    Print a table with the outcome of a bulk command, e.g.
+    {"marked done": 4990, "already done": 10, "not found": 2}.
+    """
+    rows = [[outcome, str(count)] for outcome, count in summary.items()]
+    headers = ["Result", "Tasks"]
 
-    # 3) Print all rows
+    widths = [
+        max(len(headers[i]), max((len(row[i]) for row in rows), default=0))
+        for i in range(len(headers))
+    ]
+
+    def make_border() -> str:
+        parts = ["+" + "-" * (w + 2) for w in widths]
+        return "".join(parts) + "+"
+
+    def make_row(values: list[str]) -> str:
+        cells = []
+        for i, value in enumerate(values):
+            cells.append("| " + value.ljust(widths[i]) + " ")
+        return "".join(cells) + "|"
+
+    border = make_border()
+    print(border)
+    print(make_row(headers))
+    print(border)
     for row in rows:
         print(make_row(row))
+    print(border)
+
+
+@profiling.timed("print_history_table")
+def print_history_table(events: list[dict], max_width: int | None = None) -> None:
+    """
+    Print the events of one task, oldest first, with columns:
+    Seq | Time | Change | Status | Description
+    - Status and description are the task after the change (before it, for
+      a delete).
+    """
+    headers = ["Seq", "Time", "Change", "Status", "Description"]
+    rows = []
+    for event in events:
+        task = event.get("task") or event.get("before") or {}
+        if "last" in event:
+            # Range event (import): no task fields, only the ids it covered
+            task = {"description": f"IDs {event['id']}-{event['last']}"}
+        change = "undo" if "undo" in event else event["op"]
+        rows.append(
+            [
+                str(event["seq"]),
+                timestamps.display(event["time"]),
+                change,
+                str(task.get("status", "")),
+                str(task.get("description", "")),
+            ]
+        )
+
+    widths = [
+        max(len(headers[i]), max((len(row[i]) for row in rows), default=0))
+        for i in range(len(headers))
+    ]
+    if max_width is None and sys.stdout.isatty():
+        import shutil
+
+        max_width = shutil.get_terminal_size().columns
+    if max_width:
+        others = sum(widths) - widths[4] + _TABLE_CHROME
+        widths[4] = max(len(headers[4]), min(widths[4], max_width - others))
 
+    def make_border() -> str:
+        parts = ["+" + "-" * (w + 2) for w in widths]
+        return "".join(parts) + "+"
+
+    def make_row(values: list[str]) -> str:
+        cells = []
+        for i, value in enumerate(values):
+            text = _fit(value, widths[i]) if i == 4 else value
+            cells.append("| " + text.ljust(widths[i]) + " ")
+        return "".join(cells) + "|"
+
+    border = make_border()
+    print(border)
+    print(make_row(headers))
     print(border)
+    for row in rows:
+        print(make_row(row))
+    print(border)
+
+
+# Output formats of list and the single-task commands; all but "table" are
+# written record by record through _TASK_WRITERS
+OUTPUT_FORMATS = ["table", "json", "ndjson", "csv", "ids"]
+
+# Tasks serialized at a time by the record writers below
+WRITE_CHUNK = 1000
+
+# Write buffer of _open_output() (bytes)
+OUTPUT_BUFFER = 1 << 16
+
+# Columns of the csv format (import reads the same header)
+CSV_FIELDS = ["id", "description", "status", "createdAt", "updatedAt"]
+
+
+def _open_output(path: str):
+    """
+    Open 'path' for writing text in large buffered blocks (a context manager).
+    - '-' means stdout: flushed first and left open when done. If stdout is
+      not a real file (the daemon captures it), it is written to directly.
+    """
+    if path != "-":
+        return open(path, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER)
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return contextlib.nullcontext(sys.stdout)
+    sys.stdout.flush()
+    return open(
+        fileno, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER, closefd=False
+    )
+
+
+def _silence_stdout() -> None:
+    """After a BrokenPipeError (e.g. '| head'): send what is left of stdout to devnull."""
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def _chunks(tasks):
+    """Yield the tasks of an iterable as lists of at most WRITE_CHUNK."""
+    tasks = iter(tasks)
+    return iter(lambda: list(itertools.islice(tasks, WRITE_CHUNK)), [])
+
+
+def _write_ndjson(out, tasks) -> int:
+    """Write the tasks as one JSON object per line; return how many."""
+    encode = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode
+    count = 0
+    for chunk in _chunks(tasks):
+        out.write("\n".join(map(encode, chunk)) + "\n")
+        count += len(chunk)
+    return count
+
+
+def _write_json(out, tasks) -> int:
+    """Write the tasks as one JSON array (one task per line); return how many."""
+    encode = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode
+    count = 0
+    for chunk in _chunks(tasks):
+        out.write(("[\n" if not count else ",\n") + ",\n".join(map(encode, chunk)))
+        count += len(chunk)
+    out.write("\n]\n" if count else "[]\n")
+    return count
+
+
+def _write_csv(out, tasks) -> int:
+    """Write a CSV_FIELDS header, then one row per task; return how many."""
+    import csv
+
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(CSV_FIELDS)
+    from_task = operator.attrgetter(*CSV_FIELDS)
+    from_dict = operator.itemgetter(*CSV_FIELDS)
+    count = 0
+    for chunk in _chunks(tasks):
+        writer.writerows(
+            [from_task(task) if type(task) is Task else from_dict(task) for task in chunk]
+        )
+        count += len(chunk)
+    return count
+
+
+def _write_ids(out, tasks) -> int:
+    """Write only the id of each task, one per line; return how many."""
+    count = 0
+    for chunk in _chunks(tasks):
+        out.write(
+            "\n".join(
+                [str(task.id if type(task) is Task else task["id"]) for task in chunk]
+            )
+            + "\n"
+        )
+        count += len(chunk)
+    return count
+
+
+# Output format -> writer(out, tasks) -> number of tasks written
+_TASK_WRITERS = {
+    "json": _write_json,
+    "ndjson": _write_ndjson,
+    "csv": _write_csv,
+    "ids": _write_ids,
+}
+
+
+def print_tasks_as(tasks, output_format: str) -> None:
+    """
+    Write tasks to stdout in a machine-readable OUTPUT_FORMATS format, as
+    they come and without any table layout (no widths, padding or dates).
+    """
+    try:
+        with _open_output("-") as out:
+            _TASK_WRITERS[output_format](out, tasks)
+    except BrokenPipeError:
+        # The reader stopped early: not an error
+        _silence_stdout()
+
+
+def print_summary_as(result: dict, output_format: str) -> None:
+    """
+    Write the result of a bulk delete / mark-* in a machine-readable format.
+    - "ids": the ids of the tasks that changed, one per line.
+    - "csv": a header with the summary keys, then one row with the counts.
+    - "json" and "ndjson": the summary as one JSON object.
+    """
+    try:
+        with _open_output("-") as out:
+            if output_format == "ids":
+                out.writelines(f"{task_id}\n" for task_id in result["ids"])
+            elif output_format == "csv":
+                import csv
+
+                writer = csv.writer(out, lineterminator="\n")
+                writer.writerow(result["summary"])
+                writer.writerow(result["summary"].values())
+            else:
+                out.write(json.dumps(result["summary"]) + "\n")
+    except BrokenPipeError:
+        _silence_stdout()
+
+
+# Commands that accept several ids, ranges and filters
+BULK_COMMANDS = {"delete", "mark-in-progress", "mark-done"}
+
+
+def _is_bulk(args: argparse.Namespace) -> bool:
+    """True unless the command names exactly one id and no filter (classic form)."""
+    if args.status is not None or args.before is not None or len(args.ids) != 1:
+        return True
+    first, last = args.ids[0]
+    return first != last
+
+
+def execute_bulk_command(data: dict, args: argparse.Namespace) -> dict:
+    """
+    Apply delete / mark-* to every task selected by ids, ranges and filters.
+    - The tasks are resolved in one pass (select_task_ids) and changed in
+      memory; the caller saves once.
+    - Return {"ok": True, "ids": [...changed ids], "summary": {...}}.
+    """
+    if not args.ids and args.status is None and args.before is None:
+        return {"ok": False, "error": "give at least one id, range or filter."}
+
+    # 1) Resolve the selection in a single pass
+    ids = select_task_ids(data, args.ids, args.status, args.before)
+
+    # 2) Ids named one by one (not ranges) that do not exist are reported
+    found = set(ids)
+    missing = sum(
+        1
+        for first, last in args.ids
+        if first == last
+        and first not in found
+        and _task_status(data, first) is None
+    )
+
+    # 3) Apply the change to every selected task
+    changed = []
+    unchanged = 0
+    if args.command == "delete":
+        for task_id in ids:
+            delete_task(data, task_id)
+        changed = ids
+        summary = {"deleted": len(changed)}
+    else:
+        new_status = "done" if args.command == "mark-done" else "in-progress"
+        for task_id in ids:
+            if _task_status(data, task_id) == new_status:
+                unchanged += 1
+            else:
+                set_task_status(data, task_id, new_status)
+                changed.append(task_id)
+        summary = {f"marked {new_status}": len(changed), f"already {new_status}": unchanged}
+
+    summary["not found"] = missing
+    return {"ok": True, "ids": changed, "summary": summary}
+
+
+def execute_command(data: dict, args: argparse.Namespace) -> dict:
+    """
+    Apply one parsed command to 'data' in memory (nothing is saved here).
+    Return a result dict describing the outcome:
+    - {"ok": True, "task": {...}} for add, update, delete and mark-*
+    - {"ok": True, "ids": [...], "summary": {...}} for delete and mark-* on
+      several ids, ranges or filters
+    - {"ok": True, "tasks": [...]} for list
+    - {"ok": True, "counts": {...}} for stats
+    - {"ok": True, "undone": {...} or None} for undo
+    - {"ok": False, "error": "..."} if the command could not be applied
+    """
+    command = args.command
+
+    if command in BULK_COMMANDS:
+        if _is_bulk(args):
+            return execute_bulk_command(data, args)
+        task_id = args.ids[0][0]
+    elif command == "update":
+        task_id = args.id
+
+    # 0) Validate that the description is not empty (or only spaces)
+    if command in ("add", "update"):
+        description = args.description.strip()
+        if not description:
+            return {"ok": False, "error": "task description cannot be empty."}
+
+    # 1) Call the domain layer
+    if command == "add":
+        task = add_task(data, description)
+    elif command == "update":
+        task = update_task(data, task_id, description)
+    elif command == "delete":
+        task = delete_task(data, task_id)
+    elif command == "mark-in-progress":
+        task = set_task_status(data, task_id, "in-progress")
+    elif command == "mark-done":
+        task = set_task_status(data, task_id, "done")
+    elif command == "list":
+        if args.as_of is not None:
+            if args.sort or args.since is not None or args.until is not None:
+                return {
+                    "ok": False,
+                    "error": "--as-of cannot be combined with --sort, --since or --until.",
+                }
+            tasks = list_tasks_as_of(args.as_of, args.status, args.offset, args.limit)
+            if tasks is None:
+                return {"ok": False, "error": "there is no history that far back."}
+        elif args.sort or args.since is not None or args.until is not None:
+            tasks = list_tasks_by_time(
+                data,
+                args.status,
+                _SORT_FIELDS[args.sort or "updated"],
+                args.since,
+                args.until,
+                args.offset,
+                args.limit,
+            )
+        else:
+            tasks = list_tasks_by_status(data, args.status, args.offset, args.limit)
+        return {"ok": True, "tasks": tasks}
+    elif command == "stats":
+        return {"ok": True, "counts": _add_archived_counts(count_tasks_by_status(data))}
+    elif command == "undo":
+        # The reverted events must be the whole save (see undo_last_change())
+        if data.get("_changes") or "_undoes" in data:
+            return {"ok": False, "error": "undo cannot follow other changes in one save."}
+        try:
+            undone = undo_last_change(data)
+        except ValueError as error:
+            return {"ok": False, "error": f"{error}."}
+        return {"ok": True, "undone": undone}
+    else:
+        return {"ok": False, "error": f"command '{command}' cannot be used here."}
+
+    # 2) Single-task commands: None means the id does not exist
+    if task is None:
+        return {"ok": False, "error": f"task with ID {task_id} not found."}
+    return {"ok": True, "task": task}
+
+
+# Commands run_command() applies without changing anything
+READ_COMMANDS = {"list", "stats"}
+
+
+def run_command(args: argparse.Namespace, load=None) -> dict:
+    """
+    Load the tasks, apply one command and save only if something changed.
+    - Optimistic: the command runs without holding the lock. If another
+      process saved in the meantime, save_tasks() raises ConflictError and
+      the command runs again on fresh data. The last attempt holds the
+      exclusive lock from load to save, so it cannot conflict.
+    - In "sqlite" and "sharded" modes a command that writes holds the lock
+      from the start (see _store_writes_locked()).
+    - load: returns the data to work on (default: load_tasks()).
+    """
+    # Data from another loader belongs to the caller: only close our own
+    owned = load is None
+    load = load or load_tasks
+    locked = _store_writes_locked() and args.command not in READ_COMMANDS
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        final = attempt == SAVE_ATTEMPTS or locked
+        with _tasks_lock(exclusive=True) if final else contextlib.nullcontext():
+            # 1) Load current tasks state from JSON
+            data = load()
+            try:
+                # 2) Apply the command in memory
+                result = execute_command(data, args)
+
+                # 3) Save changes to disk (read-only and failed commands change nothing)
+                if data["_changes"]:
+                    try:
+                        save_tasks(data)
+                    except ConflictError:
+                        continue
+                return result
+            finally:
+                if owned:
+                    close_tasks(data)
+
+
+def render_result(args: argparse.Namespace, result: dict) -> None:
+    """
+    Print the result of execute_command() for a human.
+    """
+    output_format = getattr(args, "format", "table")
+    if not result["ok"]:
+        print(f"Error: {result['error']}")
+    elif "summary" in result:
+        # Bulk delete / mark-*: one summary instead of a table per task
+        if output_format == "table":
+            print_summary_table(result["summary"])
+        else:
+            print_summary_as(result, output_format)
+    elif output_format != "table":
+        # Machine-readable: the task(s) only, no messages around them
+        tasks = result["tasks"] if args.command == "list" else [result["task"]]
+        if args.command != "list" and output_format == "json":
+            # A single task is an object, not a list of one
+            output_format = "ndjson"
+        print_tasks_as(tasks, output_format)
+    elif args.command == "delete":
+        # Show the deleted task (even though it is no longer in the file)
+        print("Task deleted:")
+        print_task_table(result["task"])
+    elif args.command == "list":
+        # If there are no tasks, inform the user
+        if not result["tasks"]:
+            if args.as_of is not None:
+                print("There were no tasks at that time.")
+            elif args.since is not None or args.until is not None:
+                print("There are no tasks in that time range.")
+            elif args.status == "all":
+                print("There are no tasks yet.")
+            else:
+                print(f"There are no tasks with status '{args.status}'.")
+            return
+        # Print all tasks in a single table
+        print_tasks_table(result["tasks"], args.page_size, args.max_width)
+    elif args.command == "stats":
+        print_stats_table(result["counts"])
+    elif args.command == "undo":
+        undone = result["undone"]
+        if undone is None:
+            print("Nothing to undo.")
+        else:
+            print(f"Undid the last change (tasks affected: {undone['changes']}).")
+    else:
+        print_task_table(result["task"])
 
 
 def cmd_add(args: argparse.Namespace):
     """Handler for: task-cli add DESCRIPTION"""
+    render_result(args, run_command(args))
 
-    # 0) Validate that the description is not empty (or only spaces)
-    description = args.description.strip()
-    if not description:
-        print("Error: task description cannot be empty.")
+
+def cmd_update(args: argparse.Namespace):
+    """Handler for: task-cli update ID DESCRIPTION"""
+    render_result(args, run_command(args))
+
+
+def cmd_delete(args: argparse.Namespace):
+    """Handler for: task-cli delete ID... [--status S] [--before DATE]"""
+    render_result(args, run_command(args))
+
+
+def cmd_mark_in_progress(args: argparse.Namespace):
+    """Handler for: task-cli mark-in-progress ID... [--status S] [--before DATE]"""
+    render_result(args, run_command(args))
+
+
+def cmd_mark_done(args: argparse.Namespace):
+    """Handler for: task-cli mark-done ID... [--status S] [--before DATE]"""
+    render_result(args, run_command(args))
+
+
+def cmd_list(args: argparse.Namespace):
+    """Handler for: task-cli list [status]"""
+
+    # 1) Read-only command: stream the matching tasks from the file if possible
+    #    (time ranges and time order need the time index instead)
+    tasks = None
+    if args.as_of is not None:
+        # Past states come from the history, not from the tasks file
+        with _tasks_lock():
+            result = execute_command({}, args)
+        render_result(args, result)
+        return
+    if not args.sort and args.since is None and args.until is None:
+        tasks = stream_tasks_by_status(args.status, args.offset, args.limit)
+    if tasks is None:
+        # Otherwise load everything as usual
+        render_result(args, run_command(args))
         return
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
+    # 2) Peek at the first task to know if there is anything to print
+    try:
+        first = next(tasks, None)
+        if first is None:
+            render_result(args, {"ok": True, "tasks": []})
+        else:
+            render_result(args, {"ok": True, "tasks": itertools.chain([first], tasks)})
+    except ValueError as error:
+        print(f"Error: cannot read {TASKS_FILE}: {error}.")
 
-    # 2) Add the new task to that in-memory structure
-    new_task = add_task(data, description)
 
-    # 3) Save the updated data to disk
-    save_tasks(data)
+def cmd_stats(args: argparse.Namespace):
+    """Handler for: task-cli stats"""
 
-    # 4) Print a table with the created task
-    print_task_table(new_task)
+    # 1) Try the counters stored on disk (no task is decoded)
+    counts = read_task_counts()
 
+    # 2) Old files without counters: load the tasks and count them
+    if counts is None:
+        data = load_tasks()
+        try:
+            counts = count_tasks_by_status(data)
+        finally:
+            close_tasks(data)
 
-def cmd_update(args: argparse.Namespace):
-    """Handler for: task-cli update ID DESCRIPTION"""
+    # 3) Archived tasks are counted from the archive manifest
+    counts = _add_archived_counts(counts)
+
+    # 4) Print the counters
+    render_result(args, {"ok": True, "counts": counts})
+
+
+def cmd_history(args: argparse.Namespace):
+    """Handler for: task-cli history ID"""
+
+    # 1) Read the events of that task only (through the history index)
+    with _tasks_lock():
+        events = task_history(args.id)
 
-    # 0) Validate that the new description is not empty (or only spaces)
-    new_description = args.description.strip()
-    if not new_description:
-        print("Error: task description cannot be empty.")
+    # 2) Print them, oldest first
+    if not events:
+        print(f"There is no history for task {args.id}.")
         return
+    print_history_table(events, args.max_width)
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
 
-    # 2) Try to update the task in the domain layer
-    updated_task = update_task(data, args.id, new_description)
+def cmd_undo(args: argparse.Namespace):
+    """Handler for: task-cli undo"""
+    render_result(args, run_command(args))
 
-    if updated_task is None:
-        # No task found with that id
-        print(f"Error: task with ID {args.id} not found.")
+
+def cmd_search(args: argparse.Namespace):
+    """Handler for: task-cli search QUERY..."""
+
+    # 1) Answered from the search index (built on first use)
+    tasks = search_tasks(args.query, args.status, args.limit)
+
+    # 2) Print the matches like 'list' does
+    if not tasks:
+        print("No tasks match the search.")
         return
+    print_tasks_table(tasks, max_width=args.max_width)
 
-    # 3) Save changes to disk
-    save_tasks(data)
 
-    # 4) Print the updated task
-    print_task_table(updated_task)
+def cmd_archive(args: argparse.Namespace):
+    """Handler for: task-cli archive [--older-than DAYS]"""
+    from task_tracker_cli import archive
 
+    if STORAGE in STORE_MODES:
+        print("Error: archive only works with the JSON storage.")
+        return
 
-def cmd_delete(args: argparse.Namespace):
-    """Handler for: task-cli delete ID"""
+    # The segment and the tasks file must not change under us: hold the lock
+    with _tasks_lock(exclusive=True):
+        # 1) Load the active tasks
+        data = load_tasks()
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
+        # 2) Move the done tasks to a new archive segment
+        older_than = None
+        if args.older_than is not None:
+            older_than = timestamps.now() - args.older_than * 24 * 3600
+        archived = archive_tasks(data, older_than)
+        if not archived:
+            print("There are no done tasks to archive.")
+            return
 
-    # 2) Try to delete the task in the domain layer
-    deleted_task = delete_task(data, args.id)
+        # 3) Save the (now smaller) tasks file
+        save_tasks(data)
+    print(f"Archived {len(archived)} done tasks to {archive.archive_path(TASKS_FILE)}.")
 
-    if deleted_task is None:
-        # No task found with that id
-        print(f"Error: task with ID {args.id} not found.")
+
+def parse_batch_line(parser: argparse.ArgumentParser, line: str) -> argparse.Namespace:
+    """
+    Parse one batch line with the regular parser.
+    - Raise ValueError with argparse's message instead of exiting.
+    - Help output is never written: stdout carries the JSON results.
+    """
+    import shlex
+
+    try:
+        tokens = shlex.split(line)
+    except ValueError as error:
+        raise ValueError(str(error)) from None
+
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+            args = parser.parse_args(tokens)
+    except SystemExit as error:
+        # -h/--help prints to stdout and exits with 0
+        if not error.code:
+            raise ValueError("--help is not available in batch mode.") from None
+        # Last line of argparse output is "prog: error: message"
+        lines = stderr.getvalue().strip().splitlines()
+        message = lines[-1].split("error: ", 1)[-1] if lines else "invalid command."
+        raise ValueError(message) from None
+
+    if args.command == "batch":
+        raise ValueError("batch commands cannot be nested.")
+    return args
+
+
+def cmd_batch(args: argparse.Namespace):
+    """Handler for: task-cli batch [FILE]"""
+
+    # 0) Open the source of commands ('-' means stdin)
+    if args.file == "-":
+        source = contextlib.nullcontext(sys.stdin)
+    else:
+        try:
+            source = open(args.file, "r", encoding="utf-8")
+        except OSError as error:
+            print(f"Error: cannot read '{args.file}': {error.strerror}.")
+            return
+
+    # 1) Load current tasks state once for the whole batch; the results are
+    #    printed as they come, so the batch cannot be retried: hold the lock
+    parser = build_parser()
+    with _tasks_lock(exclusive=True), source as f:
+        data = load_tasks()
+        try:
+            # 2) Apply every command in memory, reporting one JSON line per command
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                try:
+                    command_args = parse_batch_line(parser, line)
+                except ValueError as error:
+                    result = {"ok": False, "error": str(error)}
+                else:
+                    result = execute_command(data, command_args)
+
+                report = {"line": line_number, "command": line}
+                report.update(result)
+                print(json.dumps(report, ensure_ascii=False, default=_json_default))
+
+            # 3) Save once at the end
+            if data["_changes"]:
+                save_tasks(data)
+        finally:
+            close_tasks(data)
+
+
+# Records validated (and added) at a time by 'task-cli import'
+IMPORT_CHUNK = 10_000
+
+# Invalid import records listed one by one (the rest are only counted)
+IMPORT_ERRORS_SHOWN = 20
+
+
+def cmd_export(args: argparse.Namespace):
+    """Handler for: task-cli export [--format ndjson|csv] [--status S] [--output FILE]"""
+
+    # 0) Open the destination ('-' means stdout)
+    try:
+        output = _open_output(args.output)
+    except OSError as error:
+        print(f"Error: cannot write '{args.output}': {error.strerror}.")
+        return
+
+    # 1) Stream the tasks out; the shared lock keeps them from changing halfway
+    try:
+        with _tasks_lock(), output as out:
+            count = _TASK_WRITERS[args.format](out, iter_tasks_by_status(args.status))
+    except BrokenPipeError:
+        # The reader stopped early (e.g. '| head'): not an error
+        _silence_stdout()
+        return
+    except ValueError as error:
+        print(f"Error: cannot read {TASKS_FILE}: {error}.")
+        return
+
+    # 2) Summary (not on stdout, where it would end up among the tasks)
+    if args.output != "-":
+        print(f"Exported {count} tasks to {args.output}.")
+
+
+def _import_timestamp(record: dict, field: str, default: int) -> int:
+    value = record.get(field)
+    if value is None or value == "":
+        return default
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        with contextlib.suppress(ValueError):
+            return timestamps.parse(value)
+    raise ValueError(f"invalid {field} {value!r}")
+
+
+def _import_task(record, now: int) -> dict:
+    """
+    Return one import record as a task dict without id, or raise ValueError.
+    - description: required, not blank.
+    - status: one of the task statuses (default: todo).
+    - createdAt / updatedAt: stored timestamps or dates in the formats of
+      --since (default: now / createdAt).
+    - An id in the record is ignored: imported tasks always get new ids.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object")
+    description = record.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("description cannot be empty")
+    status = record.get("status") or "todo"
+    if status not in STATUSES:
+        raise ValueError(f"invalid status {status!r} (choose from {', '.join(STATUSES)})")
+    created = _import_timestamp(record, "createdAt", now)
+    return {
+        "description": description,
+        "status": status,
+        "createdAt": created,
+        "updatedAt": _import_timestamp(record, "updatedAt", created),
+    }
+
+
+def _csv_records(f):
+    """Yield (line number, row dict) from a CSV file with a header row."""
+    import csv
+
+    rows = csv.DictReader(f)
+    try:
+        if rows.fieldnames is None or "description" not in rows.fieldnames:
+            raise ValueError("the CSV header has no 'description' column")
+        for row in rows:
+            yield rows.line_num, row
+    except csv.Error as error:
+        raise ValueError(f"line {rows.line_num}: {error}") from None
+
+
+def _read_import_chunks(f, file_format: str, errors: list[str]):
+    """
+    Yield the records of an import file as lists of at most IMPORT_CHUNK
+    tasks (see _import_task()), so the file is never held in memory whole.
+    - ndjson: one JSON object per line (blank lines are skipped).
+    - csv: a header row names the columns (same as 'export --format csv').
+    - Invalid records are left out and described in 'errors' ("line N: ...").
+    """
+    now = timestamps.now()
+    records = _csv_records(f) if file_format == "csv" else enumerate(f, start=1)
+    chunk = []
+    for line_number, record in records:
+        try:
+            if type(record) is str:
+                # NDJSON line
+                if not record.strip():
+                    continue
+                try:
+                    record = json.loads(record)
+                except json.JSONDecodeError:
+                    raise ValueError("not valid JSON") from None
+            chunk.append(_import_task(record, now))
+        except ValueError as error:
+            errors.append(f"line {line_number}: {error}")
+            continue
+        if len(chunk) == IMPORT_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def cmd_import(args: argparse.Namespace):
+    """Handler for: task-cli import FILE [--format ndjson|csv]"""
+
+    # 0) Open the source ('-' means stdin); the format follows the extension
+    #    unless --format is given
+    file_format = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    if args.file == "-":
+        source = contextlib.nullcontext(sys.stdin)
+    else:
+        try:
+            source = open(args.file, "r", encoding="utf-8", newline="")
+        except OSError as error:
+            print(f"Error: cannot read '{args.file}': {error.strerror}.")
+            return
+
+    # 1) Hold the lock from load to save: the new ids must stay unused
+    errors: list[str] = []
+    with _tasks_lock(exclusive=True), source as f:
+        data = load_tasks()
+        try:
+            # 2) Validate the records and add them chunk by chunk (in memory)
+            try:
+                imported = import_tasks(data, _read_import_chunks(f, file_format, errors))
+            except ValueError as error:
+                print(f"Error: cannot import '{args.file}': {error}.")
+                return
+
+            # 3) All or nothing: one invalid record cancels the whole import
+            if errors:
+                print(
+                    f"Error: {len(errors)} invalid records in '{args.file}'; nothing was imported."
+                )
+                for error in errors[:IMPORT_ERRORS_SHOWN]:
+                    print(f"  {error}")
+                if len(errors) > IMPORT_ERRORS_SHOWN:
+                    print(f"  ... and {len(errors) - IMPORT_ERRORS_SHOWN} more.")
+                return
+            if imported is None:
+                print(f"There are no tasks to import in '{args.file}'.")
+                return
+
+            # 4) A single write for all of them
+            save_tasks(data)
+        finally:
+            close_tasks(data)
+
+    first_id, last_id = imported
+    print(f"Imported {last_id - first_id + 1} tasks (IDs {first_id}-{last_id}).")
+
+
+def cmd_migrate(args: argparse.Namespace):
+    """Handler for: task-cli migrate [--to sqlite|sharded]"""
+
+    # 1) Read every task from the JSON file (and its journal)
+    data = _load_json_tasks()
+    tasks = _live_tasks(data["tasks"])
+
+    # 2) Never mix the JSON tasks with tasks already in the target
+    store = _open_store(TasksSource(TASKS_FILE, args.to))
+    try:
+        if not store.is_empty():
+            print(f"Error: {store.path} already contains tasks.")
+            return
+
+        # 3) Copy everything in a single commit
+        store.insert_many(tasks)
+        store.set_last_id(data["last_id"])
+        store.commit()
+    finally:
+        store.close()
+
+    print(f"Migrated {len(tasks)} tasks from {TASKS_FILE} to {store.path}.")
+    print(f"Set TASK_CLI_STORAGE={args.to} to use it.")
+
+
+def cmd_gen_fixture(args: argparse.Namespace):
+    """Handler for: task-cli gen-fixture --count N"""
+    from task_tracker_cli import fixtures
+
+    # --output writes another file; the module settings stay as they are
+    source = TasksSource(args.output or TASKS_FILE, STORAGE, USE_CACHE)
+
+    # 1) Never replace real tasks by accident
+    if os.path.exists(source.tasks_file) and not args.force:
+        print(f"Error: {source.tasks_file} already exists (use --force to replace it).")
         return
 
-    # 3) Save changes to disk
+    # 2) Generate the tasks and write them as a regular tasks file
+    data = fixtures.generate_data(args.count, args.seed)
+    data["_source"] = source
     save_tasks(data)
 
-    # 4) Show the deleted task (even though it is no longer in the file)
-    print("Task deleted:")
-    print_task_table(deleted_task)
+    print(f"Generated {len(data['tasks'])} tasks in {source.tasks_file}.")
 
 
-def cmd_mark_in_progress(args: argparse.Namespace):
-    """Handler for: task-cli mark-in-progress ID"""
+# Commands that 'task-cli serve' answers; the rest always run in the client
+DAEMON_COMMANDS = {
+    "add",
+    "update",
+    "delete",
+    "mark-in-progress",
+    "mark-done",
+    "list",
+    "stats",
+    "undo",
+}
+
+
+def _file_stamp(source: TasksSource | None = None) -> tuple:
+    """
+    Return (mtime, size) of the tasks file and its journal (or the shard
+    manifest), to detect outside writes.
+    """
+    source = _source(source)
+    paths = [source.tasks_file, journal.journal_path(source.tasks_file)]
+    if source.storage == "sharded":
+        from task_tracker_cli import shards
+
+        paths.append(shards.manifest_path(source.tasks_file))
+    stamp = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append((info.st_mtime_ns, info.st_size))
+    return tuple(stamp)
+
+
+def cmd_serve(args: argparse.Namespace):
+    """Handler for: task-cli serve"""
+    from task_tracker_cli import daemon
+
+    # 1) Load the tasks once; they stay in memory while the daemon runs
+    parser = build_parser()
+    state = {"stamp": _file_stamp(), "data": load_tasks()}
+    state["version"] = _data_version(state["data"])
+    lock = threading.Lock()
+
+    def current_data() -> dict:
+        # Reload if someone wrote the file without the daemon, or if the last
+        # save lost a race (its changes are still pending)
+        stamp = _file_stamp()
+        if stamp != state["stamp"] or state["data"]["_changes"]:
+            if state["data"].get("_store") is not None:
+                state["data"]["_store"].close()
+            state["data"] = load_tasks()
+            state["stamp"] = stamp
+            state["version"] = _data_version(state["data"])
+        return state["data"]
+
+    def handle_argv(argv: list[str]) -> tuple[int, str, str]:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        # 2) One command at a time: writes are serialized and the output
+        #    redirection below is process-wide
+        with lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                command_args = parser.parse_args(argv)
+            except SystemExit as exit_:
+                # --help or invalid arguments: argparse already wrote the message
+                return exit_.code or 0, stdout.getvalue(), stderr.getvalue()
+
+            if command_args.command not in DAEMON_COMMANDS:
+                print(f"Error: '{command_args.command}' cannot run through the daemon.")
+                return 1, stdout.getvalue(), stderr.getvalue()
+
+            # 3) Run it on the tasks in memory (same retries as the CLI)
+            try:
+                result = run_command(command_args, current_data)
+            except TasksFileError as error:
+                print(f"Error: {error}")
+                return 1, stdout.getvalue(), stderr.getvalue()
+            if _data_version(state["data"]) != state["version"]:
+                # Our own save: the data in memory matches the new file
+                state["stamp"] = _file_stamp()
+                state["version"] = _data_version(state["data"])
+
+            render_result(command_args, result)
+        return 0, stdout.getvalue(), stderr.getvalue()
+
+    path = daemon.socket_path(TASKS_FILE)
+    print(f"Serving {TASKS_FILE} on {path} (Ctrl+C to stop)")
+    try:
+        daemon.serve(path, handle_argv)
+    except RuntimeError as error:
+        print(f"Error: {error}")
+
+
+def _apply_http_write(data: dict, calls: list[tuple]) -> dict | None:
+    """
+    Run the domain calls of one HTTP write, e.g. [(update_task, (3, "x"))].
+    - Return a copy of the task of the last call, or None as soon as one
+      call finds no task.
+    """
+    task = None
+    for function, call_args in calls:
+        task = function(data, *call_args)
+        if task is None:
+            return None
+    return dict(task)
+
+
+def cmd_http(args: argparse.Namespace):
+    """Handler for: task-cli http [--host HOST] [--port N] [--workers N]"""
+    from task_tracker_cli import http_api
+
+    # 1) Load the tasks once; they stay in memory while the server runs
+    state = {"stamp": _file_stamp(), "data": load_tasks()}
+    lock = locking.ReadWriteLock()
+    # Stores read their pages lazily (that changes them): one reader at a time
+    shared_reads = state["data"].get("_store") is None
+
+    def current_data() -> dict:
+        # Under the write lock: reload if someone wrote the file without the
+        # server, or if the last save lost a race (its changes are still pending)
+        stamp = _file_stamp()
+        if stamp != state["stamp"] or state["data"]["_changes"]:
+            if state["data"].get("_store") is not None:
+                state["data"]["_store"].close()
+            state["data"] = load_tasks()
+            state["stamp"] = stamp
+        return state["data"]
+
+    def read(function):
+        # 2) Reads share the tasks in memory and run in parallel
+        if _file_stamp() != state["stamp"]:
+            with lock.write():
+                current_data()
+        with lock.read() if shared_reads else lock.write():
+            return function(state["data"])
+
+    def apply_group(operations: list[list[tuple]]) -> list:
+        # 3) Writes: the writer thread applies every queued write, then saves
+        #    once (same retries as run_command())
+        locked = _store_writes_locked()
+        for attempt in range(1, SAVE_ATTEMPTS + 1):
+            final = attempt == SAVE_ATTEMPTS or locked
+            with lock.write(), _tasks_lock(exclusive=True) if final else contextlib.nullcontext():
+                data = current_data()
+                results = [_apply_http_write(data, calls) for calls in operations]
+                if not data["_changes"]:
+                    return results
+
+                # Saving only reads the tasks once the holes are compacted:
+                # readers may go on meanwhile
+                if data.get("_store") is None:
+                    index = _get_index(data)
+                    if index.holes:
+                        index.compact()
+                lock.downgrade()
+                try:
+                    save_tasks(data)
+                except ConflictError:
+                    continue
+                state["stamp"] = _file_stamp()
+                if data.get("_store") is None and _disk_version() != data["version"]:
+                    # Someone saved right after us: the stamp is not ours
+                    state["stamp"] = None
+                return results
+
+    writes = http_api.WriteQueue(apply_group)
+
+    def write(calls: list[tuple], task_id: int | None = None) -> tuple[int, dict]:
+        task = writes.submit(calls).result()
+        if task is None:
+            return 404, {"error": f"task with ID {task_id} not found."}
+        return 200, task
+
+    def find(data: dict, task_id: int) -> dict | None:
+        store = data.get("_store")
+        task = store.get(task_id) if store is not None else _find_task(data, task_id)
+        return None if task is None else dict(task)
+
+    def handle(method: str, path: str, query: dict, body) -> tuple[int, object]:
+        parts = path.strip("/").split("/")
+        if parts == ["stats"] and method == "GET":
+            return 200, read(lambda data: _add_archived_counts(count_tasks_by_status(data)))
+        if parts[0] != "tasks" or len(parts) > 2:
+            return 404, {"error": f"no such endpoint: {path}"}
+        if body is not None and not isinstance(body, dict):
+            return 400, {"error": "request body must be a JSON object."}
+        body = body or {}
+
+        description = body.get("description")
+        if description is not None:
+            if not isinstance(description, str) or not description.strip():
+                return 400, {"error": "task description cannot be empty."}
+            description = description.strip()
+        status = body.get("status")
+        if status is not None and status not in STATUSES:
+            return 400, {"error": f"invalid status: {status!r}"}
+
+        # /tasks: list (GET) or add (POST)
+        if len(parts) == 1:
+            if method == "GET":
+                status = query.get("status", "all")
+                if status != "all" and status not in STATUSES:
+                    return 400, {"error": f"invalid status: {status!r}"}
+                offset = query.get("offset", "0")
+                limit = query.get("limit")
+                if not offset.isdecimal() or not (limit is None or limit.isdecimal()):
+                    return 400, {"error": "offset and limit must be integers >= 0."}
+                offset = int(offset)
+                limit = None if limit is None else int(limit)
+                tasks = read(
+                    lambda data: [
+                        dict(task) for task in list_tasks_by_status(data, status, offset, limit)
+                    ]
+                )
+                return 200, {"tasks": tasks}
+            if method == "POST":
+                if description is None:
+                    return 400, {"error": "task description cannot be empty."}
+                return 201, write([(add_task, (description,))])[1]
+            return 405, {"error": f"{method} is not allowed on {path}."}
+
+        # /tasks/ID: get, change (PATCH) or delete one task
+        if not parts[1].isdecimal():
+            return 404, {"error": f"no such endpoint: {path}"}
+        task_id = int(parts[1])
+        if method == "GET":
+            task = read(lambda data: find(data, task_id))
+            if task is None:
+                return 404, {"error": f"task with ID {task_id} not found."}
+            return 200, task
+        if method == "PATCH":
+            calls = []
+            if description is not None:
+                calls.append((update_task, (task_id, description)))
+            if status is not None:
+                calls.append((set_task_status, (task_id, status)))
+            if not calls:
+                return 400, {"error": "give a description and/or a status to change."}
+            return write(calls, task_id)
+        if method == "DELETE":
+            return write([(delete_task, (task_id,))], task_id)
+        return 405, {"error": f"{method} is not allowed on {path}."}
+
+    def ready(address: tuple) -> None:
+        print(f"Serving {TASKS_FILE} on http://{address[0]}:{address[1]} (Ctrl+C to stop)")
+        sys.stdout.flush()
+
+    try:
+        http_api.serve(args.host, args.port, handle, args.workers, ready)
+    except OSError as error:
+        print(f"Error: cannot listen on {args.host}:{args.port}: {error.strerror}.")
+    finally:
+        writes.close()
+
+
+# ===== DOMAIN LAYER: task logic / JSON =====
+TASKS_FILE = "tasks.json"
+
+# Storage mode:
+# - "json": every save rewrites TASKS_FILE (default)
+# - "journal": every save appends the changes to TASKS_FILE + ".journal"
+# - "sqlite": tasks live in a SQLite database next to TASKS_FILE (tasks.db)
+# - "sharded": tasks live in id-range shard files next to TASKS_FILE (tasks.shards/)
+STORAGE = os.environ.get("TASK_CLI_STORAGE", "json")
+
+# Storage modes where tasks stay on disk and data['_store'] answers queries
+STORE_MODES = ("sqlite", "sharded")
+
+# Every storage mode (anything else is rejected, see _check_storage())
+STORAGE_MODES = ("json", "journal") + STORE_MODES
+
+# Times a command is attempted when its save conflicts with another process
+# (the last attempt holds the lock from load to save and always succeeds)
+SAVE_ATTEMPTS = 5
+
+# Journal size (bytes) after which it is folded back into TASKS_FILE
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+# Reuse the parsed state cached in TASKS_FILE + ".cache" (see --no-cache)
+USE_CACHE = True
+
+# A page of 'list' (--limit) comes from the cache only while TASKS_FILE is at
+# most this big; larger files are streamed, so the page costs no more memory
+# than its own tasks
+CACHED_PAGE_MAX_BYTES = 4 * 1024 * 1024
+
+# Record every save in TASKS_FILE + ".history" (history / undo / list --as-of).
+# Measured cost per save: about 1-1.5 ms to append the events (10,000 to
+# 100,000 tasks), plus a compressed snapshot of all tasks every
+# history.SNAPSHOT_EVERY events (about 65 ms for 10,000 tasks, 0.5 s for
+# 100,000, i.e. under 1 ms per save on average).
+# TASK_CLI_HISTORY=0 turns it off (and deletes the history on the next save):
+# saves then only write the tasks
+HISTORY = os.environ.get("TASK_CLI_HISTORY", "") != "0"
+
+# Layout of TASKS_FILE when it is rewritten:
+# - "pretty": indented JSON, easy to read and edit by hand
+# - "compact": no indentation or spaces (smallest, fastest to write)
+# - "lines": compact, but one task per line (diff and grep friendly)
+# None keeps the layout of the existing file (detected on load); new files
+# are "pretty". All of them are plain JSON and are read the same way.
+FILE_FORMAT = os.environ.get("TASK_CLI_FORMAT") or None
+FILE_FORMATS = ("pretty", "compact", "lines")
+
+
+# Valid task statuses, in the order they are reported
+STATUSES = ["todo", "in-progress", "done"]
+
+# Deleted tasks leave a hole (None) in data['tasks']; the list is compacted
+# once holes are more than half of it and at least this many
+COMPACT_MIN_HOLES = 1024
+
+# Changes kept in place in the ordered id list of a status (each one shifts
+# the list) before it is dropped and sorted again on its next use
+ORDERED_EDITS_MAX = 64
+
+
+class TasksSource:
+    """
+    Where a set of tasks lives: the tasks file (its journal, cache, history...
+    are named after it), the storage mode and whether the parse cache is used.
+    - load_tasks() keeps it in data['_source'], so save_tasks() and the other
+      functions that take 'data' go back to the same place.
+    - Functions without 'data' take it as 'source'; None means the module
+      settings (TASKS_FILE, STORAGE, USE_CACHE) at the time of the call.
+    """
+
+    __slots__ = ("tasks_file", "storage", "use_cache")
+
+    def __init__(self, tasks_file: str, storage: str, use_cache: bool = True) -> None:
+        _check_storage(storage)
+        self.tasks_file = tasks_file
+        self.storage = storage
+        self.use_cache = use_cache
+
+
+def _source(source: TasksSource | None = None) -> TasksSource:
+    """Return 'source', or the module settings as a TasksSource."""
+    if source is not None:
+        return source
+    return TasksSource(TASKS_FILE, STORAGE, USE_CACHE)
+
+
+def _data_source(data: dict) -> TasksSource:
+    """Return where 'data' was loaded from (the module settings if it was not loaded)."""
+    return data.get("_source") or _source()
+
+
+class TasksFileError(ValueError):
+    """TASKS_FILE exists but cannot be read as a tasks file."""
+
+
+class SettingsError(ValueError):
+    """A setting (TASK_CLI_* or a storage mode argument) has a value the CLI does not know."""
+
+
+def _check_storage(storage: str, setting: str = "storage mode") -> None:
+    # An unknown mode must not fall back to "json": after a migrate that
+    # would read and write the stale tasks.json
+    if storage not in STORAGE_MODES:
+        raise SettingsError(
+            f"{setting} must be one of {', '.join(STORAGE_MODES)} (got {storage!r})."
+        )
+
+
+def _check_file_format(file_format: str | None) -> None:
+    if file_format is not None and file_format not in FILE_FORMATS:
+        raise SettingsError(
+            f"TASK_CLI_FORMAT must be one of {', '.join(FILE_FORMATS)} (got {file_format!r})."
+        )
+
+
+def _check_settings() -> None:
+    """
+    Raise SettingsError if a TASK_CLI_* setting is unknown, before a command
+    reads or writes anything (a typo must not quietly change what is saved).
+    """
+    _check_storage(STORAGE, "TASK_CLI_STORAGE")
+    _check_file_format(FILE_FORMAT)
+
+
+class Task:
+    """
+    Compact in-memory task (one slot per field instead of a dict per task).
+    - Attribute names are the JSON keys, so task.status and task["status"]
+      both work: the mapping methods let code written for task dicts (and
+      dict(task)) keep working, while hot paths use the attributes.
+    - Statuses are shared string objects and equal timestamps share one int.
+    - Keys other than the five fields are kept in 'extra' (usually None).
+    - Dicts are only built at the JSON boundary (to_dict()).
+    """
+
+    __slots__ = ("id", "description", "status", "createdAt", "updatedAt", "extra")
+
+    FIELDS = ("id", "description", "status", "createdAt", "updatedAt")
+
+    def __init__(
+        self,
+        id: int,
+        description: str,
+        status: str,
+        createdAt: int,
+        updatedAt: int,
+        extra: dict | None = None,
+    ) -> None:
+        self.id = id
+        self.description = description
+        self.status = _SHARED_STATUSES.get(status, status)
+        self.createdAt = createdAt
+        self.updatedAt = createdAt if updatedAt == createdAt else updatedAt
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, task: dict) -> "Task":
+        if len(task) == len(Task.FIELDS) and task.keys() == _TASK_FIELDS:
+            # Usual case: exactly the five fields
+            return cls(
+                task["id"],
+                task["description"],
+                task["status"],
+                task["createdAt"],
+                task["updatedAt"],
+            )
+        extra = {key: value for key, value in task.items() if key not in _TASK_FIELDS}
+        return cls(
+            task.get("id"),
+            task.get("description", ""),
+            task.get("status", "todo"),
+            task.get("createdAt"),
+            task.get("updatedAt"),
+            extra or None,
+        )
+
+    def to_dict(self) -> dict:
+        task = {
+            "id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
+        }
+        if self.extra:
+            task.update(self.extra)
+        return task
+
+    # --- mapping interface (same behaviour as the task dicts) ---
+    def __getitem__(self, key: str):
+        if key in _TASK_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in _TASK_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def get(self, key: str, default=None):
+        if key in _TASK_FIELDS:
+            return getattr(self, key)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def keys(self):
+        if self.extra:
+            return Task.FIELDS + tuple(self.extra)
+        return Task.FIELDS
+
+    def __contains__(self, key: str) -> bool:
+        return key in _TASK_FIELDS or bool(self.extra and key in self.extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Task, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Task({self.to_dict()!r})"
+
+
+_TASK_FIELDS = frozenset(Task.FIELDS)
+
+# One string object per status for all the tasks
+_SHARED_STATUSES = {status: status for status in STATUSES}
+
+
+def _as_task(task) -> Task:
+    """Return 'task' as a Task (dicts are converted)."""
+    return task if type(task) is Task else Task.from_dict(task)
+
+
+def _json_default(value):
+    """json.dumps() hook: Task objects are written as their dict."""
+    if type(value) is Task:
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    Disable the cyclic garbage collector while building many objects.
+    - Tasks hold no reference cycles, but every allocation counts towards a
+      collection, and each collection walks all the tasks built so far.
+    """
+    import gc
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _TaskIndex:
+    """
+    In-memory index over data['tasks'] so lookups by id do not scan the list.
+    - Task dicts found in the list are replaced by Task objects.
+    - positions: id -> position of the task inside the list
+    - by_status: status -> set of ids with that status
+    - ordered: status -> the same ids as a list in increasing order, or
+      None until it is needed again (see ids_with_status())
+    - edits: status -> changes made inside its ordered list since it was built
+    - holes: number of deleted slots (None) still in the list
+    - by_time: field -> _TimeIndex, built the first time it is needed
+    """
+
+    __slots__ = (
+        "tasks", "positions", "by_status", "ordered", "edits", "holes", "size", "by_time"
+    )
+
+    def __init__(self, tasks: list) -> None:
+        self.tasks = tasks
+        self.positions = {}
+        self.by_status = {status: set() for status in STATUSES}
+        self.ordered = {status: [] for status in STATUSES}
+        self.edits = {}
+        self.holes = 0
+        with _gc_paused():
+            for position, task in enumerate(tasks):
+                if task is None:
+                    self.holes += 1
+                else:
+                    if type(task) is not Task:
+                        task = tasks[position] = Task.from_dict(task)
+                    task_id = task.id
+                    self.positions[task_id] = position
+                    status = task.status
+                    if status not in self.by_status:
+                        self.by_status[status] = set()
+                        self.ordered[status] = []
+                    self.by_status[status].add(task_id)
+                    ids = self.ordered[status]
+                    if ids is None:
+                        continue
+                    if ids and task_id <= ids[-1]:
+                        # Not in id order (edited by hand): sorted on first use
+                        self.ordered[status] = None
+                    else:
+                        ids.append(task_id)
+        self.size = len(tasks)
+        self.by_time = {}
+
+    @classmethod
+    def from_parts(
+        cls, tasks: list, positions: dict, by_status: dict, by_time: dict | None = None
+    ) -> "_TaskIndex":
+        """
+        Rebuild an index from cached parts without scanning the tasks.
+        - by_status: status -> list of ids in increasing order.
+        """
+        index = cls.__new__(cls)
+        index.tasks = tasks
+        index.positions = positions
+        index.by_status = {status: set(ids) for status, ids in by_status.items()}
+        index.ordered = by_status
+        index.edits = {}
+        index.holes = 0
+        index.size = len(tasks)
+        index.by_time = {
+            field: _TimeIndex.from_parts(field, *parts)
+            for field, parts in (by_time or {}).items()
+        }
+        return index
+
+    def compact(self) -> None:
+        """Remove the holes left by deletions (ids keep their order)."""
+        self.tasks[:] = [task for task in self.tasks if task is not None]
+        self.positions = {task.id: i for i, task in enumerate(self.tasks)}
+        self.holes = 0
+        self.size = len(self.tasks)
+
+    def set_status(self, task_id: int, old: str | None, new: str | None) -> None:
+        """
+        Move an id between the status buckets ('old' is None for a new task,
+        'new' is None for a deleted one), keeping their ordered lists exact.
+        - A new id higher than the rest (the usual case) is appended; any
+          other change is a binary search plus one shift of the list.
+        - After ORDERED_EDITS_MAX such changes the list is dropped instead
+          (many changes at once, e.g. a bulk mark-done): ids_with_status()
+          sorts the bucket once when it is next needed.
+        """
+        import bisect
+
+        if old is not None:
+            self.by_status[old].discard(task_id)
+            ids = self._editable(old)
+            if ids is not None:
+                position = bisect.bisect_left(ids, task_id)
+                if position < len(ids) and ids[position] == task_id:
+                    del ids[position]
+        if new is not None:
+            if new not in self.by_status:
+                self.by_status[new] = set()
+                self.ordered[new] = []
+            self.by_status[new].add(task_id)
+            ids = self.ordered[new]
+            if ids is not None and (not ids or task_id > ids[-1]):
+                ids.append(task_id)
+            elif self._editable(new) is not None:
+                bisect.insort(ids, task_id)
+
+    def _editable(self, status: str) -> list[int] | None:
+        """Return the ordered list of 'status' for one more change, or None if it was dropped."""
+        ids = self.ordered.get(status)
+        if ids is None:
+            return None
+        edits = self.edits.get(status, 0) + 1
+        if edits > ORDERED_EDITS_MAX:
+            self.ordered[status] = None
+            return None
+        self.edits[status] = edits
+        return ids
+
+    def ids_with_status(self, status: str) -> list[int]:
+        """
+        Return the ids with 'status' in increasing order (do not modify it).
+        - Already ordered (no sort) unless set_status() dropped the list.
+        """
+        if status not in self.by_status:
+            return []
+        ids = self.ordered.get(status)
+        if ids is None:
+            ids = self.ordered[status] = sorted(self.by_status[status])
+            self.edits[status] = 0
+        return ids
+
+    def time_index(self, field: str) -> "_TimeIndex":
+        """Return the sorted index on 'field' (createdAt/updatedAt), building it once."""
+        time_index = self.by_time.get(field)
+        if time_index is None:
+            time_index = _TimeIndex(field, self.tasks)
+            self.by_time[field] = time_index
+        return time_index
+
+    def time_changed(self, field: str, task_id: int, old, new: int) -> None:
+        """
+        Keep the time index on 'field' (if built) in sync with a changed value.
+        - old is None for a new task and new is None for a deleted one.
+        """
+        time_index = self.by_time.get(field)
+        if time_index is None or old == new:
+            return
+        if old is not None:
+            time_index.discard()
+        if new is not None:
+            time_index.add(new, task_id)
+        if time_index.needs_compact():
+            self.by_time[field] = _TimeIndex(field, self.tasks)
+
+
+class _TimeIndex:
+    """
+    Ids sorted by one timestamp field, so time ranges are found by binary search.
+    - keys[i] is the timestamp of ids[i]; keys is sorted.
+    - Changing or deleting a task does not remove its old entry (that would
+      shift the lists): the entry goes stale and is skipped by entries(), and
+      the lists are rebuilt once stale entries are more than half of them.
+    """
+
+    __slots__ = ("field", "keys", "ids", "stale")
+
+    def __init__(self, field: str, tasks: list) -> None:
+        # Tasks whose value could not be read as a timestamp are left out
+        value = operator.attrgetter(field)
+        live = [
+            task
+            for task in tasks
+            if task is not None and isinstance(value(task), int)
+        ]
+        # Stable sort: equal timestamps stay in id order
+        live.sort(key=value)
+        self.field = field
+        self.keys = list(map(value, live))
+        self.ids = list(map(operator.attrgetter("id"), live))
+        self.stale = 0
+
+    @classmethod
+    def from_parts(cls, field: str, keys: list, ids: list, stale: int) -> "_TimeIndex":
+        """Rebuild a time index from cached lists without sorting."""
+        time_index = cls.__new__(cls)
+        time_index.field = field
+        time_index.keys = keys
+        time_index.ids = ids
+        time_index.stale = stale
+        return time_index
+
+    def add(self, timestamp: int, task_id: int) -> None:
+        """Insert an entry; new timestamps are usually the latest, so this appends."""
+        import bisect
+
+        if not self.keys or timestamp >= self.keys[-1]:
+            self.keys.append(timestamp)
+            self.ids.append(task_id)
+        else:
+            position = bisect.bisect_right(self.keys, timestamp)
+            self.keys.insert(position, timestamp)
+            self.ids.insert(position, task_id)
+
+    def discard(self) -> None:
+        """Count one more stale entry (a task changed this field or was deleted)."""
+        self.stale += 1
+
+    def needs_compact(self) -> bool:
+        return self.stale >= COMPACT_MIN_HOLES and self.stale * 2 > len(self.keys)
+
+    def entries(self, index: _TaskIndex, since: int | None, until: int | None):
+        """
+        Yield the live tasks with since <= field <= until, in time order.
+        - The range is located with two binary searches; only the entries
+          inside it are visited.
+        """
+        import bisect
+
+        start = 0 if since is None else bisect.bisect_left(self.keys, since)
+        stop = len(self.keys) if until is None else bisect.bisect_right(self.keys, until)
+        field = self.field
+        for i in range(start, stop):
+            position = index.positions.get(self.ids[i])
+            if position is None:
+                # Deleted task
+                continue
+            task = index.tasks[position]
+            if getattr(task, field) == self.keys[i]:
+                # Otherwise the entry is stale: the task has a newer one
+                yield task
+
+
+def _get_index(data: dict) -> _TaskIndex:
+    """
+    Return the index of 'data', building it if missing or stale.
+    - The index is stale if data['tasks'] was replaced or resized from outside.
+    """
+    tasks = data.setdefault("tasks", [])
+    index = data.get("_index")
+    if index is None or index.tasks is not tasks or index.size != len(tasks):
+        index = _TaskIndex(tasks)
+        data["_index"] = index
+    return index
+
+
+def _find_task(data: dict, task_id: int) -> dict | None:
+    """Return the task with id == task_id, or None (O(1) through the index)."""
+    index = _get_index(data)
+    position = index.positions.get(task_id)
+    if position is None:
+        return None
+    return index.tasks[position]
+
+
+def _live_tasks(tasks: list) -> list[dict]:
+    """Return the tasks of the list without the holes left by deletions."""
+    return [task for task in tasks if task is not None]
+
+
+def _record_change(data: dict, record: dict) -> None:
+    """
+    Remember a mutation so save_tasks() can persist only what changed.
+    - Only data loaded through load_tasks() tracks changes ('_changes' key).
+    """
+    changes = data.get("_changes")
+    if changes is not None:
+        changes.append(record)
+
+
+def _tasks_lock(exclusive: bool = False, source: TasksSource | None = None):
+    """Return the inter-process lock of the tasks file (see locking.locked())."""
+    return locking.locked(locking.lock_path(_source(source).tasks_file), exclusive)
+
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
+def _store_writes_locked(storage: str | None = None) -> bool:
+    """
+    Return True if writers must hold the exclusive lock from load to save.
+    - Stores ("sqlite", "sharded") apply each change as the command runs, so
+      an optimistic writer would hold the database's write lock while it
+      waits for ours (and the final attempt waits for theirs). Their commands
+      only touch a few rows: holding the lock throughout costs nothing.
+    """
+    return (storage or STORAGE) in STORE_MODES
 
-    # 2) Try to change status in the domain layer
-    updated_task = set_task_status(data, args.id, "in-progress")
 
-    if updated_task is None:
-        # No task found with that id
-        print(f"Error: task with ID {args.id} not found.")
-        return
+def _data_version(data: dict) -> int:
+    """Return the version of the tasks in 'data' (bumped by every save)."""
+    store = data.get("_store")
+    if store is not None:
+        return store.get_version()
+    return data.get("version", 0)
 
-    # 3) Save changes to disk
-    save_tasks(data)
 
-    # 4) Print the updated task
-    print_task_table(updated_task)
+def _disk_version(source: TasksSource | None = None) -> int | None:
+    """
+    Return the version of the tasks currently saved in the tasks file (and
+    its journal), reading only the journal's last line or the file header.
+    - Return None if the file cannot be read this way.
+    """
+    tasks_file = _source(source).tasks_file
+    journal_file = journal.journal_path(tasks_file)
+    if os.path.exists(journal_file):
+        version = journal.read_version(journal_file)
+        if version is not None:
+            return version
+    if not os.path.exists(tasks_file):
+        return 0
+    header = reader.read_header(tasks_file)
+    return None if header is None else header.get("version", 0)
 
 
-def cmd_mark_done(args: argparse.Namespace):
-    """Handler for: task-cli mark-done ID"""
+def _open_store(source: TasksSource | None = None):
+    """Open the store ("sqlite" or "sharded", per source.storage) that belongs to the tasks file."""
+    source = _source(source)
+    if source.storage == "sharded":
+        from task_tracker_cli import shards
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
+        return shards.ShardStore(shards.shards_path(source.tasks_file))
 
-    # 2) Try to change status in the domain layer
-    updated_task = set_task_status(data, args.id, "done")
+    from task_tracker_cli import sqlite_store
 
-    if updated_task is None:
-        # No task found with that id
-        print(f"Error: task with ID {args.id} not found.")
-        return
+    return sqlite_store.SqliteStore(sqlite_store.database_path(source.tasks_file))
 
-    # 3) Save changes to disk
-    save_tasks(data)
 
-    # 4) Print the updated task
-    print_task_table(updated_task)
+@profiling.timed("load_tasks")
+def load_tasks(source: TasksSource | None = None) -> dict:
+    """
+    Load tasks from the JSON file.
+    - If the file does not exist, return an empty structure: {"last_id": 0, "tasks": []}
+    - If a journal exists next to the file, replay it on top of the snapshot.
+    - The persisted status counters are dropped: they are recomputed on save.
+    - In "sqlite" and "sharded" modes no task is loaded: data['_store']
+      holds the store and the domain functions query it directly.
+    - source: where to load from (default: TASKS_FILE, STORAGE, USE_CACHE);
+      kept in data['_source'] for save_tasks().
+    """
+    source = _source(source)
+    if source.storage in STORE_MODES:
+        store = _open_store(source)
+        return {
+            "last_id": store.get_last_id(),
+            "version": store.get_version(),
+            "_store": store,
+            "_changes": [],
+            "_source": source,
+        }
+
+    data = _load_json_tasks(source)
+    profiling.count("tasks", len(data["tasks"]))
+
+    # 5) Start tracking changes made on top of what is on disk
+    data["_changes"] = []
+    data["_source"] = source
 
+    return data
 
-def cmd_list(args: argparse.Namespace):
-    """Handler for: task-cli list [status]"""
 
-    # 1) Load current tasks state from JSON
-    data = load_tasks()
+def close_tasks(data: dict) -> None:
+    """Release what load_tasks() opened (the store, in "sqlite" and "sharded" modes)."""
+    store = data.get("_store")
+    if store is not None:
+        store.close()
 
-    # 2) Ask the domain layer for the filtered list
-    tasks = list_tasks_by_status(data, args.status)
 
-    # 3) If there are no tasks, inform the user and exit
-    if not tasks:
-        if args.status == "all":
-            print("There are no tasks yet.")
+def _load_json_tasks(source: TasksSource | None = None) -> dict:
+    """
+    Read the tasks file (and its journal) into a {"last_id", "tasks"} dict.
+    - If the parsed-state cache matches the file, use it instead of decoding
+      the JSON; otherwise parse the file and refresh the cache.
+    """
+    source = _source(source)
+    # Writers replace the file and append to the journal under the
+    # exclusive lock: read both under the shared one
+    with _tasks_lock(source=source):
+        # 1) Check if the file exists
+        if not os.path.exists(source.tasks_file):
+            # Initial standard structure of our program
+            data = {"last_id": 0, "tasks": []}
         else:
-            print(f"There are no tasks with status '{args.status}'.")
-        return
+            # If it exists, read it (or its cached parse)
+            data = _read_json_file(source)
 
-    # 4) Print all tasks in a single table
-    print_tasks_table(tasks)
+        # 2) Apply the mutations that were only appended to the journal
+        if journal.replay(data, journal.journal_path(source.tasks_file)):
+            # Cached indexes describe the file without the journal
+            data.pop("_index", None)
 
+    return data
 
-# ===== DOMAIN LAYER: task logic / JSON =====
-TASKS_FILE = "tasks.json"
+
+def _detect_format(content: bytes) -> str:
+    """Return the FILE_FORMATS layout 'content' was written with."""
+    if content.startswith(b'{\n  "'):
+        return "pretty"
+    # The tasks array comes right after the small header
+    if b'"tasks":[\n' in content[: reader.HEADER_BYTES]:
+        return "lines"
+    return "compact"
 
 
-def load_tasks() -> dict:
+def _read_json_file(source: TasksSource | None = None) -> dict:
     """
-    Load tasks from the JSON file.
-    - If the file does not exist, return an empty structure: {"last_id": 0, "tasks": []}
+    Decode the tasks file, going through the parsed-state cache if enabled.
+    - data['_format'] records the layout of the file, so saves can keep it.
+    - Raise TasksFileError if the file is not a valid tasks file: returning
+      an empty list instead would let the next save wipe every task.
     """
-    # 1) Check if the file exists
-    if not os.path.exists(TASKS_FILE):
-        # Initial standard structure of our program
-        return {"last_id": 0, "tasks": []}
-
-    # 2) If it exists, try to read it as JSON
+    source = _source(source)
+    tasks_file = source.tasks_file
+    with open(tasks_file, "rb") as f:
+        content = f.read()
+        key = cache.make_key(content, os.fstat(f.fileno()))
+    profiling.count("bytes_read", len(content))
+    cache_file = cache.cache_path(tasks_file)
+    file_format = _detect_format(content)
+
+    # 1) Warm start: reuse the data and indexes of the last parse
+    if source.use_cache:
+        cached = cache.load(cache_file, key)
+        if cached is not None:
+            data, positions, by_status, by_time = cached
+            # Tasks are cached as columns (one list per field)
+            with _gc_paused():
+                data["tasks"] = list(map(Task, *data["tasks"]))
+            data["_index"] = _TaskIndex.from_parts(
+                data["tasks"], positions, by_status, by_time
+            )
+            data["_format"] = file_format
+            return data
+
+    # 2) Cold start: read it as JSON
     try:
-        with open(TASKS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError:
-        # File is corrupted or not valid JSON
-        # Decision: instead of crashing, return an empty structure
-        return {"last_id": 0, "tasks": []}
+        with _gc_paused():
+            data = json.loads(content)
+    except (json.JSONDecodeError, UnicodeDecodeError) as error:
+        # Corrupted file: stop here and leave it untouched
+        raise TasksFileError(f"{tasks_file} is not valid JSON ({error}).") from None
+    if not isinstance(data, dict) or not isinstance(data.get("tasks", []), list):
+        raise TasksFileError(f"{tasks_file} does not contain a task list.")
 
     # 3) Normalize minimum keys in case something is missing
     if "last_id" not in data:
         data["last_id"] = 0
     if "tasks" not in data:
         data["tasks"] = []
-
+    data.pop("counts", None)
+
+    # 4) Files written before timestamps were integers store them as strings;
+    #    check every task (old and new ones can be mixed, e.g. after a hand edit)
+    created, updated = timestamps.FIELDS
+    for task in data["tasks"]:
+        if type(task.get(created)) is str or type(task.get(updated)) is str:
+            timestamps.upgrade(task)
+
+    # 5) Remember this parse for the next load
+    if source.use_cache:
+        _write_cache(data, key, tasks_file)
+    data["_format"] = file_format
     return data
 
 
+def _write_cache(data: dict, key: tuple, tasks_file: str) -> None:
+    """
+    Store 'data' (as saved in 'tasks_file') and its indexes in the cache.
+    - The tasks are stored as columns (ids, descriptions, statuses, ...).
+    - The time indexes are built here if missing, so time-range queries on a
+      warm cache never sort; afterwards mutations keep them up to date.
+    """
+    index = _get_index(data)
+    by_time = {}
+    for field in timestamps.FIELDS:
+        time_index = index.time_index(field)
+        by_time[field] = (time_index.keys, time_index.ids, time_index.stale)
+    public = {name: value for name, value in data.items() if not name.startswith("_")}
+    # One list per field: far smaller (and faster to rebuild) than a dict per task
+    public["tasks"] = [
+        list(map(operator.attrgetter(field), index.tasks))
+        for field in Task.__slots__
+    ]
+    cache.store(
+        cache.cache_path(tasks_file),
+        key,
+        public,
+        index.positions,
+        {status: index.ids_with_status(status) for status in index.by_status},
+        by_time,
+    )
+
+
+def _search_stamp(store=None, source: TasksSource | None = None):
+    """Return what identifies the current version of the tasks for the search index."""
+    if store is not None:
+        return (_source(source).storage, store.get_version())
+    return _file_stamp(source)
+
+
+@profiling.timed("save_tasks")
 def save_tasks(data: dict) -> None:
     """
-    Save the 'data' structure (last_id + tasks) to TASKS_FILE.
-    - Overwrites the previous contents of the file.
+    Save the 'data' structure (last_id + tasks) to its tasks file
+    (data['_source'], or TASKS_FILE for data that was not loaded).
+    - In "json" mode, overwrites the previous contents of the file.
+    - In "journal" mode, only appends the changes made since load_tasks();
+      the journal is folded into the file once it is too big.
+    - In "sqlite" and "sharded" modes, commits the pending changes to the store.
+    - A search index that matched the tasks before this save is updated
+      with the same changes (after an import it is left to be rebuilt).
+    - The changes are appended to the history (see history.py); a file
+      written from scratch (no recorded changes) starts without history,
+      and with HISTORY off there is none.
+    - Data from load_tasks() with no recorded change is not written at all.
+    - Runs under the exclusive lock. Raise ConflictError if another process
+      saved after 'data' was loaded (its version is not the one on disk, or
+      in the store), unless the lock was already held since the load.
     """
-    with open(TASKS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    from task_tracker_cli import history, search
+
+    store = data.get("_store")
+    changes = data.get("_changes")
+    if changes is not None and not changes:
+        # Nothing changed since load_tasks(): the file is already up to date
+        return
 
+    source = _data_source(data)
+    tasks_file = source.tasks_file
+    checked = changes is not None and not locking.holds(
+        locking.lock_path(tasks_file), exclusive=True
+    )
+    with _tasks_lock(exclusive=True, source=source):
+        if checked:
+            version = _disk_version(source) if store is None else store.get_version()
+            if version != data.get("version", 0):
+                if store is not None:
+                    # Leave the database as the other process saved it
+                    store.rollback()
+                raise ConflictError(f"{tasks_file} was changed by another process.")
+
+        search_dir = search.index_path(tasks_file)
+        indexed = None
+        # Range changes (import) do not list their tasks: the index is
+        # rebuilt by the next search instead
+        if changes and os.path.isdir(search_dir) and not _has_range_change(changes):
+            if search.read_stamp(search_dir) == _search_stamp(store, source):
+                indexed = list(changes)
+        recorded = list(changes) if changes else None
+
+        _write_tasks(data, source)
+
+        if indexed:
+            search.apply(search_dir, indexed, _search_stamp(store, source))
+
+        history_dir = history.history_path(tasks_file)
+        if changes is None or not HISTORY:
+            history.remove(history_dir)
+        elif recorded:
+            last_id = store.get_last_id() if store is not None else data.get("last_id", 0)
+            history.record(
+                history_dir,
+                recorded,
+                timestamps.now(),
+                lambda: _history_tasks(data),
+                last_id,
+                data.pop("_undoes", None),
+            )
+
+
+def _has_range_change(changes: list[dict]) -> bool:
+    """Return True if 'changes' include an import (or its undo): see history.RANGE_OPS."""
+    from task_tracker_cli import history
+
+    return any(change.get("op") in history.RANGE_OPS for change in changes)
+
+
+def _history_tasks(data: dict):
+    """Return every task of 'data' after a save as dicts in id order, lazily (history snapshots)."""
+    store = data.get("_store")
+    if store is not None:
+        return store.iter_by_status("all")
+    return (task.to_dict() for task in _get_index(data).tasks if task is not None)
+
+
+def _write_tasks(data: dict, source: TasksSource) -> None:
+    """Persist 'data' with the storage mode of 'source' (see save_tasks())."""
+    store = data.get("_store")
+    if store is not None:
+        store.commit()
+        data["version"] = store.get_version()
+        data["_changes"].clear()
+        return
+
+    journal_file = journal.journal_path(source.tasks_file)
+    changes = data.get("_changes")
+
+    # An import is written as a snapshot, not as one journal record per task
+    if (
+        source.storage == "journal"
+        and changes is not None
+        and journal.journal_size(journal_file) < JOURNAL_COMPACT_BYTES
+        and not _has_range_change(changes)
+    ):
+        if changes:
+            # The last record carries the counters (so 'stats' can read
+            # them) and the new version
+            counts = count_tasks_by_status(data)
+            version = data.get("version", 0) + 1
+            # "before" and "archived" only feed the history; replay does not need them
+            records = [
+                {
+                    key: value
+                    for key, value in change.items()
+                    if key not in ("before", "archived")
+                }
+                for change in changes
+            ]
+            written = journal.append_records(
+                journal_file, records + [journal.counts_record(counts, version)]
+            )
+            profiling.count("bytes_written", written)
+            data["version"] = version
+            changes.clear()
+        return
 
+    # Full snapshot: header first (last_id, counts), then the tasks.
+    # Internal keys (starting with "_") and holes are not persisted.
+    index = _get_index(data)
+    if index.holes:
+        index.compact()
+    snapshot = {
+        "last_id": data.get("last_id", 0),
+        "version": data.get("version", 0) + 1,
+        "counts": count_tasks_by_status(data),
+    }
+    for key, value in data.items():
+        if not key.startswith("_") and key not in snapshot:
+            snapshot[key] = value
+    snapshot["tasks"] = index.tasks
+    _check_file_format(FILE_FORMAT)
+    file_format = FILE_FORMAT or data.get("_format") or "pretty"
+    content = _encode_snapshot(snapshot, file_format)
+    profiling.count("bytes_written", len(content))
+    key = _replace_file(source.tasks_file, content)
+    data["_format"] = file_format
+    data["version"] = snapshot["version"]
+
+    # The snapshot now contains everything the journal had
+    journal.remove(journal_file)
+    if changes is not None:
+        changes.clear()
+
+    # Next load can skip decoding what we just wrote
+    if source.use_cache:
+        _write_cache(data, key, source.tasks_file)
+
+
+def _encode_snapshot(snapshot: dict, file_format: str) -> bytes:
+    """Encode the snapshot of save_tasks() with one of the FILE_FORMATS layouts."""
+    if file_format == "compact":
+        text = json.dumps(
+            snapshot, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        )
+    elif file_format == "lines":
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        header = {key: value for key, value in snapshot.items() if key != "tasks"}
+        tasks = ",\n".join([encode(task.to_dict()) for task in snapshot["tasks"]])
+        text = encode(header)[:-1] + ',"tasks":[\n' + tasks + "\n]}\n"
+    elif len(snapshot) > 1 and next(reversed(snapshot)) == "tasks" and snapshot["tasks"]:
+        # Same text as json.dumps(indent=2), which falls back to the
+        # pure-Python encoder: the tasks (nearly all of the file) are laid
+        # out from a template instead
+        # (encoded task by task: one str of the whole file would take 4 bytes
+        # per character as soon as a description has an emoji)
+        header = {key: value for key, value in snapshot.items() if key != "tasks"}
+        tasks = [_pretty_task(task).encode("utf-8") for task in snapshot["tasks"]]
+        return b"".join(
+            [
+                json.dumps(header, indent=2, ensure_ascii=False)[:-2].encode("utf-8"),
+                b',\n  "tasks": [\n',
+                b",\n".join(tasks),
+                b"\n  ]\n}",
+            ]
+        )
+    else:
+        text = json.dumps(snapshot, indent=2, ensure_ascii=False, default=_json_default)
+    return text.encode("utf-8")
+
+
+# JSON string literal of a str, as json.dumps(ensure_ascii=False) writes it
+_encode_string = json.encoder.encode_basestring
+
+# One task of a "pretty" snapshot (inside the "tasks" array)
+_PRETTY_TASK = (
+    '    {\n      "id": %d,\n      "description": %s,\n      "status": %s,\n'
+    '      "createdAt": %d,\n      "updatedAt": %d\n    }'
+)
+
+
+def _pretty_task(task: Task) -> str:
+    """Return 'task' as json.dumps(indent=2) writes it inside the snapshot."""
+    if (
+        task.extra is None
+        and type(task.id) is int
+        and type(task.description) is str
+        and type(task.status) is str
+        and type(task.createdAt) is int
+        and type(task.updatedAt) is int
+    ):
+        return _PRETTY_TASK % (
+            task.id,
+            _encode_string(task.description),
+            _encode_string(task.status),
+            task.createdAt,
+            task.updatedAt,
+        )
+    # Extra keys or unusual values: let json lay it out, one level deeper
+    text = json.dumps(task.to_dict(), indent=2, ensure_ascii=False)
+    return "    " + text.replace("\n", "\n    ")
+
+
+def _replace_file(path: str, content: bytes) -> tuple:
+    """
+    Replace 'path' with 'content' atomically and return its cache key.
+    - See fileio.atomic_write: a crash at any point leaves either the old
+      file or the new one, never a truncated one.
+    """
+    with fileio.atomic_write(path) as f:
+        f.write(content)
+        # The key needs the size and time of the written file
+        f.flush()
+        key = cache.make_key(content, os.fstat(f.fileno()))
+
+    # Make the rename itself durable (not possible on Windows)
+    if os.name == "posix":
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+    return key
+
+
+@profiling.timed("add_task")
 def add_task(data: dict, description: str) -> dict:
     """
     Add a new task to 'data' with the given description.
@@ -276,112 +2355,879 @@ def add_task(data: dict, description: str) -> dict:
     """
     # Just in case: ensure minimal structure
     last_id = data.get("last_id", 0)
-    tasks = data.get("tasks", [])
-
-    new_id = last_id + 1
-    date = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
 
-    task = {
-        "id": new_id,
-        "description": description,
-        "status": "todo",
-        "createdAt": date,
-        "updatedAt": date,
-    }
+    # The database owns last_id (other processes may have added tasks): read
+    # it inside the write transaction, so no one else can take the same id
+    store = data.get("_store")
+    if store is not None:
+        store.begin()
+        last_id = store.get_last_id()
 
-    tasks.append(task)
+    new_id = last_id + 1
+    date = timestamps.now()
+
+    if store is not None:
+        task = {
+            "id": new_id,
+            "description": description,
+            "status": "todo",
+            "createdAt": date,
+            "updatedAt": date,
+        }
+        store.insert(task)
+        store.set_last_id(new_id)
+    else:
+        task = Task(new_id, description, "todo", date, date)
+        index = _get_index(data)
+        index.tasks.append(task)
+        index.positions[new_id] = len(index.tasks) - 1
+        index.set_status(new_id, None, "todo")
+        index.size = len(index.tasks)
+        for field in timestamps.FIELDS:
+            index.time_changed(field, new_id, None, date)
 
     # Save back into the original dict
     data["last_id"] = new_id
-    data["tasks"] = tasks
+    _record_change(data, {"op": "add", "task": dict(task)})
 
     return task
 
 
+@profiling.timed("update_task")
 def update_task(data: dict, task_id: int, new_description: str) -> dict | None:
     """
     Update the description of the task with id == task_id.
-    - Search the task in data['tasks'].
+    - Find the task through the id index (or the database primary key).
     - If found, change its description and updatedAt.
     - Return the updated task (dict) if it exists.
     - Return None if no task with that id is found.
+    - The same description again changes nothing (and nothing is saved).
     """
-    tasks = data.get("tasks", [])
+    date = timestamps.now()
 
-    for task in tasks:
-        if task.get("id") == task_id:
-            task["description"] = new_description
-            task["updatedAt"] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    store = data.get("_store")
+    if store is not None:
+        task = store.get(task_id)
+        if task is None or task["description"] == new_description:
+            # No task found with that id, or nothing to change
             return task
+        before = dict(task)
+        task = store.update(task_id, description=new_description, updatedAt=date)
+    else:
+        task = _find_task(data, task_id)
+        if task is None or task.description == new_description:
+            # No task found with that id, or nothing to change
+            return task
+        before = task.to_dict()
+        _get_index(data).time_changed("updatedAt", task_id, task.updatedAt, date)
+        task.description = new_description
+        task.updatedAt = date
 
-    # No task found with that id
-    return None
+    _record_change(data, {"op": "update", "task": dict(task), "before": before})
+    return task
 
 
+@profiling.timed("delete_task")
 def delete_task(data: dict, task_id: int) -> dict | None:
     """
     Delete the task with id == task_id from data['tasks'].
     - If found and deleted, return the deleted task (dict).
     - If no task with that id exists, return None.
+    - The slot is left empty (None) instead of shifting the rest of the list;
+      holes are dropped when saving or when there are too many of them.
     """
-    tasks = data.get("tasks", [])
+    store = data.get("_store")
+    if store is not None:
+        deleted_task = store.delete(task_id)
+        if deleted_task is not None:
+            _record_change(
+                data, {"op": "delete", "id": task_id, "before": dict(deleted_task)}
+            )
+        return deleted_task
+
+    index = _get_index(data)
+    position = index.positions.pop(task_id, None)
+    if position is None:
+        # No task found with that id
+        return None
 
-    for index, task in enumerate(tasks):
-        if task.get("id") == task_id:
-            # Store the task that we are going to delete
-            deleted_task = tasks.pop(index)
-            # For clarity, reassign the list to data (same reference, but explicit)
-            data["tasks"] = tasks
-            return deleted_task
+    # Store the task that we are going to delete
+    deleted_task = index.tasks[position]
+    index.set_status(task_id, deleted_task.status, None)
+    index.tasks[position] = None
+    index.holes += 1
+    for field in timestamps.FIELDS:
+        index.time_changed(field, task_id, getattr(deleted_task, field), None)
+    if index.holes >= COMPACT_MIN_HOLES and index.holes * 2 > index.size:
+        index.compact()
 
-    # No task found with that id
-    return None
+    _record_change(data, {"op": "delete", "id": task_id, "before": deleted_task.to_dict()})
+    return deleted_task
 
 
+@profiling.timed("set_task_status")
 def set_task_status(data: dict, task_id: int, new_status: str) -> dict | None:
     """
     Change the status of the task with id == task_id.
     - new_status will be 'todo', 'in-progress' or 'done'.
     - If the task exists, update its status and updatedAt and return the task (dict).
+    - If the task already has that status, return it unchanged (nothing to save).
     - If no task with that id exists, return None.
     """
-    tasks = data.get("tasks", [])
+    date = timestamps.now()
 
-    for task in tasks:
-        if task.get("id") == task_id:
-            task["status"] = new_status
-            task["updatedAt"] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    store = data.get("_store")
+    if store is not None:
+        task = store.get(task_id)
+        if task is None or task["status"] == new_status:
+            # No task found with that id, or nothing to change
+            return task
+        before = dict(task)
+        task = store.update(task_id, status=new_status, updatedAt=date)
+    else:
+        index = _get_index(data)
+        task = _find_task(data, task_id)
+        if task is None or task.status == new_status:
+            # No task found with that id, or nothing to change
             return task
+        before = task.to_dict()
+
+        # Move the id to the bucket of its new status
+        index.set_status(task_id, task.status, new_status)
+        index.time_changed("updatedAt", task_id, task.updatedAt, date)
+
+        task.status = _SHARED_STATUSES.get(new_status, new_status)
+        task.updatedAt = date
+
+    _record_change(data, {"op": "update", "task": dict(task), "before": before})
+    return task
+
+
+def _put_task(data: dict, task: dict) -> None:
+    """
+    Make the task with task['id'] exactly 'task' (all fields, timestamps
+    included), adding it back in id order if it does not exist.
+    """
+    import bisect
+
+    task_id = task["id"]
+    store = data.get("_store")
+    if store is not None:
+        before = store.get(task_id)
+        if before is None:
+            store.insert(task)
+        else:
+            before = dict(before)
+            store.update(task_id, **{k: v for k, v in task.items() if k != "id"})
+    else:
+        index = _get_index(data)
+        current = _find_task(data, task_id)
+        if current is None:
+            before = None
+            # Rare (undo of a delete): insert in id order and rebuild the index
+            if index.holes:
+                index.compact()
+            position = bisect.bisect_left(index.tasks, task_id, key=operator.attrgetter("id"))
+            index.tasks.insert(position, Task.from_dict(task))
+            data["_index"] = _TaskIndex(index.tasks)
+        else:
+            before = current.to_dict()
+            index.set_status(task_id, current.status, task["status"])
+            for field in timestamps.FIELDS:
+                index.time_changed(field, task_id, getattr(current, field), task[field])
+            for key, value in task.items():
+                current[key] = value
+            current.status = _SHARED_STATUSES.get(current.status, current.status)
+
+    if before is None:
+        _record_change(data, {"op": "add", "task": dict(task)})
+    else:
+        _record_change(data, {"op": "update", "task": dict(task), "before": before})
+
+
+@profiling.timed("import_tasks")
+def import_tasks(data: dict, chunks) -> tuple[int, int] | None:
+    """
+    Add many new tasks at once (task-cli import).
+    - chunks: iterable of lists of validated task dicts (description, status,
+      createdAt, updatedAt), consumed one list at a time.
+    - Ids continue from last_id, in input order.
+    - Recorded as a single "import" change instead of one "add" per task:
+      save_tasks() writes it in one go (a snapshot, or one store commit).
+    - Return (first id, last id), or None if there was nothing to import.
+    """
+    store = data.get("_store")
+    last_id = store.get_last_id() if store is not None else data.get("last_id", 0)
+    first_id = last_id + 1
+    index = None if store is not None else _get_index(data)
+
+    # The chunks (and the tasks built from them) are all new objects
+    with _gc_paused():
+        for chunk in chunks:
+            ids = range(last_id + 1, last_id + 1 + len(chunk))
+            if store is not None:
+                store.insert_many(
+                    [
+                        {
+                            "id": task_id,
+                            "description": task["description"],
+                            "status": task["status"],
+                            "createdAt": task["createdAt"],
+                            "updatedAt": task["updatedAt"],
+                        }
+                        for task_id, task in zip(ids, chunk)
+                    ]
+                )
+            else:
+                start = len(index.tasks)
+                index.tasks.extend(
+                    Task(
+                        task_id,
+                        task["description"],
+                        task["status"],
+                        task["createdAt"],
+                        task["updatedAt"],
+                    )
+                    for task_id, task in zip(ids, chunk)
+                )
+                index.positions.update(zip(ids, range(start, len(index.tasks))))
+                # New ids are higher than every existing one: appending keeps
+                # the ordered lists in order
+                for task_id, task in zip(ids, chunk):
+                    status = task["status"]
+                    index.by_status[status].add(task_id)
+                    ordered = index.ordered[status]
+                    if ordered is not None:
+                        ordered.append(task_id)
+            last_id += len(chunk)
+
+    if last_id < first_id:
+        return None
+    if store is not None:
+        store.set_last_id(last_id)
+    else:
+        index.size = len(index.tasks)
+        # Rebuilt the next time a time range is asked for
+        index.by_time.clear()
+    data["last_id"] = last_id
+    _record_change(data, {"op": "import", "id": first_id, "last": last_id})
+    return first_id, last_id
+
+
+def _delete_range(data: dict, first_id: int, last_id: int) -> int:
+    """
+    Delete every task with first_id <= id <= last_id (undo of an import) as
+    one "delete-range" change. Return how many tasks were deleted.
+    """
+    deleted = 0
+    store = data.get("_store")
+    if store is not None:
+        for task_id in range(first_id, last_id + 1):
+            if store.delete(task_id) is not None:
+                deleted += 1
+    else:
+        index = _get_index(data)
+        for task_id in range(first_id, last_id + 1):
+            position = index.positions.pop(task_id, None)
+            if position is None:
+                continue
+            index.set_status(task_id, index.tasks[position].status, None)
+            index.tasks[position] = None
+            deleted += 1
+        index.holes += deleted
+        index.by_time.clear()
+        if index.holes >= COMPACT_MIN_HOLES and index.holes * 2 > index.size:
+            index.compact()
+
+    if deleted:
+        _record_change(data, {"op": "delete-range", "id": first_id, "last": last_id})
+    return deleted
+
+
+@profiling.timed("undo_last_change")
+def undo_last_change(data: dict) -> dict | None:
+    """
+    Revert the most recent save that has not been undone yet (one command,
+    or one whole batch), using the history next to the tasks file.
+    - Deleted tasks come back with their id and timestamps, changed tasks
+      get their previous fields and added (or imported) tasks are deleted.
+    - The revert is saved (and recorded) like any other change; undoing
+      again reverts the save before it.
+    - Return {"group", "changes"} or None if there is nothing to undo.
+    - Raise ValueError if that save was an archive run: its tasks live on
+      in the archive segment, so restoring them would count them twice.
+      Undo stops there (older saves cannot be undone either).
+    """
+    from task_tracker_cli import history
+
+    last = history.last_undoable(history.history_path(_data_source(data).tasks_file))
+    if last is None:
+        return None
+    group, events = last
+    if any(event["op"] == "archive" for event in events):
+        raise ValueError("the last change was an archive run, which cannot be undone")
+    affected = 0
+    for event in reversed(events):
+        if event["op"] == "import":
+            affected += _delete_range(data, event["id"], event["last"])
+            continue
+        if event["op"] == "add":
+            # Already gone (deleted outside the history): nothing to revert
+            if delete_task(data, event["id"]) is not None:
+                affected += 1
+        else:
+            _put_task(data, event["before"])
+            affected += 1
+    data["_undoes"] = group
+    return {"group": group, "changes": affected}
+
+
+def _archived_tasks(status: str, source: TasksSource | None = None):
+    """
+    Return an iterator over the archived tasks (id order) if a list with
+    'status' should include them, or None (no archive, or not done/all).
+    """
+    if status not in ("done", "all"):
+        return None
+    from task_tracker_cli import archive
+
+    path = archive.archive_path(_source(source).tasks_file)
+    if not os.path.isdir(path):
+        return None
+    return archive.iter_tasks(path)
+
+
+def _merge_archived(tasks, archived):
+    """
+    Merge two id-ordered streams of tasks lazily.
+    - A task in both (archive interrupted before the tasks file was saved)
+      is yielded once, from 'tasks'.
+    """
+    import heapq
+
+    previous = None
+    for task in heapq.merge(tasks, archived, key=operator.itemgetter("id")):
+        if task["id"] != previous:
+            yield task
+        previous = task["id"]
+
 
-    # No task found with that id
-    return None
+@profiling.timed("archive_tasks")
+def archive_tasks(data: dict, older_than: int | None = None) -> list[dict]:
+    """
+    Move done tasks out of 'data' into a new archive segment.
+    - older_than: only tasks last updated before this timestamp (None: all
+      done tasks).
+    - The segment is written before the tasks leave 'data', so an
+      interruption can leave a task in both places (listed once) but never
+      loses one.
+    - Return the archived tasks.
+    """
+    from task_tracker_cli import archive
 
+    index = _get_index(data)
+    tasks = [
+        index.tasks[index.positions[task_id]]
+        for task_id in index.ids_with_status("done")
+    ]
+    if older_than is not None:
+        tasks = [
+            task
+            for task in tasks
+            if isinstance(task.updatedAt, int) and task.updatedAt < older_than
+        ]
 
-def list_tasks_by_status(data: dict, status: str) -> list[dict]:
+    if tasks:
+        archive.write_segment(
+            archive.archive_path(_data_source(data).tasks_file),
+            [task.to_dict() for task in tasks],
+        )
+        changes = data.get("_changes")
+        for task in tasks:
+            delete_task(data, task.id)
+            if changes:
+                # Recorded as "archive" in the history (see undo_last_change())
+                changes[-1]["archived"] = True
+    return tasks
+
+
+@profiling.timed("list_tasks_by_status")
+def list_tasks_by_status(
+    data: dict, status: str, offset: int = 0, limit: int | None = None
+) -> list[dict]:
     """
     Return a list of tasks filtered by status.
     - status can be: 'todo', 'in-progress', 'done' or 'all'.
     - If 'all', return all tasks.
-    - Otherwise, return only tasks with that status.
+    - Otherwise, return only tasks with that status, read from the status
+      bucket of the index (ordered by id) instead of filtering every task.
+    - offset/limit select a page of the result (skip 'offset' tasks, then
+      return at most 'limit'); only that page is built.
     """
-    tasks = data.get("tasks", [])
+    stop = None if limit is None else offset + limit
+
+    store = data.get("_store")
+    if store is not None:
+        return store.list_by_status(status, offset, limit)
+
+    index = _get_index(data)
+    archived = _archived_tasks(status, _data_source(data))
 
     if status == "all":
-        # Return a copy so callers don’t accidentally modify the internal list
-        return list(tasks)
+        # Every live task, in id order, skipping the holes left by deletes
+        live = (task for task in index.tasks if task is not None)
+    elif archived is None:
+        bucket = index.ids_with_status(status)[offset:stop]
+        return [index.tasks[index.positions[task_id]] for task_id in bucket]
+    else:
+        bucket = index.ids_with_status(status)
+        live = (index.tasks[index.positions[task_id]] for task_id in bucket)
+
+    if archived is not None:
+        live = _merge_archived(live, archived)
+    return list(itertools.islice(live, offset, stop))
+
+
+@profiling.timed("list_tasks_as_of")
+def list_tasks_as_of(
+    moment: int,
+    status: str = "all",
+    offset: int = 0,
+    limit: int | None = None,
+    source: TasksSource | None = None,
+) -> list[dict] | None:
+    """
+    Return the tasks as they were at 'moment' (a stored timestamp), by id,
+    rebuilt from the history (nearest snapshot + the events after it).
+    - Archived tasks are not included: they left the file when archived.
+    - Return None if the history starts after 'moment'.
+    - source: which tasks (default: the module settings, see TasksSource).
+    """
+    from task_tracker_cli import history
+
+    tasks = history.tasks_as_of(history.history_path(_source(source).tasks_file), moment)
+    if tasks is None:
+        return None
+    if status != "all":
+        tasks = [task for task in tasks if task["status"] == status]
+    end = None if limit is None else offset + limit
+    return tasks[offset:end]
+
+
+@profiling.timed("task_history")
+def task_history(task_id: int, source: TasksSource | None = None) -> list[dict]:
+    """Return the history events of one task, oldest first (see history.py)."""
+    from task_tracker_cli import history
+
+    return history.task_events(history.history_path(_source(source).tasks_file), task_id)
+
+
+def _task_status(data: dict, task_id: int) -> str | None:
+    """Return the status of a task (None if it does not exist)."""
+    store = data.get("_store")
+    task = store.get(task_id) if store is not None else _find_task(data, task_id)
+    return None if task is None else task.get("status")
+
+
+@profiling.timed("select_task_ids")
+def select_task_ids(
+    data: dict,
+    ranges: list[tuple[int, int]] | None = None,
+    status: str | None = None,
+    before: int | None = None,
+) -> list[int]:
+    """
+    Return the ids (ascending) of the tasks that match every given criterion:
+    - ranges: (first, last) id ranges, inclusive; a single id is (id, id)
+    - status: only tasks with this status
+    - before: only tasks created before this timestamp
+    Criteria left empty/None do not filter. The candidates are taken from
+    the smallest source (the ranges, the status bucket or all tasks) and
+    checked in a single pass.
+    """
+    import bisect
+
+    merged = []
+    for first, last in sorted(ranges or ()):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+
+    store = data.get("_store")
+    if store is not None:
+        return store.select_ids(merged, status, before)
+
+    index = _get_index(data)
+    span = sum(last - first + 1 for first, last in merged)
+    if merged and span <= len(index.positions):
+        candidates = (
+            task_id
+            for first, last in merged
+            for task_id in range(first, last + 1)
+            if task_id in index.positions
+        )
+    elif status is not None:
+        candidates = index.by_status.get(status, ())
+    else:
+        candidates = index.positions
+
+    starts = [first for first, _ in merged]
+    selected = []
+    for task_id in candidates:
+        if merged:
+            i = bisect.bisect_right(starts, task_id) - 1
+            if i < 0 or task_id > merged[i][1]:
+                continue
+        task = index.tasks[index.positions[task_id]]
+        if status is not None and task.status != status:
+            continue
+        if before is not None:
+            created = task.createdAt
+            if not isinstance(created, int) or created >= before:
+                continue
+        selected.append(task_id)
+
+    selected.sort()
+    return selected
+
+
+# list --sort value -> task field
+_SORT_FIELDS = {"created": "createdAt", "updated": "updatedAt"}
+
+
+@profiling.timed("list_tasks_by_time")
+def list_tasks_by_time(
+    data: dict,
+    status: str,
+    field: str = "updatedAt",
+    since: int | None = None,
+    until: int | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> list[dict]:
+    """
+    Return the tasks with since <= field <= until, ordered by that field.
+    - field is 'createdAt' or 'updatedAt'; since/until are stored timestamps
+      (None means no bound).
+    - status filters the result like in list_tasks_by_status().
+    - The range comes from a binary search over the sorted time index, so
+      only the tasks inside it are visited; offset/limit select a page.
+    """
+    import heapq
+
+    stop = None if limit is None else offset + limit
+
+    store = data.get("_store")
+    if store is not None:
+        return store.list_by_time(field, status, since, until, offset, limit)
+
+    index = _get_index(data)
+    tasks = index.time_index(field).entries(index, since, until)
+    if status != "all":
+        tasks = (task for task in tasks if task.status == status)
+
+    # Archived tasks are not in the time index: filter and sort them here
+    archived = _archived_tasks(status, _data_source(data))
+    if archived is not None:
+        matches = sorted(
+            (
+                task
+                for task in archived
+                if isinstance(task.get(field), int)
+                and (since is None or task[field] >= since)
+                and (until is None or task[field] <= until)
+            ),
+            key=operator.itemgetter(field),
+        )
+        tasks = heapq.merge(tasks, matches, key=operator.itemgetter(field))
+
+    return list(itertools.islice(tasks, offset, stop))
+
+
+@profiling.timed("search_tasks")
+def search_tasks(
+    words: list[str],
+    status: str = "all",
+    limit: int | None = None,
+    source: TasksSource | None = None,
+) -> list[dict]:
+    """
+    Return the tasks whose description contains every word of the query.
+    - A word ending in '*' matches as a prefix; status filters like in list.
+    - Answered from the on-disk index (tasks file + ".search"): only the
+      buckets of the query words and of the matching tasks are read.
+    - The index is (re)built from all tasks if it is missing or does not
+      match the current tasks file.
+    - source: which tasks (default: the module settings, see TasksSource).
+    """
+    from task_tracker_cli import search
+
+    source = _source(source)
+    store = _open_store(source) if source.storage in STORE_MODES else None
+    try:
+        path = search.index_path(source.tasks_file)
+        stamp = _search_stamp(store, source)
+
+        if search.read_stamp(path) != stamp:
+            if store is not None:
+                tasks = store.list_by_status("all")
+            else:
+                tasks = _live_tasks(_load_json_tasks(source)["tasks"])
+            search.build(path, tasks, stamp)
+    finally:
+        if store is not None:
+            store.close()
+
+    return search.query(path, search.parse_query(words), status, limit)
+
+
+def stream_tasks_by_status(
+    status: str,
+    offset: int = 0,
+    limit: int | None = None,
+    use_cache: bool = True,
+    source: TasksSource | None = None,
+):
+    """
+    Like list_tasks_by_status(), but read lazily from the tasks file: return an
+    iterator that decodes one task at a time, so memory does not grow with
+    the size of the file.
+    - Return None if the file cannot be streamed (SQLite storage, pending
+      journal, missing file or unexpected layout) or if the parsed-state
+      cache can be used instead (unless use_cache is False); use
+      load_tasks() then.
+    - The cache holds every task, so it is only used for the whole list or
+      for a page of a file of at most CACHED_PAGE_MAX_BYTES (load_tasks()
+      still checks that it matches the file).
+    - source: which tasks (default: the module settings, see TasksSource).
+    """
+    source = _source(source)
+    tasks_file = source.tasks_file
+    if source.storage in STORE_MODES or not os.path.exists(tasks_file):
+        return None
+    if (
+        use_cache
+        and source.use_cache
+        and os.path.exists(cache.cache_path(tasks_file))
+        and (limit is None or os.path.getsize(tasks_file) <= CACHED_PAGE_MAX_BYTES)
+    ):
+        # A warm cache loads faster than decoding the file task by task
+        return None
+    if os.path.exists(journal.journal_path(tasks_file)):
+        # The journal has to be replayed on top of the file
+        return None
+    if reader.read_header(tasks_file) is None:
+        return None
+
+    tasks = reader.iter_tasks(tasks_file)
+    if status != "all":
+        tasks = (task for task in tasks if task.get("status") == status)
+    archived = _archived_tasks(status, source)
+    if archived is not None:
+        tasks = _merge_archived(tasks, archived)
+    stop = None if limit is None else offset + limit
+    return itertools.islice(tasks, offset, stop)
+
+
+def iter_tasks_by_status(status: str, source: TasksSource | None = None):
+    """
+    Yield the tasks with 'status' ('all' for every task) in id order, holding
+    as few of them in memory as the storage allows (task-cli export).
+    - "sqlite" and "sharded": read from the store row by row / shard by shard.
+    - "json" and "journal": decoded one at a time from the file (even if
+      the cache is warm: loading it means holding every task), archived
+      tasks merged in; a pending journal has to be replayed, so then the
+      tasks are loaded as usual.
+    """
+    source = _source(source)
+    if source.storage in STORE_MODES:
+        store = _open_store(source)
+        try:
+            yield from store.iter_by_status(status)
+        finally:
+            store.close()
+        return
+
+    tasks = stream_tasks_by_status(status, use_cache=False, source=source)
+    if tasks is None:
+        tasks = list_tasks_by_status(load_tasks(source), status)
+    yield from tasks
+
+
+@profiling.timed("count_tasks_by_status")
+def count_tasks_by_status(data: dict) -> dict[str, int]:
+    """
+    Return the number of tasks per status, e.g. {"todo": 3, "in-progress": 1, "done": 7}.
+    - Statuses are always present (with 0), other statuses are appended if used.
+    """
+    store = data.get("_store")
+    if store is not None:
+        counts = {status: 0 for status in STATUSES}
+        counts.update(store.count_by_status())
+        return counts
+
+    index = _get_index(data)
+    return {
+        status: len(ids)
+        for status, ids in index.by_status.items()
+        if ids or status in STATUSES
+    }
+
+
+def _add_archived_counts(
+    counts: dict[str, int], source: TasksSource | None = None
+) -> dict[str, int]:
+    """Add the archived tasks (all done) to per-status counters."""
+    from task_tracker_cli import archive
+
+    path = archive.archive_path(_source(source).tasks_file)
+    if os.path.isdir(path):
+        counts["done"] = counts.get("done", 0) + archive.archived_count(path)
+    return counts
+
+
+def read_task_counts(source: TasksSource | None = None) -> dict[str, int] | None:
+    """
+    Return the per-status counters persisted on disk, without loading tasks.
+    - Counters come from the last journal record if there is a journal,
+      otherwise from the header of the tasks file.
+    - Return None if they are not available (old file format, torn journal).
+    - In "sqlite" and "sharded" modes they come from the store (status
+      index or shard manifest).
+    - source: which tasks (default: the module settings, see TasksSource).
+    """
+    source = _source(source)
+    if source.storage in STORE_MODES:
+        data = load_tasks(source)
+        try:
+            return count_tasks_by_status(data)
+        finally:
+            close_tasks(data)
 
-    # Filter by status value
-    filtered = [task for task in tasks if task.get("status") == status]
-    return filtered
+    tasks_file = source.tasks_file
+    journal_file = journal.journal_path(tasks_file)
+    if os.path.exists(journal_file):
+        return journal.read_counts(journal_file)
+
+    if not os.path.exists(tasks_file):
+        return {status: 0 for status in STATUSES}
+
+    header = reader.read_header(tasks_file)
+    if header is None:
+        return None
+    return header.get("counts")
 
 
 # ===== CLI LAYER: parser construction =====
+def _type_error(message: str) -> Exception:
+    """Return the error an argparse type function raises (argparse is loaded by then)."""
+    import argparse
+
+    return argparse.ArgumentTypeError(message)
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise _type_error(f"must be 0 or greater, got {value}")
+    return number
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise _type_error(f"must be 1 or greater, got {value}")
+    return number
+
+
+def _since(value: str) -> int:
+    try:
+        return timestamps.parse(value)
+    except ValueError as error:
+        raise _type_error(str(error)) from None
+
+
+def _until(value: str) -> int:
+    try:
+        # A date alone includes the whole day
+        return timestamps.parse(value, end_of_day=True)
+    except ValueError as error:
+        raise _type_error(str(error)) from None
+
+
+def _id_range(value: str) -> tuple[int, int]:
+    """Parse '7' into (7, 7) and '100-250' into (100, 250)."""
+    first, _, last = value.partition("-")
+    try:
+        first_id = int(first)
+        last_id = int(last) if last else first_id
+    except ValueError:
+        raise _type_error(
+            f"expected an id or a range like 100-250, got {value}"
+        ) from None
+    if first_id < 1 or last_id < first_id:
+        raise _type_error(f"invalid id range {value}")
+    return first_id, last_id
+
+
+def _add_selection_arguments(parser: argparse.ArgumentParser, action: str) -> None:
+    """Add the ids / ranges / filters shared by delete and mark-*."""
+    parser.add_argument(
+        "ids",
+        nargs="*",
+        type=_id_range,
+        help=f"Task IDs or ranges (e.g. 7 12 100-250) to {action}",
+    )
+    parser.add_argument(
+        "--status",
+        choices=STATUSES,
+        default=None,
+        help="Only tasks with this status",
+    )
+    parser.add_argument(
+        "--before",
+        type=_since,
+        default=None,
+        help="Only tasks created before this date (YYYY-MM-DD[ HH:MM[:SS]], DD/MM/YYYY or epoch seconds)",
+    )
+
+
+def _add_format_argument(parser: argparse.ArgumentParser) -> None:
+    """Add --format (table or one of the machine-readable OUTPUT_FORMATS)."""
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="table (default), or json / ndjson / csv / ids written as they are "
+        "produced, without the table layout",
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="task-cli",
         description="A CLI application to efficiently manage your tasks",
     )
 
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase timings (JSON) to stderr; same as TASK_CLI_TRACE=1",
+    )
+    parser.add_argument(
+        "--profile-dump",
+        metavar="FILE",
+        help="Run the command under cProfile and save the stats to FILE",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the parsed-state cache (tasks.json.cache)",
+    )
+
     # GROUP OF SUBCOMMANDS (add, update, delete, etc.)
     subparsers = parser.add_subparsers(
         dest="command",  # name of the chosen subcommand will be stored here
@@ -401,6 +3247,7 @@ def build_parser() -> argparse.ArgumentParser:
         type=str,
         help="Task description",
     )
+    _add_format_argument(add_parser)
     # associate this subcommand with its handler cmd_add
     add_parser.set_defaults(func=cmd_add)
 
@@ -421,6 +3268,7 @@ def build_parser() -> argparse.ArgumentParser:
         type=str,
         help="New description for the task",
     )
+    _add_format_argument(update_parser)
     update_parser.set_defaults(func=cmd_update)
 
     # ---------- task-cli delete 1 ----------
@@ -428,11 +3276,8 @@ def build_parser() -> argparse.ArgumentParser:
         "delete",
         help="Delete a task",
     )
-    delete_parser.add_argument(
-        "id",
-        type=int,
-        help="Task ID to delete",
-    )
+    _add_selection_arguments(delete_parser, "delete")
+    _add_format_argument(delete_parser)
     delete_parser.set_defaults(func=cmd_delete)
 
     # ---------- task-cli mark-in-progress 1 ----------
@@ -440,11 +3285,8 @@ def build_parser() -> argparse.ArgumentParser:
         "mark-in-progress",
         help="Mark a task as in progress",
     )
-    mip_parser.add_argument(
-        "id",
-        type=int,
-        help="Task ID to mark as in progress",
-    )
+    _add_selection_arguments(mip_parser, "mark as in progress")
+    _add_format_argument(mip_parser)
     mip_parser.set_defaults(func=cmd_mark_in_progress)
 
     # ---------- task-cli mark-done 1 ----------
@@ -452,11 +3294,8 @@ def build_parser() -> argparse.ArgumentParser:
         "mark-done",
         help="Mark a task as done",
     )
-    md_parser.add_argument(
-        "id",
-        type=int,
-        help="Task ID to mark as done",
-    )
+    _add_selection_arguments(md_parser, "mark as done")
+    _add_format_argument(md_parser)
     md_parser.set_defaults(func=cmd_mark_done)
 
     # ---------- task-cli list [status] ----------
@@ -472,17 +3311,451 @@ def build_parser() -> argparse.ArgumentParser:
         default="all",
         help="Filter tasks by status (todo, in-progress, done, all)",
     )
+    list_parser.add_argument(
+        "--since",
+        type=_since,
+        default=None,
+        help="Only tasks created/updated (see --sort) at or after this date "
+        "(YYYY-MM-DD[ HH:MM[:SS]], DD/MM/YYYY or epoch seconds)",
+    )
+    list_parser.add_argument(
+        "--until",
+        type=_until,
+        default=None,
+        help="Only tasks created/updated (see --sort) at or before this date",
+    )
+    list_parser.add_argument(
+        "--as-of",
+        type=_until,
+        default=None,
+        metavar="DATE",
+        help="List the tasks as they were at this date (from the history; "
+        "not with --sort/--since/--until)",
+    )
+    list_parser.add_argument(
+        "--sort",
+        choices=list(_SORT_FIELDS),
+        default=None,
+        help="Order by creation or last update time; --since/--until apply to "
+        "this field (default with --since/--until: updated; otherwise id order)",
+    )
+    list_parser.add_argument(
+        "--offset",
+        type=_non_negative_int,
+        default=0,
+        help="Skip this many tasks before printing",
+    )
+    list_parser.add_argument(
+        "--limit",
+        type=_non_negative_int,
+        default=None,
+        help="Print at most this many tasks",
+    )
+    list_parser.add_argument(
+        "--page-size",
+        type=_positive_int,
+        default=PAGE_SIZE,
+        help=f"Rows rendered at a time; column widths come from the first page (default: {PAGE_SIZE})",
+    )
+    list_parser.add_argument(
+        "--max-width",
+        type=_non_negative_int,
+        default=None,
+        help="Truncate descriptions so the table fits this width (default: terminal width, 0: no limit)",
+    )
+    _add_format_argument(list_parser)
     list_parser.set_defaults(func=cmd_list)
 
+    # ---------- task-cli stats ----------
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Show how many tasks there are per status",
+    )
+    stats_parser.set_defaults(func=cmd_stats)
+
+    # ---------- task-cli history 1 ----------
+    history_parser = subparsers.add_parser(
+        "history",
+        help="Show every change made to a task",
+    )
+    history_parser.add_argument("id", type=int, help="ID of the task")
+    history_parser.add_argument(
+        "--max-width",
+        type=_non_negative_int,
+        default=None,
+        help="Truncate descriptions so the table fits this width (default: terminal width, 0: no limit)",
+    )
+    history_parser.set_defaults(func=cmd_history)
+
+    # ---------- task-cli http --port 8080 ----------
+    http_parser = subparsers.add_parser(
+        "http",
+        help="Serve the tasks as a local HTTP/JSON API (keeps them in memory)",
+    )
+    http_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on (default: 127.0.0.1, this machine only)",
+    )
+    http_parser.add_argument(
+        "--port",
+        type=_non_negative_int,
+        default=8080,
+        help="Port to listen on (default: 8080; 0 picks a free one)",
+    )
+    http_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=8,
+        help="Threads serving connections; keep-alive connections hold one each (default: 8)",
+    )
+    http_parser.set_defaults(func=cmd_http)
+
+    # ---------- task-cli undo ----------
+    undo_parser = subparsers.add_parser(
+        "undo",
+        help="Revert the last change (one command or one whole batch)",
+    )
+    undo_parser.set_defaults(func=cmd_undo)
+
+    # ---------- task-cli search "buy milk" ----------
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Find tasks whose description contains all the given words",
+    )
+    search_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Words to look for (all must match); end a word with * to match a prefix",
+    )
+    search_parser.add_argument(
+        "--status",
+        choices=["todo", "in-progress", "done", "all"],
+        default="all",
+        help="Only tasks with this status (default: all)",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=_non_negative_int,
+        default=None,
+        help="Print at most this many tasks",
+    )
+    search_parser.add_argument(
+        "--max-width",
+        type=_non_negative_int,
+        default=None,
+        help="Truncate descriptions so the table fits this width (default: terminal width, 0: no limit)",
+    )
+    search_parser.set_defaults(func=cmd_search)
+
+    # ---------- task-cli archive [--older-than DAYS] ----------
+    archive_parser = subparsers.add_parser(
+        "archive",
+        help="Move done tasks to compressed archive files (still shown by list done/all)",
+    )
+    archive_parser.add_argument(
+        "--older-than",
+        type=_non_negative_int,
+        default=None,
+        metavar="DAYS",
+        help="Only tasks marked done (last updated) more than DAYS days ago",
+    )
+    archive_parser.set_defaults(func=cmd_archive)
+
+    # ---------- task-cli batch [FILE] ----------
+    # one command per line, same syntax as the CLI (e.g. add "Buy milk")
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run many commands (one per line) with a single load and save",
+    )
+    batch_parser.add_argument(
+        "file",
+        nargs="?",  # optional
+        default="-",
+        help="File with one command per line (default: '-' for stdin)",
+    )
+    batch_parser.set_defaults(func=cmd_batch)
+
+    # ---------- task-cli export --format ndjson ----------
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Write every task as NDJSON or CSV (streamed, for other tools or 'import')",
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default="ndjson",
+        help="ndjson: one JSON object per line (default); csv: header row + one row per task",
+    )
+    export_parser.add_argument(
+        "--status",
+        choices=["todo", "in-progress", "done", "all"],
+        default="all",
+        help="Only tasks with this status (default: all)",
+    )
+    export_parser.add_argument(
+        "--output",
+        default="-",
+        help="File to write (default: '-' for stdout)",
+    )
+    export_parser.set_defaults(func=cmd_export)
+
+    # ---------- task-cli import tasks.ndjson ----------
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Add the tasks of an NDJSON or CSV file with new ids, in a single write",
+    )
+    import_parser.add_argument(
+        "file",
+        help="File to read ('-' for stdin)",
+    )
+    import_parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default=None,
+        help="Format of the file (default: csv for *.csv files, ndjson otherwise)",
+    )
+    import_parser.set_defaults(func=cmd_import)
+
+    # ---------- task-cli migrate ----------
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Copy the tasks of the JSON file into a SQLite database (tasks.db) or shard files",
+    )
+    migrate_parser.add_argument(
+        "--to",
+        choices=list(STORE_MODES),
+        default="sqlite",
+        help="Target storage: sqlite (tasks.db, default) or sharded (tasks.shards/)",
+    )
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    # ---------- task-cli gen-fixture --count 100000 ----------
+    fixture_parser = subparsers.add_parser(
+        "gen-fixture",
+        help="Write a synthetic tasks file (for benchmarks and testing)",
+    )
+    fixture_parser.add_argument(
+        "--count",
+        type=_non_negative_int,
+        required=True,
+        help="Number of tasks to generate",
+    )
+    fixture_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed; the same seed always gives the same tasks (default: 0)",
+    )
+    fixture_parser.add_argument(
+        "--output",
+        help="File to write (default: the tasks file)",
+    )
+    fixture_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Replace the file if it already exists",
+    )
+    fixture_parser.set_defaults(func=cmd_gen_fixture)
+
+    # ---------- task-cli serve ----------
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Keep tasks in memory and answer other task-cli calls over a local socket",
+    )
+    serve_parser.set_defaults(func=cmd_serve)
+
     return parser
 
 
+def _forward_to_daemon(argv: list[str]) -> bool:
+    """
+    Run the command through 'task-cli serve' if it is running.
+    - Return False if there is no daemon, so main() handles the command itself.
+    """
+    if not argv or argv[0] not in DAEMON_COMMANDS:
+        return False
+
+    from task_tracker_cli import daemon
+
+    response = daemon.forward(daemon.socket_path(TASKS_FILE), argv)
+    if response is None:
+        return False
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    if response["code"]:
+        sys.exit(response["code"])
+    return True
+
+
+# Handlers of the commands that _fast_parse() recognizes
+_FAST_COMMANDS = {
+    "add": cmd_add,
+    "update": cmd_update,
+    "delete": cmd_delete,
+    "mark-in-progress": cmd_mark_in_progress,
+    "mark-done": cmd_mark_done,
+    "list": cmd_list,
+    "stats": cmd_stats,
+    "undo": cmd_undo,
+}
+
+
+def _fast_parse(argv: list[str]) -> types.SimpleNamespace | None:
+    """
+    Recognize the everyday forms of the common commands straight from argv,
+    with the same attributes build_parser() would give them:
+        add DESCRIPTION / update ID DESCRIPTION
+        delete | mark-in-progress | mark-done ID [ID...]
+        list [STATUS] / stats / undo
+    (all but stats and undo also with --format FORMAT)
+    - Return None for anything else (other options, ranges, --help,
+      errors): the full parser handles it and reports errors as usual.
+    """
+    if not argv or argv[0] not in _FAST_COMMANDS:
+        return None
+    command, operands = argv[0], argv[1:]
+    output_format = "table"
+    if "--format" in operands and command not in ("stats", "undo"):
+        position = operands.index("--format")
+        value = operands[position + 1 : position + 2]
+        if not value or value[0] not in OUTPUT_FORMATS:
+            return None
+        output_format = value[0]
+        operands = operands[:position] + operands[position + 2 :]
+    if any(operand.startswith("-") for operand in operands):
+        return None
+
+    args = types.SimpleNamespace(
+        profile=False,
+        profile_dump=None,
+        no_cache=False,
+        command=command,
+        func=_FAST_COMMANDS[command],
+    )
+    if command == "add" and len(operands) == 1:
+        args.description = operands[0]
+    elif command == "update" and len(operands) == 2 and operands[0].isdecimal():
+        args.id = int(operands[0])
+        args.description = operands[1]
+    elif command in BULK_COMMANDS and operands:
+        if not all(operand.isdecimal() and int(operand) > 0 for operand in operands):
+            return None
+        args.ids = [(int(operand), int(operand)) for operand in operands]
+        args.status = None
+        args.before = None
+    elif command == "list" and len(operands) <= 1:
+        status = operands[0] if operands else "all"
+        if status != "all" and status not in STATUSES:
+            return None
+        args.status = status
+        args.since = None
+        args.until = None
+        args.as_of = None
+        args.sort = None
+        args.offset = 0
+        args.limit = None
+        args.page_size = PAGE_SIZE
+        args.max_width = None
+    elif command in ("stats", "undo") and not operands:
+        return args
+    else:
+        return None
+    args.format = output_format
+    return args
+
+
+def _trace_enabled() -> bool:
+    return os.environ.get("TASK_CLI_TRACE", "") not in ("", "0")
+
+
+def _emit_trace(
+    started: float,
+    command: list[str],
+    phases: dict[str, float] | None = None,
+    recorder: profiling.Recorder | None = None,
+) -> None:
+    """
+    Write the per-phase timings of this run to stderr as one JSON line.
+    - 'started' is the perf_counter() value when main() began.
+    - 'phases' ({name: seconds}) is only recorded when tracing is enabled.
+    """
+    if recorder is None:
+        if not _trace_enabled():
+            return
+        recorder = profiling.Recorder()
+        for name, seconds in (phases or {}).items():
+            recorder.record(name, seconds)
+
+    # Interpreter start + imports: process age minus the time spent in main()
+    age = profiling.process_age()
+    startup = None if age is None else max(0.0, age - (time.perf_counter() - started))
+    report = {
+        "command": command[0] if command else None,
+        "startup_ms": None if startup is None else round(startup * 1000, 3),
+        "phases": recorder.report(),
+    }
+    print(json.dumps(report), file=sys.stderr)
+
+
 def main():
-    parser = build_parser()
-    args = parser.parse_args()
+    # Unknown settings stop here, before anything is read or written
+    try:
+        _check_settings()
+    except SettingsError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    # Fast path: a running daemon already has the tasks loaded
+    started = time.perf_counter()
+    argv = sys.argv[1:]
+    if _forward_to_daemon(argv):
+        _emit_trace(started, argv[:1], {"daemon": time.perf_counter() - started})
+        return
+
+    # Common commands skip argparse; the full parser is only built for the
+    # rest (options, --help, errors)
+    parsed = None
+    args = _fast_parse(argv)
+    if args is None:
+        build_parser_started = time.perf_counter()
+        parser = build_parser()
+        parsed = time.perf_counter()
+        args = parser.parse_args(argv)
+
+    if args.no_cache:
+        global USE_CACHE
+        USE_CACHE = False
+
+    # Per-phase timings (--profile / TASK_CLI_TRACE)
+    recorder = None
+    if args.profile or _trace_enabled():
+        recorder = profiling.Recorder()
+        if parsed is not None:
+            recorder.record("build_parser", parsed - build_parser_started)
+        recorder.record("parse_args", time.perf_counter() - (parsed or started))
+        profiling.add_hook(recorder.record)
 
     # args.func comes from the set_defaults() of the selected subcommand
-    args.func(args)
+    try:
+        if args.profile_dump:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.runcall(args.func, args)
+            profiler.dump_stats(args.profile_dump)
+        else:
+            args.func(args)
+    except TasksFileError as error:
+        # Never continue (and save) on top of a file that could not be read
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    if recorder is not None:
+        profiling.remove_hook(recorder.record)
+        recorder.record("command", time.perf_counter() - started)
+        _emit_trace(started, [args.command], recorder=recorder)
 
 
 if __name__ == "__main__":
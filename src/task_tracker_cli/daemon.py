@@ -0,0 +1,191 @@
+"""
+Unix socket transport for 'task-cli serve'.
+
+The daemon keeps the tasks loaded in memory; the regular 'task-cli' command
+sends its arguments over a local socket and prints what the daemon answers.
+
+Protocol (one JSON line each way):
+
+    request:  {"argv": ["mark-done", "42"]}
+    response: {"code": 0, "stdout": "...", "stderr": "..."}
+
+Every 'task-cli' run checks for a daemon, so importing this module stays
+cheap: the socket modules are imported only once a socket file exists (or
+by the server).
+"""
+
+import contextlib
+import json
+import os
+from collections.abc import Callable
+
+
+SOCKET_SUFFIX = ".sock"
+
+# Seconds the client waits to connect before falling back to the file
+CLIENT_TIMEOUT = 30.0
+
+# handle(argv) -> (exit code, stdout text, stderr text)
+Handler = Callable[[list[str]], tuple[int, str, str]]
+
+
+def socket_path(tasks_file: str) -> str:
+    """Return the path of the socket that serves 'tasks_file'."""
+    return os.path.abspath(tasks_file) + SOCKET_SUFFIX
+
+
+def is_supported() -> bool:
+    """Unix domain sockets are not available on every platform (e.g. Windows)."""
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+def _failed(message: str) -> dict:
+    """Response reported when the daemon took the request but gave no valid answer."""
+    return {
+        "code": 1,
+        "stdout": "",
+        "stderr": f"Error: {message}; the command may or may not have been applied.\n",
+    }
+
+
+def forward(path: str, argv: list[str]) -> dict | None:
+    """
+    Send 'argv' to the daemon listening on 'path' and return its response.
+    - Return None if no daemon accepts the connection, so the caller can
+      fall back to reading the file directly.
+    - Once the request is sent the daemon may have applied it: a missing or
+      invalid answer is reported as an error response, never as None (the
+      caller would run the command a second time).
+    """
+    if not os.path.exists(path) or not is_supported():
+        return None
+
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.settimeout(CLIENT_TIMEOUT)
+            client.connect(path)
+        except OSError:
+            # Stale socket file (daemon died) or daemon not accepting connections
+            return None
+
+        # The command may take long (e.g. a big list): wait as long as the
+        # daemon is alive; if it dies the connection closes
+        try:
+            client.settimeout(None)
+            client.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+        except OSError as error:
+            return _failed(f"lost the connection to the daemon ({error})")
+
+    if not line:
+        return _failed("the daemon closed the connection without answering")
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return _failed("the daemon sent an invalid answer")
+    if not isinstance(response, dict) or not {"code", "stdout", "stderr"} <= response.keys():
+        return _failed("the daemon sent an invalid answer")
+    return response
+
+
+def _is_listening(path: str) -> bool:
+    """Return True if something accepts connections on the socket at 'path'."""
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+    except OSError:
+        return False
+    return True
+
+
+def _make_server(path: str, handle_argv: Handler):
+    """Create the threaded Unix socket server that answers with handle_argv(argv)."""
+    import socketserver
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                argv = json.loads(line)["argv"]
+            except (ValueError, KeyError, TypeError):
+                response = {"code": 2, "stdout": "", "stderr": "Error: invalid request.\n"}
+            else:
+                code, stdout, stderr = handle_argv(argv)
+                response = {"code": code, "stdout": stdout, "stderr": stderr}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    return Server(path, RequestHandler)
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+@contextlib.contextmanager
+def stop_on_sigterm():
+    """
+    Turn SIGTERM into KeyboardInterrupt while the block runs, so a server
+    stops cleanly on 'kill' too, not only on Ctrl+C (used by 'serve' and 'http').
+    - Only the main thread may set signal handlers: in any other thread (a
+      server started by a test) this does nothing.
+    """
+    import signal
+    import threading
+
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    previous = signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def serve(path: str, handle_argv: Handler) -> None:
+    """
+    Listen on 'path' and answer every request with handle_argv(argv).
+    - Requests are accepted on separate threads; handle_argv is responsible
+      for serializing access to the tasks.
+    - Raise RuntimeError if another daemon is already serving 'path'.
+    - Runs until interrupted (Ctrl+C or SIGTERM); the socket file is removed on exit.
+    """
+    if not is_supported():
+        raise RuntimeError("Unix domain sockets are not supported on this platform.")
+
+    if os.path.exists(path):
+        if _is_listening(path):
+            raise RuntimeError(f"a daemon is already listening on {path}.")
+        # Left behind by a daemon that did not exit cleanly
+        os.remove(path)
+
+    # Only the current user may talk to the daemon (socket created as 0600)
+    old_umask = os.umask(0o177)
+    try:
+        server = _make_server(path, handle_argv)
+    finally:
+        os.umask(old_umask)
+
+    try:
+        with stop_on_sigterm():
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,39 @@
+"""
+Atomic file writes for the tasks file and the directories next to it
+(history, archive, shards).
+
+A file is written to a temporary file in the same directory, flushed to
+disk and then renamed over its final path: a reader or a crash at any point
+sees either the old file or the new one, never a truncated one. If writing
+fails, the temporary file is removed.
+"""
+
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_write(path: str):
+    """
+    Yield a binary file to write the new content of 'path' to; it replaces
+    'path' when the block ends without an error.
+    - The temporary file is named after the process, so concurrent writers
+      never write to the same one.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def replace_file(path: str, content: bytes) -> None:
+    """Replace 'path' with 'content' atomically (see atomic_write)."""
+    with atomic_write(path) as f:
+        f.write(content)
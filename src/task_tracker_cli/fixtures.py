@@ -0,0 +1,92 @@
+"""
+Synthetic task datasets for benchmarks and manual testing.
+
+The generated tasks look like a long-lived real task list:
+- mostly 'done', some 'todo' and a few 'in-progress'
+- short and long descriptions, some with accents, CJK text and emoji
+- gaps in the ids, as if some tasks had been deleted
+- timestamps spread over time, with updatedAt >= createdAt
+"""
+
+import random
+from datetime import datetime, timedelta
+
+
+# Relative weights of each status
+STATUS_WEIGHTS = {"done": 70, "todo": 20, "in-progress": 10}
+
+# Fraction of ids skipped (as if the task had been deleted)
+DELETED_RATIO = 0.05
+
+_WORDS = (
+    "review update fix write call plan buy clean send prepare check deploy "
+    "report invoice meeting groceries budget draft backlog release notes "
+    "team client server database website email docs tests bug feature"
+).split()
+
+_UNICODE_WORDS = [
+    "café",
+    "reunión",
+    "naïve",
+    "Straße",
+    "日本語",
+    "会议",
+    "проект",
+    "🎉",
+    "✅",
+    "📦",
+]
+
+_START = datetime(2020, 1, 1)
+
+
+def _description(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.05:
+        # Long description (a few hundred characters)
+        words = rng.choices(_WORDS, k=rng.randint(40, 80))
+    elif roll < 0.15:
+        words = rng.choices(_WORDS, k=rng.randint(2, 6))
+        words += rng.choices(_UNICODE_WORDS, k=rng.randint(1, 3))
+        rng.shuffle(words)
+    else:
+        words = rng.choices(_WORDS, k=rng.randint(2, 8))
+    return " ".join(words).capitalize()
+
+
+def iter_tasks(count: int, seed: int = 0):
+    """
+    Yield 'count' tasks in id order (ids have gaps).
+    - The same seed always produces the same tasks.
+    """
+    rng = random.Random(seed)
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+
+    task_id = 0
+    created = _START
+    for _ in range(count):
+        task_id += 1
+        while rng.random() < DELETED_RATIO:
+            task_id += 1
+
+        created += timedelta(seconds=rng.randint(1, 600))
+        status = rng.choices(statuses, weights)[0]
+        updated = created
+        if status != "todo":
+            updated += timedelta(seconds=rng.randint(1, 30 * 24 * 3600))
+
+        yield {
+            "id": task_id,
+            "description": _description(rng),
+            "status": status,
+            "createdAt": int(created.timestamp()),
+            "updatedAt": int(updated.timestamp()),
+        }
+
+
+def generate_data(count: int, seed: int = 0) -> dict:
+    """Return a {"last_id", "tasks"} structure with 'count' generated tasks."""
+    tasks = list(iter_tasks(count, seed))
+    last_id = tasks[-1]["id"] if tasks else 0
+    return {"last_id": last_id, "tasks": tasks}
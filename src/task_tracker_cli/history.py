@@ -0,0 +1,454 @@
+"""
+Event-sourced history of the tasks (task-cli history / undo / list --as-of).
+
+Every save appends the changes it made as events to a log in a directory
+next to the tasks file (TASKS_FILE + ".history"):
+
+    events.jsonl               one event per line, only appended to
+    i-<n>                      ids n*IDS_PER_BUCKET ... -> byte offsets of their events
+    snapshot-<seq>.jsonl.gz    every task after event <seq> (header line first)
+    manifest.json              last seq, valid log size, snapshots, undo stack
+
+An event is {"seq", "group", "time", "op", "id", "task", "before"}: "task"
+is the task after the change (not for deletes), "before" the task before it
+(not for adds). All events of one save share a "group" (the seq of its first
+event); undo reverts whole groups. Tasks moved to the archive are recorded
+as "archive" events (a delete from the tasks file that undo cannot revert).
+
+Bulk imports are recorded as one range event {"op": "import", "id": first,
+"last": last} instead of one event per task (and "delete-range" when one is
+undone). They do not carry the tasks: a snapshot is written right after every
+range event, and the manifest lists their offsets under "ranges" so the
+history of any task in the range finds them.
+
+A snapshot is written every SNAPSHOT_EVERY events, so the state at any time
+is the nearest earlier snapshot plus at most SNAPSHOT_EVERY events read from
+the offset it records. The events of one task are found through its index
+bucket, without reading the rest of the log.
+
+Only the last KEEP_SNAPSHOTS snapshots are kept. When an older one is
+dropped, so are the events before the oldest kept snapshot: the log is
+copied without them to events-<base>.jsonl, where <base> is the offset of
+its first byte (offsets stay the same across prunes; "base" and "events" in
+the manifest say where the log file starts and which file it is).
+"""
+
+import bisect
+import itertools
+import json
+import marshal
+import os
+
+from task_tracker_cli import fileio
+
+HISTORY_SUFFIX = ".history"
+MANIFEST_NAME = "manifest.json"
+EVENTS_NAME = "events.jsonl"
+
+# Events between two snapshots (bounds the replay of list --as-of)
+SNAPSHOT_EVERY = 1000
+
+# Snapshots kept on disk; older snapshots and the events before the oldest
+# kept one are deleted (history covers about KEEP_SNAPSHOTS * SNAPSHOT_EVERY events)
+KEEP_SNAPSHOTS = 10
+
+# Tasks encoded and compressed at a time when writing a snapshot
+SNAPSHOT_CHUNK = 10_000
+
+# Task ids per index bucket (i-<n> files)
+IDS_PER_BUCKET = 4096
+
+# Groups that 'undo' can still revert (oldest are forgotten)
+UNDO_DEPTH = 100
+
+# Changes that cover a range of ids (change["id"] ... change["last"])
+RANGE_OPS = ("import", "delete-range")
+
+
+def history_path(tasks_file: str) -> str:
+    """Return the history directory that belongs to 'tasks_file'."""
+    return tasks_file + HISTORY_SUFFIX
+
+
+def read_manifest(path: str) -> dict | None:
+    """Return the manifest of the history at 'path', or None if there is no history."""
+    try:
+        with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    fileio.replace_file(
+        os.path.join(path, MANIFEST_NAME),
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+
+
+def _events_file(path: str, manifest: dict) -> str:
+    """Return the file that holds the event log (renamed by _prune())."""
+    return os.path.join(path, manifest.get("events", EVENTS_NAME))
+
+
+def _bucket_file(path: str, task_id: int) -> str:
+    return os.path.join(path, f"i-{task_id // IDS_PER_BUCKET}")
+
+
+def _read_bucket(name: str) -> dict:
+    try:
+        with open(name, "rb") as f:
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+
+
+def _write_snapshot(path: str, manifest: dict, tasks, time: int, last_id: int) -> None:
+    """
+    Write every task (dicts, any iterable) as the snapshot after the last
+    event of 'manifest'.
+    - Compressed a chunk of SNAPSHOT_CHUNK tasks at a time, so a snapshot
+      of a million tasks is never held in memory as a whole.
+    """
+    import gzip
+
+    seq = manifest["seq"]
+    name = f"snapshot-{seq:09d}.jsonl.gz"
+    header = {"seq": seq, "time": time, "last_id": last_id}
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with fileio.atomic_write(os.path.join(path, name)) as f:
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=1) as compressed:
+            compressed.write((json.dumps(header) + "\n").encode("utf-8"))
+            tasks = iter(tasks)
+            for chunk in iter(lambda: list(itertools.islice(tasks, SNAPSHOT_CHUNK)), []):
+                compressed.write(("\n".join(map(encode, chunk)) + "\n").encode("utf-8"))
+    manifest["snapshots"].append(
+        {"seq": seq, "time": time, "offset": manifest["size"], "file": name}
+    )
+    manifest["since_snapshot"] = 0
+
+
+def _state_before(tasks, events: list[dict]) -> dict[int, dict]:
+    """Return {id: task} as it was before 'events' were applied to 'tasks'."""
+    imported = [event["id"] for event in events if event["op"] == "import"]
+    if imported:
+        # Imported ids come after every id that existed before (tasks are
+        # in id order): the imported tasks do not need to be read at all
+        first_imported = min(imported)
+        tasks = itertools.takewhile(lambda task: task["id"] < first_imported, tasks)
+    state = {task["id"]: dict(task) for task in tasks}
+    for event in reversed(events):
+        if event["op"] == "add":
+            state.pop(event["id"], None)
+        elif event["op"] == "import":
+            for task_id in range(event["id"], event["last"] + 1):
+                state.pop(task_id, None)
+        elif event["op"] != "delete-range":
+            state[event["id"]] = event["before"]
+    return state
+
+
+def record(
+    path: str,
+    changes: list[dict],
+    now: int,
+    current_tasks,
+    last_id: int,
+    undoes: int | None = None,
+) -> None:
+    """
+    Append the change records of one save as one group of events.
+    - current_tasks: returns every task after the save (called only when a
+      snapshot is due: the first save, then every SNAPSHOT_EVERY events).
+    - undoes: the group this save reverts ('undo'), which leaves the undo
+      stack instead of joining it.
+    - The caller holds the exclusive lock of the tasks file.
+    """
+    events = []
+    for change in changes:
+        op = change.get("op")
+        if op in RANGE_OPS:
+            events.append({"op": op, "id": change["id"], "last": change["last"]})
+            continue
+        if op not in ("add", "update", "delete"):
+            continue
+        task = change.get("task")
+        if op == "delete" and change.get("archived"):
+            op = "archive"
+        event = {"op": op, "id": task["id"] if task is not None else change["id"]}
+        if task is not None:
+            event["task"] = task
+        if "before" in change:
+            event["before"] = change["before"]
+        events.append(event)
+    if not events:
+        return
+
+    os.makedirs(path, exist_ok=True)
+    manifest = read_manifest(path)
+    if manifest is None:
+        # First save with history: the state before it is the first snapshot
+        manifest = {
+            "format": 1,
+            "seq": 0,
+            "size": 0,
+            "base": 0,
+            "events": EVENTS_NAME,
+            "since_snapshot": 0,
+            "snapshots": [],
+            "undo": [],
+        }
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+        before = _state_before(current_tasks(), events)
+        _write_snapshot(path, manifest, sorted(before.values(), key=_by_id), now, last_id)
+
+    # 1) Append the events (anything past the last recorded size is a torn
+    #    append from an interrupted save: drop it first)
+    group = manifest["seq"] + 1
+    lines = []
+    for seq, event in enumerate(events, start=group):
+        event = {"seq": seq, "group": group, "time": now, **event}
+        if undoes is not None:
+            event["undo"] = undoes
+        lines.append(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+    encoded = [line.encode("utf-8") for line in lines]
+    start = offset = manifest["size"]
+    base = manifest.get("base", 0)
+    offsets = []
+    for line in encoded:
+        offsets.append(offset)
+        offset += len(line)
+    with open(_events_file(path, manifest), "ab") as f:
+        f.truncate(start - base)
+        f.write(b"".join(encoded))
+        f.flush()
+        os.fsync(f.fileno())
+
+    # 2) Index the new offsets by task id (only the touched buckets; range
+    #    events are listed in the manifest instead)
+    ranges = [entry for entry in manifest.get("ranges", []) if entry[2] < start]
+    buckets: dict[str, dict] = {}
+    for event, event_offset in zip(events, offsets):
+        if event["op"] in RANGE_OPS:
+            ranges.append([event["id"], event["last"], event_offset])
+            continue
+        name = _bucket_file(path, event["id"])
+        if name not in buckets:
+            # Drop offsets left by an interrupted save (past the valid log)
+            # and those of pruned events
+            buckets[name] = {
+                task_id: [kept for kept in task_offsets if base <= kept < start]
+                for task_id, task_offsets in _read_bucket(name).items()
+            }
+        buckets[name].setdefault(event["id"], []).append(event_offset)
+    for name, bucket in buckets.items():
+        fileio.replace_file(name, marshal.dumps(bucket))
+    if ranges or "ranges" in manifest:
+        manifest["ranges"] = ranges
+
+    # 3) Undo stack: a normal save can be undone, an undo leaves the stack
+    if undoes is None:
+        manifest["undo"].append([group, start, len(events)])
+        del manifest["undo"][:-UNDO_DEPTH]
+    else:
+        manifest["undo"] = [entry for entry in manifest["undo"] if entry[0] != undoes]
+
+    manifest["seq"] += len(events)
+    manifest["size"] = offset
+    manifest["since_snapshot"] += len(events)
+
+    # 4) Snapshot every SNAPSHOT_EVERY events, and after range events (they
+    #    cannot be replayed); then forget what is older than KEEP_SNAPSHOTS
+    obsolete = []
+    if manifest["since_snapshot"] >= SNAPSHOT_EVERY or any(
+        event["op"] in RANGE_OPS for event in events
+    ):
+        _write_snapshot(path, manifest, current_tasks(), now, last_id)
+        obsolete = _prune(path, manifest)
+    _write_manifest(path, manifest)
+
+    # 5) The manifest no longer points at the pruned files: delete them
+    if obsolete:
+        _remove_pruned(path, obsolete, manifest["base"])
+
+
+def _prune(path: str, manifest: dict) -> list[str]:
+    """
+    Drop the snapshots older than the last KEEP_SNAPSHOTS from 'manifest',
+    with the events (and undo entries) before the oldest kept snapshot.
+    - The kept events are copied to a new log file first; nothing is deleted
+      until the manifest pointing at it is written (see _remove_pruned()).
+    - Return the names of the files to delete.
+    """
+    snapshots = manifest["snapshots"]
+    if len(snapshots) <= KEEP_SNAPSHOTS:
+        return []
+    dropped = snapshots[:-KEEP_SNAPSHOTS]
+    cut = snapshots[-KEEP_SNAPSHOTS]["offset"]
+    base = manifest.get("base", 0)
+    old_events = manifest.get("events", EVENTS_NAME)
+
+    # Copy the events from 'cut' to the end of the valid log
+    name = f"events-{cut}.jsonl"
+    with open(os.path.join(path, old_events), "rb") as source:
+        with fileio.atomic_write(os.path.join(path, name)) as f:
+            source.seek(cut - base)
+            remaining = manifest["size"] - cut
+            while remaining > 0:
+                block = source.read(min(remaining, 1 << 20))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+
+    manifest["snapshots"] = snapshots[-KEEP_SNAPSHOTS:]
+    manifest["base"] = cut
+    manifest["events"] = name
+    manifest["undo"] = [entry for entry in manifest["undo"] if entry[1] >= cut]
+    if "ranges" in manifest:
+        manifest["ranges"] = [entry for entry in manifest["ranges"] if entry[2] >= cut]
+    obsolete = [snapshot["file"] for snapshot in dropped]
+    if old_events != name:
+        obsolete.append(old_events)
+    return obsolete
+
+
+def _remove_pruned(path: str, obsolete: list[str], base: int) -> None:
+    """Delete the files dropped by _prune() and the index offsets of pruned events."""
+    for name in obsolete:
+        try:
+            os.remove(os.path.join(path, name))
+        except FileNotFoundError:
+            pass
+    for name in os.listdir(path):
+        if not name.startswith("i-"):
+            continue
+        name = os.path.join(path, name)
+        bucket = {}
+        for task_id, offsets in _read_bucket(name).items():
+            offsets = [offset for offset in offsets if offset >= base]
+            if offsets:
+                bucket[task_id] = offsets
+        if bucket:
+            fileio.replace_file(name, marshal.dumps(bucket))
+        else:
+            os.remove(name)
+
+
+def _by_id(task: dict) -> int:
+    return task["id"]
+
+
+def _read_events(path: str, manifest: dict, offset: int):
+    """Yield the events of the log from byte offset 'offset' to the end of the valid log."""
+    stop = manifest["size"]
+    with open(_events_file(path, manifest), "rb") as f:
+        f.seek(offset - manifest.get("base", 0))
+        while offset < stop:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            yield json.loads(line)
+
+
+def last_undoable(path: str) -> tuple[int, list[dict]] | None:
+    """Return (group, events) of the most recent save that undo can revert, or None."""
+    manifest = read_manifest(path)
+    if manifest is None or not manifest["undo"]:
+        return None
+    group, offset, count = manifest["undo"][-1]
+    events = []
+    for event in _read_events(path, manifest, offset):
+        if len(events) == count:
+            break
+        events.append(event)
+    return group, events
+
+
+def task_events(path: str, task_id: int) -> list[dict]:
+    """Return the events of one task, oldest first (read through its index bucket)."""
+    manifest = read_manifest(path)
+    if manifest is None:
+        return []
+    offsets = _read_bucket(_bucket_file(path, task_id)).get(task_id, [])
+    offsets += [
+        offset for first, last, offset in manifest.get("ranges", []) if first <= task_id <= last
+    ]
+    base = manifest.get("base", 0)
+    events = []
+    with open(_events_file(path, manifest), "rb") as f:
+        # An interrupted save can leave offsets past the valid log (later
+        # reused by other events): skip them and anything of another task.
+        # Offsets before 'base' belong to pruned events.
+        for offset in sorted(set(offsets)):
+            if offset < base:
+                continue
+            if offset >= manifest["size"]:
+                break
+            f.seek(offset - base)
+            try:
+                event = json.loads(f.readline())
+            except json.JSONDecodeError:
+                continue
+            if event.get("id") == task_id or (
+                event.get("op") in RANGE_OPS and event["id"] <= task_id <= event["last"]
+            ):
+                events.append(event)
+    return events
+
+
+def tasks_as_of(path: str, moment: int) -> list[dict] | None:
+    """
+    Return every task as it was at 'moment' (a stored timestamp), by id.
+    - Loads the last snapshot taken at or before 'moment' and replays the
+      events after it up to 'moment' (at most about SNAPSHOT_EVERY).
+    - Return None if the history starts after 'moment' (or there is none).
+    """
+    import gzip
+
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+    snapshots = manifest["snapshots"]
+    position = bisect.bisect_right([snapshot["time"] for snapshot in snapshots], moment)
+    if position == 0:
+        return None
+    snapshot = snapshots[position - 1]
+
+    state = {}
+    with gzip.open(os.path.join(path, snapshot["file"]), "rt", encoding="utf-8") as f:
+        next(f)  # header
+        for line in f:
+            task = json.loads(line)
+            state[task["id"]] = task
+
+    for event in _read_events(path, manifest, snapshot["offset"]):
+        if event["time"] > moment:
+            break
+        if event["op"] in RANGE_OPS:
+            # Never reached: the snapshot written right after it is taken instead
+            continue
+        if event["op"] in ("delete", "archive"):
+            state.pop(event["id"], None)
+        else:
+            state[event["id"]] = event["task"]
+    return sorted(state.values(), key=_by_id)
+
+
+def first_time(path: str) -> int | None:
+    """Return the time of the oldest snapshot (where the history starts)."""
+    manifest = read_manifest(path)
+    if manifest is None or not manifest["snapshots"]:
+        return None
+    return manifest["snapshots"][0]["time"]
+
+
+def remove(path: str) -> None:
+    """Delete the history (it no longer matches a tasks file written from scratch)."""
+    if not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        os.remove(os.path.join(path, name))
+    os.rmdir(path)
@@ -0,0 +1,193 @@
+"""
+HTTP transport for 'task-cli http' (standard library only).
+
+A small JSON API for tools that would otherwise run 'task-cli' once per
+request. The task logic lives in cli.cmd_http(); this module provides the
+pieces it is built from:
+
+    WriteQueue      one writer thread; writes queued while it is busy are
+                    applied together (one load + one save per group)
+    serve()         HTTP/1.1 server with keep-alive on a bounded thread pool
+
+Every connection is served by one worker of the pool for as long as it is
+kept alive (idle connections are closed after KEEPALIVE_TIMEOUT seconds);
+connections beyond the pool size wait for a free worker.
+"""
+
+import json
+import queue
+import threading
+import traceback
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from task_tracker_cli import daemon
+
+
+# Seconds an idle keep-alive connection may hold a worker
+KEEPALIVE_TIMEOUT = 5.0
+
+# Largest request body accepted (bytes)
+MAX_BODY = 1024 * 1024
+
+# handle(method, path, query, body) -> (HTTP status, JSON-serializable payload)
+Handler = Callable[[str, str, dict, object], tuple[int, object]]
+
+
+class WriteQueue:
+    """
+    Single writer thread for queued write operations.
+    - submit(operation) returns a Future with the result of that operation.
+    - The writer takes everything queued so far and calls
+      apply_group([operation, ...]) -> [result, ...] once for the whole
+      group, so a burst of N writes costs one save instead of N.
+    """
+
+    def __init__(self, apply_group: Callable[[list], list]) -> None:
+        self._apply_group = apply_group
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="task-http-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation) -> Future:
+        future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def close(self) -> None:
+        """Apply what is already queued, then stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            # Everything that arrived while the last group was saved joins this one
+            group = [item]
+            stopping = False
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+
+            try:
+                results = self._apply_group([operation for operation, _ in group])
+            except Exception as error:
+                for _, future in group:
+                    future.set_exception(error)
+            else:
+                for (_, future), result in zip(group, results):
+                    future.set_result(result)
+            if stopping:
+                return
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive: every response has a Content-Length
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as two writes: without this, Nagle's algorithm
+    # holds the body until the client's delayed ACK (~40 ms per request)
+    disable_nagle_algorithm = True
+    timeout = KEEPALIVE_TIMEOUT
+    server_version = "task-cli"
+
+    def _respond(self, status: int, payload) -> None:
+        content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+
+        # 1) Read the JSON body, if any
+        body = None
+        length = self.headers.get("Content-Length") or "0"
+        if not length.isdecimal():
+            # Negative or not a number: the body cannot be delimited
+            self.close_connection = True
+            self._respond(400, {"error": "invalid Content-Length header."})
+            return
+        length = int(length)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._respond(413, {"error": "request body too large."})
+            return
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._respond(400, {"error": "request body is not valid JSON."})
+                return
+
+        # 2) Let the application answer
+        try:
+            status, payload = self.server.application(self.command, url.path, query, body)
+        except Exception:
+            traceback.print_exc()
+            status, payload = 500, {"error": "internal error (see the server output)."}
+        self._respond(status, payload)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args) -> None:
+        # One line per request would cost more than most requests
+        pass
+
+
+class _PoolServer(HTTPServer):
+    """HTTPServer that hands every accepted connection to a bounded thread pool."""
+
+    def __init__(self, address: tuple, handle: Handler, workers: int) -> None:
+        self.application = handle
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="task-http")
+        super().__init__(address, _RequestHandler)
+
+    def process_request(self, request, client_address) -> None:
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(host: str, port: int, handle: Handler, workers: int = 8, ready=None) -> None:
+    """
+    Answer HTTP requests on host:port with handle(method, path, query, body).
+    - handle runs on up to 'workers' threads at once; it is responsible for
+      its own locking.
+    - ready(address) is called once the socket is listening (the real port
+      when port is 0).
+    - Runs until interrupted (Ctrl+C or SIGTERM).
+    """
+    server = _PoolServer((host, port), handle, workers)
+    if ready is not None:
+        ready(server.server_address)
+
+    try:
+        with daemon.stop_on_sigterm():
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
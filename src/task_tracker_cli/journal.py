@@ -0,0 +1,167 @@
+"""
+Append-only journal for the task store.
+
+Instead of rewriting the whole JSON document on every command, each mutation
+is appended to a side file (TASKS_FILE + ".journal") as one JSON line:
+
+    {"op": "add", "task": {...}}
+    {"op": "update", "task": {...}}
+    {"op": "delete", "id": 3}
+    {"op": "counts", "counts": {"todo": 1, ...}, "version": 8}
+
+Every batch of records ends with a "counts" record holding the per-status
+counters and the file version after the batch, so they can be read from the
+last line alone.
+
+Loading means: read the snapshot (the regular JSON file) and replay the
+journal on top of it. Once the journal grows past a size threshold it is
+folded back into the snapshot and removed.
+"""
+
+import json
+import os
+
+from task_tracker_cli import reader, timestamps
+
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path(tasks_file: str) -> str:
+    """Return the path of the journal that belongs to 'tasks_file'."""
+    return tasks_file + JOURNAL_SUFFIX
+
+
+def journal_size(path: str) -> int:
+    """Return the size of the journal in bytes (0 if it does not exist)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def append_records(path: str, records: list[dict]) -> int:
+    """
+    Append 'records' to the journal, one JSON object per line.
+    - All records are written with a single write() call.
+    - Return the number of bytes written.
+    """
+    if not records:
+        return 0
+
+    lines = "".join(
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for record in records
+    )
+    content = lines.encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(content)
+    return len(content)
+
+
+def counts_record(counts: dict[str, int], version: int) -> dict:
+    """Return the record that closes every append: per-status counters and file version."""
+    return {"op": "counts", "counts": counts, "version": version}
+
+
+def _last_counts_record(path: str) -> dict | None:
+    """Return the last record of the journal if it is a complete "counts" record."""
+    line = reader.read_last_line(path)
+    if line is None:
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if record.get("op") != "counts":
+        return None
+    return record
+
+
+def read_counts(path: str) -> dict[str, int] | None:
+    """
+    Return the counters of the last "counts" record of the journal.
+    - Only the end of the file is read.
+    - Return None if the last line is not a complete "counts" record.
+    """
+    record = _last_counts_record(path)
+    return None if record is None else record["counts"]
+
+
+def read_version(path: str) -> int | None:
+    """
+    Return the file version stored by the last append (end of file only).
+    - Return None if it is unknown (torn last line, older journal).
+    """
+    record = _last_counts_record(path)
+    return None if record is None else record.get("version")
+
+
+def replay(data: dict, path: str) -> int:
+    """
+    Apply the records stored in the journal at 'path' to 'data'.
+    - Replay is idempotent: adding an existing id replaces it and deleting a
+      missing id is ignored, so a journal that was already folded into the
+      snapshot can be replayed again safely.
+    - A torn last line (interrupted append) is ignored.
+    - Tasks stay in id order, also when a deleted id is added back (undo).
+    - Return the number of records applied.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    tasks = data["tasks"]
+    positions = {task.get("id"): index for index, task in enumerate(tasks)}
+    deleted = False
+    unordered = False
+    applied = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial line at the end of the file: stop here
+                break
+
+            op = record.get("op")
+            if op in ("add", "update"):
+                # Journals written before integer timestamps hold strings
+                task = timestamps.upgrade(record["task"])
+                index = positions.get(task["id"])
+                if index is None:
+                    positions[task["id"]] = len(tasks)
+                    tasks.append(task)
+                    if task["id"] <= data["last_id"]:
+                        unordered = True
+                else:
+                    tasks[index] = task
+                if task["id"] > data["last_id"]:
+                    data["last_id"] = task["id"]
+            elif op == "delete":
+                index = positions.pop(record["id"], None)
+                if index is not None:
+                    # Leave a hole for now so the other positions stay valid
+                    tasks[index] = None
+                    deleted = True
+            else:
+                if op == "counts" and "version" in record:
+                    data["version"] = record["version"]
+                continue
+            applied += 1
+
+    if deleted:
+        data["tasks"] = tasks = [task for task in tasks if task is not None]
+    if unordered:
+        tasks.sort(key=lambda task: task["id"])
+        data["tasks"] = tasks
+
+    return applied
+
+
+def remove(path: str) -> None:
+    """Delete the journal file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,148 @@
+"""
+Inter-process locking for the tasks file.
+
+Several 'task-cli' processes may use the same tasks file at once. They
+coordinate through an advisory lock (fcntl.flock) on a sidecar file
+(TASKS_FILE + ".lock"); the tasks file itself cannot be locked because
+saves replace it with a new file.
+
+    shared      taken while reading: any number of readers at a time
+    exclusive   taken while writing: one writer, and no reader meanwhile
+
+Writers are optimistic: they load and apply their command without holding
+the lock, and only take it to save. The save compares the version stored on
+disk with the one that was loaded and raises ConflictError if another
+process saved in between; the caller then runs the command again.
+
+On platforms without fcntl (Windows) the locks do nothing.
+
+ReadWriteLock is the same shared/exclusive scheme between the threads of one
+process (the HTTP server, TaskStore).
+"""
+
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+LOCK_SUFFIX = ".lock"
+
+# Locks held by the current thread: lock path -> True if exclusive
+_held = threading.local()
+
+
+class ConflictError(RuntimeError):
+    """The tasks were saved by another process after they were loaded."""
+
+
+def lock_path(tasks_file: str) -> str:
+    """Return the lock file that belongs to 'tasks_file'."""
+    return tasks_file + LOCK_SUFFIX
+
+
+def _locks() -> dict:
+    locks = getattr(_held, "locks", None)
+    if locks is None:
+        locks = _held.locks = {}
+    return locks
+
+
+def holds(path: str, exclusive: bool = False) -> bool:
+    """Return True if this thread already holds the lock at 'path' (exclusively, if asked)."""
+    held = _locks().get(path)
+    return held is not None and (held or not exclusive)
+
+
+@contextlib.contextmanager
+def locked(path: str, exclusive: bool = False):
+    """
+    Hold the lock at 'path' (shared or exclusive) while the block runs.
+    - Nested use in the same thread is free: an exclusive lock covers any
+      inner lock, a shared one covers inner shared locks. Upgrading a shared
+      lock to exclusive is not supported (it could deadlock two readers).
+    - Blocks until the lock is available.
+    """
+    locks = _locks()
+    held = locks.get(path)
+    if held is not None:
+        if exclusive and not held:
+            raise RuntimeError(f"cannot upgrade the shared lock on {path}.")
+        yield
+        return
+
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        locks[path] = exclusive
+        try:
+            yield
+        finally:
+            del locks[path]
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+class ReadWriteLock:
+    """
+    Shared/exclusive lock between threads.
+    - read(): any number of threads at once, unless a writer holds the lock.
+    - write(): one thread, alone. Inside it, downgrade() lets readers back
+      in while the writer keeps a read hold (no other writer can get in).
+    - Waiting writers go first, so a steady stream of reads cannot starve them.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                if self._writing:
+                    self._writing = False
+                else:
+                    # Downgraded: release the read hold instead
+                    self._readers -= 1
+                self._condition.notify_all()
+
+    def downgrade(self) -> None:
+        """Turn the write hold of the calling writer into a read hold."""
+        with self._condition:
+            self._writing = False
+            self._readers += 1
+            self._condition.notify_all()
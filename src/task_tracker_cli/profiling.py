@@ -0,0 +1,149 @@
+"""
+Per-phase timing instrumentation.
+
+Each layer of the CLI (parser construction, load_tasks, the domain functions,
+save_tasks and the table printers) reports its wall time and a few counters
+(bytes read/written, tasks) to the registered hooks:
+
+    from task_tracker_cli import profiling
+
+    recorder = profiling.Recorder()
+    profiling.add_hook(recorder.record)
+    ...  # call load_tasks(), add_task(), ...
+    print(recorder.report())
+
+With no hook registered, the instrumentation costs one check per call.
+The CLI registers a Recorder itself with --profile or TASK_CLI_TRACE=1.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections.abc import Callable
+
+
+# hook(phase name, seconds, counters)
+Hook = Callable[[str, float, dict], None]
+
+_hooks: list[Hook] = []
+_local = threading.local()
+
+
+def add_hook(hook: Hook) -> None:
+    """Call 'hook' at the end of every instrumented phase."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    _hooks.remove(hook)
+
+
+def count(name: str, amount: int) -> None:
+    """Add 'amount' to a counter (e.g. "bytes_read") of the innermost phase."""
+    stack = getattr(_local, "stack", None)
+    if stack:
+        counters = stack[-1].counters
+        counters[name] = counters.get(name, 0) + amount
+
+
+class _Phase:
+    __slots__ = ("name", "counters", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counters = {}
+
+    def __enter__(self) -> "_Phase":
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        _local.stack.pop()
+        for hook in list(_hooks):
+            hook(self.name, elapsed, self.counters)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Context manager that times the block as phase 'name'."""
+    if not _hooks:
+        return _NO_PHASE
+    return _Phase(name)
+
+
+def timed(name: str):
+    """Decorator that times every call of the function as phase 'name'."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return func(*args, **kwargs)
+            with _Phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def process_age() -> float | None:
+    """
+    Return the seconds since this process started (Linux only), which
+    includes interpreter startup and imports. None if unknown.
+    """
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # Field 22 (after the ")" that closes the command name): start time in ticks
+            fields = f.read().rsplit(b")", 1)[1].split()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    return max(0.0, uptime - started)
+
+
+class Recorder:
+    """
+    Hook that aggregates phases by name: number of calls, total time and
+    summed counters.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, counters: dict | None = None) -> None:
+        with self.lock:
+            entry = self.phases.setdefault(name, {"calls": 0, "ms": 0.0})
+            entry["calls"] += 1
+            entry["ms"] += seconds * 1000
+            for key, value in (counters or {}).items():
+                entry[key] = entry.get(key, 0) + value
+
+    def report(self) -> dict:
+        """Return the aggregated phases, with times rounded to microseconds."""
+        with self.lock:
+            return {
+                name: {**entry, "ms": round(entry["ms"], 3)}
+                for name, entry in self.phases.items()
+            }
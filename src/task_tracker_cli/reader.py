@@ -0,0 +1,185 @@
+"""
+Partial readers for the tasks JSON file.
+
+The full file is only needed when the tasks themselves are needed. These
+helpers read just the small header that precedes the "tasks" array, or
+stream the array one task at a time.
+"""
+
+import json
+import os
+
+
+# The header ("last_id", "counts", ...) is written before the "tasks" array,
+# so it always fits in the first bytes of the file
+HEADER_BYTES = 64 * 1024
+
+# Bytes read at a time when streaming the tasks
+CHUNK_BYTES = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def read_header(path: str) -> dict | None:
+    """
+    Return the top-level keys of the tasks file that come before "tasks".
+    - Only the beginning of the file is read; the tasks are never decoded.
+    - Return None if the file does not exist or cannot be parsed this way.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read(HEADER_BYTES)
+    except OSError:
+        return None
+
+    header = {}
+    try:
+        pos = _skip_whitespace(text, 0)
+        if text[pos] != "{":
+            return None
+        pos += 1
+
+        while True:
+            pos = _skip_whitespace(text, pos)
+            if text[pos] == "}":
+                break
+
+            key, pos = _decoder.raw_decode(text, pos)
+            pos = _skip_whitespace(text, pos)
+            if text[pos] != ":":
+                return None
+            pos = _skip_whitespace(text, pos + 1)
+
+            if key == "tasks":
+                # Everything after this point is task bodies
+                break
+
+            header[key], pos = _decoder.raw_decode(text, pos)
+            pos = _skip_whitespace(text, pos)
+            if text[pos] == ",":
+                pos += 1
+    except (ValueError, IndexError):
+        # Invalid JSON or header longer than HEADER_BYTES
+        return None
+
+    return header
+
+
+def read_last_line(path: str) -> str | None:
+    """
+    Return the last complete line of a text file without reading all of it.
+    - Return None if the file does not exist or is empty.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return None
+            f.seek(max(0, size - HEADER_BYTES))
+            tail = f.read()
+    except OSError:
+        return None
+
+    lines = tail.rstrip(b"\n").split(b"\n")
+    return lines[-1].decode("utf-8", errors="replace")
+
+
+class _ChunkedText:
+    """
+    Text read from a file in chunks, with a cursor ('pos') into the buffer.
+    - Consumed text is dropped every time a new chunk is read, so the buffer
+      never holds much more than one chunk (or one value bigger than that).
+    """
+
+    def __init__(self, f, chunk_size: int) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Read the next chunk; return False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character (without consuming it)."""
+        while True:
+            self.pos = _skip_whitespace(self.text, self.pos)
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                raise ValueError("unexpected end of file")
+
+    def expect(self, char: str) -> None:
+        """Consume 'char' (after whitespace) or raise ValueError."""
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                # The value continues in the next chunk
+                if self.more():
+                    continue
+                raise
+            if end == len(self.text) and self.more():
+                # A number cut at the end of the chunk would decode too early
+                continue
+            self.pos = end
+            return value
+
+
+def iter_tasks(path: str, chunk_size: int = CHUNK_BYTES):
+    """
+    Yield the objects of the "tasks" array of the file one at a time.
+    - Only one chunk of text and one task are decoded at any moment.
+    - Raise ValueError if the file is not a JSON object with a "tasks" array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _ChunkedText(f, chunk_size)
+
+        # 1) Skip the header until the "tasks" key
+        stream.expect("{")
+        while True:
+            if stream.peek() == "}":
+                # No "tasks" key: no tasks
+                return
+            key = stream.value()
+            stream.expect(":")
+            if key == "tasks":
+                break
+            stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+
+        # 2) Yield the elements of the array
+        stream.expect("[")
+        if stream.peek() == "]":
+            return
+        while True:
+            yield stream.value()
+            if stream.peek() == "]":
+                return
+            stream.expect(",")
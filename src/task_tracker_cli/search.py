@@ -0,0 +1,256 @@
+"""
+On-disk inverted index for searching task descriptions.
+
+The index lives in a directory next to the tasks file (TASKS_FILE + ".search")
+and is split into small marshal files, so a query only reads the parts it
+needs instead of every task:
+
+    meta          format and stamp of the tasks file the index matches
+    t-<hex>       tokens starting with the same two characters -> sorted ids
+    d-<n>         ids n*DOCS_PER_BUCKET ... -> (description, status, createdAt, updatedAt)
+
+Saves keep it up to date incrementally: apply() takes the change records of
+the domain functions and rewrites only the buckets they touch. If the tasks
+file was changed some other way (its stamp differs), the index is rebuilt
+from scratch the next time it is used.
+"""
+
+import bisect
+import marshal
+import os
+import re
+
+SEARCH_SUFFIX = ".search"
+
+# Bump when the layout of the index files changes
+SEARCH_FORMAT = 1
+
+# Tasks per document bucket (d-<n> files)
+DOCS_PER_BUCKET = 4096
+
+# Characters of a token that choose its bucket (t-<hex> files)
+TOKEN_BUCKET_CHARS = 2
+
+_TOKEN = re.compile(r"\w+")
+
+
+def index_path(tasks_file: str) -> str:
+    """Return the directory of the index that belongs to 'tasks_file'."""
+    return tasks_file + SEARCH_SUFFIX
+
+
+def tokenize(text: str) -> set[str]:
+    """Return the distinct lowercase words of 'text'."""
+    return set(_TOKEN.findall(text.casefold()))
+
+
+def _token_bucket(token: str) -> str:
+    return "t-" + token[:TOKEN_BUCKET_CHARS].encode("utf-8").hex()
+
+
+def _doc_bucket(task_id: int) -> str:
+    return f"d-{task_id // DOCS_PER_BUCKET}"
+
+
+def _read(path: str, default):
+    try:
+        with open(path, "rb") as f:
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return default
+
+
+def _write(path: str, value) -> None:
+    # Temporary file first, so a reader never sees half a bucket
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(marshal.dumps(value))
+    os.replace(temp_path, path)
+
+
+def _doc(task: dict) -> tuple:
+    return (
+        task.get("description", ""),
+        task.get("status", ""),
+        task.get("createdAt"),
+        task.get("updatedAt"),
+    )
+
+
+def read_stamp(path: str):
+    """Return the stamp stored with the index, or None if there is no valid index."""
+    meta = _read(os.path.join(path, "meta"), None)
+    if not isinstance(meta, dict) or meta.get("format") != SEARCH_FORMAT:
+        return None
+    return meta.get("stamp")
+
+
+def _write_stamp(path: str, stamp) -> None:
+    _write(os.path.join(path, "meta"), {"format": SEARCH_FORMAT, "stamp": stamp})
+
+
+def build(path: str, tasks, stamp) -> None:
+    """Write a complete index of 'tasks' (any iterable of task dicts)."""
+    import glob
+
+    postings: dict[str, dict[str, list[int]]] = {}
+    docs: dict[str, dict[int, tuple]] = {}
+    for task in tasks:
+        task_id = task["id"]
+        docs.setdefault(_doc_bucket(task_id), {})[task_id] = _doc(task)
+        for token in tokenize(task.get("description", "")):
+            bucket = postings.setdefault(_token_bucket(token), {})
+            bucket.setdefault(token, []).append(task_id)
+
+    # Replace whatever was there before
+    os.makedirs(path, exist_ok=True)
+    for old in glob.glob(os.path.join(path, "[td]-*")):
+        os.remove(old)
+    for name, bucket in postings.items():
+        for ids in bucket.values():
+            ids.sort()
+        _write(os.path.join(path, name), bucket)
+    for name, bucket in docs.items():
+        _write(os.path.join(path, name), bucket)
+    _write_stamp(path, stamp)
+
+
+def apply(path: str, changes: list[dict], stamp) -> None:
+    """
+    Update the index with the change records of one save ("add", "update"
+    with the whole task, "delete" with its id) and store the new stamp.
+    - Only the document and token buckets of the changed tasks are rewritten.
+    """
+    docs: dict[str, dict] = {}
+    postings: dict[str, dict] = {}
+
+    def doc_bucket(task_id: int) -> dict:
+        name = _doc_bucket(task_id)
+        if name not in docs:
+            docs[name] = _read(os.path.join(path, name), {})
+        return docs[name]
+
+    def token_ids(token: str) -> list[int]:
+        name = _token_bucket(token)
+        if name not in postings:
+            postings[name] = _read(os.path.join(path, name), {})
+        return postings[name].setdefault(token, [])
+
+    for change in changes:
+        op = change.get("op")
+        if op in ("add", "update"):
+            task = change["task"]
+            task_id = task["id"]
+        elif op == "delete":
+            task = None
+            task_id = change["id"]
+        else:
+            continue
+
+        bucket = doc_bucket(task_id)
+        old = bucket.pop(task_id, None)
+        old_tokens = tokenize(old[0]) if old else set()
+        new_tokens = set()
+        if task is not None:
+            bucket[task_id] = _doc(task)
+            new_tokens = tokenize(task.get("description", ""))
+
+        for token in old_tokens - new_tokens:
+            ids = token_ids(token)
+            position = bisect.bisect_left(ids, task_id)
+            if position < len(ids) and ids[position] == task_id:
+                del ids[position]
+        for token in new_tokens - old_tokens:
+            ids = token_ids(token)
+            if not ids or task_id > ids[-1]:
+                # New tasks have the highest id: append
+                ids.append(task_id)
+            else:
+                position = bisect.bisect_left(ids, task_id)
+                if position == len(ids) or ids[position] != task_id:
+                    ids.insert(position, task_id)
+
+    for name, bucket in docs.items():
+        _write(os.path.join(path, name), bucket)
+    for name, bucket in postings.items():
+        _write(os.path.join(path, name), {token: ids for token, ids in bucket.items() if ids})
+    _write_stamp(path, stamp)
+
+
+def _matching_ids(path: str, term: str) -> set[int]:
+    """Return the ids of the tasks with the token 'term' (or starting with it, for 'term*')."""
+    import glob
+
+    if not term.endswith("*"):
+        bucket = _read(os.path.join(path, _token_bucket(term)), {})
+        return set(bucket.get(term, ()))
+
+    prefix = term[:-1]
+    if len(prefix) >= TOKEN_BUCKET_CHARS:
+        names = [os.path.join(path, _token_bucket(prefix))]
+    else:
+        # Short prefix: every bucket whose tokens start with it
+        names = glob.glob(os.path.join(path, _token_bucket(prefix) + "*"))
+    ids = set()
+    for name in names:
+        for token, token_ids in _read(name, {}).items():
+            if token.startswith(prefix):
+                ids.update(token_ids)
+    return ids
+
+
+def parse_query(words: list[str]) -> list[str]:
+    """
+    Turn the query words into index terms (all of them must match).
+    - Words are split like descriptions; a trailing '*' makes the last
+      token of the word a prefix ('rev*' matches 'review' and 'revert').
+    """
+    terms = []
+    for word in words:
+        tokens = _TOKEN.findall(word.casefold())
+        if tokens and word.endswith("*"):
+            tokens[-1] += "*"
+        terms.extend(tokens)
+    return terms
+
+
+def query(path: str, terms: list[str], status: str = "all", limit: int | None = None) -> list[dict]:
+    """
+    Return the tasks (ordered by id) that match every term and the status.
+    - Posting lists are intersected smallest first; only the document
+      buckets of the matching ids are read.
+    """
+    if not terms:
+        return []
+
+    sets = []
+    for term in terms:
+        ids = _matching_ids(path, term)
+        if not ids:
+            return []
+        sets.append(ids)
+    sets.sort(key=len)
+    matches = set.intersection(*sets)
+
+    results = []
+    docs: dict[str, dict] = {}
+    for task_id in sorted(matches):
+        name = _doc_bucket(task_id)
+        if name not in docs:
+            docs[name] = _read(os.path.join(path, name), {})
+        doc = docs[name].get(task_id)
+        if doc is None or (status != "all" and doc[1] != status):
+            continue
+        description, task_status, created_at, updated_at = doc
+        results.append(
+            {
+                "id": task_id,
+                "description": description,
+                "status": task_status,
+                "createdAt": created_at,
+                "updatedAt": updated_at,
+            }
+        )
+        if limit is not None and len(results) >= limit:
+            break
+    return results
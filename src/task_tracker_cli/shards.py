@@ -0,0 +1,340 @@
+"""
+Sharded storage backend (TASK_CLI_STORAGE=sharded).
+
+Tasks are split by id range across small JSON files in a directory next to
+the tasks file (tasks.json -> tasks.shards/):
+
+    manifest.json       last_id, shard size, version and per-shard status counts
+    shard-000000.json   tasks with ids 0 ... SHARD_SIZE - 1
+    shard-000001.json   tasks with ids SHARD_SIZE ... 2 * SHARD_SIZE - 1
+
+A shard is only read when a command needs one of its tasks, and a commit
+rewrites only the shards that changed (plus the manifest). A mutation costs
+the size of one shard, whatever the total number of tasks. ShardStore has
+the same interface as SqliteStore, so the domain functions in cli.py use it
+through data['_store'] in the same way.
+"""
+
+import bisect
+import json
+import operator
+import os
+
+from task_tracker_cli import fileio, locking
+
+
+# Ids per shard file (only used when a new store is created; existing
+# stores keep the size recorded in their manifest)
+SHARD_SIZE = 10_000
+
+MANIFEST_NAME = "manifest.json"
+
+
+def shards_path(tasks_file: str) -> str:
+    """Return the shard directory that replaces 'tasks_file' (tasks.json -> tasks.shards)."""
+    return os.path.splitext(tasks_file)[0] + ".shards"
+
+
+def manifest_path(tasks_file: str) -> str:
+    return os.path.join(shards_path(tasks_file), MANIFEST_NAME)
+
+
+class ShardStore:
+    """
+    Tasks stored in id-range shard files.
+    - Loaded shards are kept in memory ({id: task}); changes stay there
+      until commit() is called.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.loaded: dict[int, dict[int, dict]] = {}
+        self.dirty: set[int] = set()
+        self._open()
+
+    def _open(self) -> None:
+        """Read the manifest (or start an empty store); no shard is read yet."""
+        self.manifest = self._read_manifest() or {
+            "last_id": 0,
+            "shard_size": SHARD_SIZE,
+            "version": 0,
+            "shards": {},
+        }
+        self.shard_size = self.manifest["shard_size"]
+
+    def _read_manifest(self) -> dict | None:
+        try:
+            with open(os.path.join(self.path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    # --- shard access ---
+    def _shard_file(self, number: int) -> str:
+        return os.path.join(self.path, f"shard-{number:06d}.json")
+
+    def _counts(self, number: int) -> dict[str, int]:
+        """Return the status counters of a shard from the manifest (keys are strings in JSON)."""
+        return self.manifest["shards"].setdefault(str(number), {})
+
+    def _shard(self, number: int) -> dict[int, dict]:
+        """Return the tasks of a shard ({id: task}), reading its file the first time."""
+        shard = self.loaded.get(number)
+        if shard is None:
+            shard = {}
+            if str(number) in self.manifest["shards"]:
+                with open(self._shard_file(number), "r", encoding="utf-8") as f:
+                    for task in json.load(f)["tasks"]:
+                        shard[task["id"]] = task
+            self.loaded[number] = shard
+        return shard
+
+    def _numbers(self, status: str | None = None) -> list[int]:
+        """Shard numbers in id order, skipping those with no task of 'status' ('all'/None: any)."""
+        numbers = []
+        for key, counts in self.manifest["shards"].items():
+            if status in (None, "all"):
+                matching = sum(counts.values())
+            else:
+                matching = counts.get(status, 0)
+            if matching:
+                numbers.append(int(key))
+        numbers.sort()
+        return numbers
+
+    def _count(self, number: int, status: str, amount: int) -> None:
+        counts = self._counts(number)
+        counts[status] = counts.get(status, 0) + amount
+        if not counts[status]:
+            del counts[status]
+
+    # --- same interface as SqliteStore ---
+    def close(self) -> None:
+        self.loaded.clear()
+
+    def begin(self) -> None:
+        """Nothing to start: commit() refuses to overwrite another process's commit."""
+
+    def commit(self) -> None:
+        """
+        Rewrite the changed shards, then the manifest (bumping its version).
+        - Raise locking.ConflictError if another process committed since
+          this store was opened (the caller holds the exclusive lock).
+        """
+        if not self.dirty:
+            return
+        on_disk = self._read_manifest()
+        if (on_disk["version"] if on_disk else 0) != self.manifest["version"]:
+            raise locking.ConflictError(f"{self.path} was changed by another process.")
+        os.makedirs(self.path, exist_ok=True)
+        for number in sorted(self.dirty):
+            tasks = sorted(self.loaded[number].values(), key=operator.itemgetter("id"))
+            if tasks:
+                content = json.dumps(
+                    {"tasks": tasks}, ensure_ascii=False, separators=(",", ":")
+                )
+                fileio.replace_file(self._shard_file(number), content.encode("utf-8"))
+            else:
+                # Empty shard: drop its file and its manifest entry
+                self.manifest["shards"].pop(str(number), None)
+                try:
+                    os.remove(self._shard_file(number))
+                except FileNotFoundError:
+                    pass
+        self.dirty.clear()
+        self.manifest["version"] += 1
+        fileio.replace_file(
+            os.path.join(self.path, MANIFEST_NAME),
+            json.dumps(self.manifest, indent=2).encode("utf-8"),
+        )
+
+    def rollback(self) -> None:
+        """Drop the pending changes (the shards are read again when needed)."""
+        self.loaded.clear()
+        self.dirty.clear()
+        self._open()
+
+    def get_version(self) -> int:
+        return self.manifest["version"]
+
+    def get_last_id(self) -> int:
+        return self.manifest["last_id"]
+
+    def set_last_id(self, last_id: int) -> None:
+        self.manifest["last_id"] = last_id
+
+    def insert(self, task: dict) -> None:
+        """Insert a task (dict with id, description, status, createdAt, updatedAt)."""
+        self.insert_many([task])
+
+    def insert_many(self, tasks) -> None:
+        for task in tasks:
+            number = task["id"] // self.shard_size
+            shard = self._shard(number)
+            old = shard.get(task["id"])
+            if old is not None:
+                self._count(number, old["status"], -1)
+            shard[task["id"]] = dict(task)
+            self._count(number, task["status"], 1)
+            self.dirty.add(number)
+
+    def get(self, task_id: int) -> dict | None:
+        """Return the task with id == task_id (reads only its shard), or None."""
+        number = task_id // self.shard_size
+        if str(number) not in self.manifest["shards"] and number not in self.loaded:
+            return None
+        return self._shard(number).get(task_id)
+
+    def update(self, task_id: int, **fields) -> dict | None:
+        """
+        Change some fields of a task, e.g. update(3, status="done", updatedAt=...).
+        - Return the updated task, or None if no task has that id.
+        """
+        task = self.get(task_id)
+        if task is None:
+            return None
+        number = task_id // self.shard_size
+        if "status" in fields:
+            self._count(number, task["status"], -1)
+            self._count(number, fields["status"], 1)
+        task.update(fields)
+        self.dirty.add(number)
+        return task
+
+    def delete(self, task_id: int) -> dict | None:
+        """Delete a task and return it, or None if no task has that id."""
+        task = self.get(task_id)
+        if task is None:
+            return None
+        number = task_id // self.shard_size
+        del self.loaded[number][task_id]
+        self._count(number, task["status"], -1)
+        self.dirty.add(number)
+        return task
+
+    def _iter_tasks(self, status: str, numbers: list[int] | None = None):
+        """Yield the tasks with 'status' ('all' for every task) in id order."""
+        for number in numbers if numbers is not None else self._numbers(status):
+            for task_id in sorted(self._shard(number)):
+                task = self.loaded[number][task_id]
+                if status == "all" or task["status"] == status:
+                    yield task
+
+    def iter_by_status(self, status: str):
+        """
+        Yield the tasks with that status ('all' for every task) in id order.
+        - Shards that are not loaded yet are read one at a time and not
+          kept, so memory stays at the size of one shard.
+        """
+        for number in self._numbers(status):
+            shard = self.loaded.get(number)
+            if shard is None:
+                with open(self._shard_file(number), "r", encoding="utf-8") as f:
+                    tasks = json.load(f)["tasks"]
+            else:
+                tasks = sorted(shard.values(), key=operator.itemgetter("id"))
+            for task in tasks:
+                if status == "all" or task["status"] == status:
+                    yield task
+
+    def list_by_status(
+        self, status: str, offset: int = 0, limit: int | None = None
+    ) -> list[dict]:
+        """
+        Return the tasks with that status ('all' for every task), ordered by id.
+        - Shards with no matching task are never read, and neither are the
+          shards entirely inside 'offset' (the manifest says how many
+          matches each one has).
+        """
+        numbers = self._numbers(status)
+        while numbers:
+            counts = self._counts(numbers[0])
+            matching = sum(counts.values()) if status == "all" else counts.get(status, 0)
+            if offset < matching:
+                break
+            offset -= matching
+            numbers.pop(0)
+
+        tasks = self._iter_tasks(status, numbers)
+        result = []
+        for task in tasks:
+            if offset:
+                offset -= 1
+                continue
+            if limit is not None and len(result) >= limit:
+                break
+            result.append(task)
+        return result
+
+    def list_by_time(
+        self,
+        field: str,
+        status: str,
+        since: int | None = None,
+        until: int | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Return the tasks with since <= field <= until, ordered by 'field'."""
+        matches = [
+            task
+            for task in self._iter_tasks(status)
+            if isinstance(task.get(field), int)
+            and (since is None or task[field] >= since)
+            and (until is None or task[field] <= until)
+        ]
+        matches.sort(key=operator.itemgetter(field))
+        stop = None if limit is None else offset + limit
+        return matches[offset:stop]
+
+    def select_ids(
+        self,
+        ranges: list,
+        status: str | None = None,
+        before: int | None = None,
+    ) -> list[int]:
+        """
+        Return the ids (ascending) inside any of the (first, last) ranges
+        (sorted, not overlapping; all ids if there are none), with that
+        status and created before 'before' (None means no filter).
+        - Only the shards that overlap the ranges and have tasks with that
+          status are read.
+        """
+        ranges = sorted(ranges or ())
+        starts = [first for first, _ in ranges]
+
+        def in_ranges(first_id: int, last_id: int) -> bool:
+            # Ranges do not overlap: only the last one starting before
+            # last_id can reach first_id
+            i = bisect.bisect_right(starts, last_id) - 1
+            return i >= 0 and ranges[i][1] >= first_id
+
+        numbers = self._numbers(status)
+        if ranges:
+            numbers = [
+                number
+                for number in numbers
+                if in_ranges(number * self.shard_size, (number + 1) * self.shard_size - 1)
+            ]
+        ids = []
+        for task in self._iter_tasks(status or "all", numbers):
+            task_id = task["id"]
+            if ranges and not in_ranges(task_id, task_id):
+                continue
+            if before is not None:
+                created = task.get("createdAt")
+                if not isinstance(created, int) or created >= before:
+                    continue
+            ids.append(task_id)
+        return ids
+
+    def count_by_status(self) -> dict[str, int]:
+        """Return {status: number of tasks}, summed from the manifest."""
+        totals: dict[str, int] = {}
+        for counts in self.manifest["shards"].values():
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        return totals
+
+    def is_empty(self) -> bool:
+        return not self._numbers()
@@ -0,0 +1,284 @@
+"""
+SQLite storage backend (TASK_CLI_STORAGE=sqlite).
+
+Tasks live in one table with indexes on id, status and timestamps, so point
+lookups and filtered lists only touch the matching rows instead of loading
+the whole dataset. The domain functions in cli.py delegate to SqliteStore
+when the loaded data carries one (data['_store']).
+"""
+
+import os
+import sqlite3
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Bump (PRAGMA user_version) when the schema changes; see _upgrade()
+SCHEMA_VERSION = 1
+
+# Version 0 stored timestamps as "%d/%m/%Y %H:%M:%S" local-time strings
+_OLD_TIMESTAMP = (
+    "CASE WHEN typeof({column}) = 'text' AND {column} LIKE '__/__/____ __:__:__' "
+    "THEN CAST(strftime('%s', substr({column}, 7, 4) || '-' || substr({column}, 4, 2) "
+    "|| '-' || substr({column}, 1, 2) || ' ' || substr({column}, 12, 8), 'utc') AS INTEGER) "
+    "ELSE {column} END"
+)
+
+_UPGRADE_FROM_0 = f"""
+BEGIN;
+DROP INDEX IF EXISTS idx_tasks_status;
+DROP INDEX IF EXISTS idx_tasks_created_at;
+DROP INDEX IF EXISTS idx_tasks_updated_at;
+ALTER TABLE tasks RENAME TO tasks_v0;
+{_SCHEMA}
+INSERT INTO tasks (id, description, status, created_at, updated_at)
+SELECT id, description, status,
+    {_OLD_TIMESTAMP.format(column="created_at")},
+    {_OLD_TIMESTAMP.format(column="updated_at")}
+FROM tasks_v0;
+DROP TABLE tasks_v0;
+COMMIT;
+"""
+
+_COLUMNS = (
+    "id, description, status, "
+    'created_at AS "createdAt", updated_at AS "updatedAt"'
+)
+
+# Task keys that can be changed with SqliteStore.update() (or sorted by)
+_FIELDS = {
+    "description": "description",
+    "status": "status",
+    "createdAt": "created_at",
+    "updatedAt": "updated_at",
+}
+
+
+def database_path(tasks_file: str) -> str:
+    """Return the database that replaces 'tasks_file' (tasks.json -> tasks.db)."""
+    return os.path.splitext(tasks_file)[0] + ".db"
+
+
+def _row_to_task(cursor: sqlite3.Cursor, row: tuple) -> dict:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SqliteStore:
+    """
+    Tasks stored in a SQLite database.
+    - Changes are grouped in a transaction until commit() is called.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # The daemon uses the store from its worker threads (one at a time)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = _row_to_task
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._upgrade()
+
+    def _upgrade(self) -> None:
+        """Create the schema, or bring a database from an older version up to date."""
+        version = self.connection.execute("PRAGMA user_version").fetchone()["user_version"]
+        if version == SCHEMA_VERSION:
+            return
+        exists = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+        ).fetchone()
+        if version == 0 and exists:
+            # Timestamps were TEXT: copy the tasks into the INTEGER columns
+            self.connection.executescript(_UPGRADE_FROM_0)
+        else:
+            self.connection.executescript(_SCHEMA)
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def begin(self) -> None:
+        """
+        Start the write transaction now (BEGIN IMMEDIATE) instead of at the
+        first change: what is read next cannot change until commit().
+        """
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self) -> None:
+        """Commit the pending changes and bump the version counter."""
+        self.connection.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', 1) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+        )
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        """Drop the pending changes."""
+        self.connection.rollback()
+
+    def get_version(self) -> int:
+        """Return a counter that changes with every commit."""
+        row = self.connection.execute(
+            "SELECT value AS value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        return row["value"] if row else 0
+
+    def get_last_id(self) -> int:
+        row = self.connection.execute(
+            "SELECT value AS value FROM meta WHERE key = 'last_id'"
+        ).fetchone()
+        return row["value"] if row else 0
+
+    def set_last_id(self, last_id: int) -> None:
+        self.connection.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_id', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (last_id,),
+        )
+
+    def insert(self, task: dict) -> None:
+        """Insert a task (dict with id, description, status, createdAt, updatedAt)."""
+        self.insert_many([task])
+
+    def insert_many(self, tasks) -> None:
+        self.connection.executemany(
+            "INSERT INTO tasks (id, description, status, created_at, updated_at) "
+            "VALUES (:id, :description, :status, :createdAt, :updatedAt)",
+            # Named parameters need real dicts (tasks may be cli.Task objects)
+            map(dict, tasks),
+        )
+
+    def get(self, task_id: int) -> dict | None:
+        """Return the task with id == task_id (primary key lookup), or None."""
+        return self.connection.execute(
+            f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+
+    def update(self, task_id: int, **fields) -> dict | None:
+        """
+        Change some fields of a task, e.g. update(3, status="done", updatedAt=...).
+        - Return the updated task, or None if no task has that id.
+        """
+        assignments = ", ".join(f"{_FIELDS[key]} = :{key}" for key in fields)
+        cursor = self.connection.execute(
+            f"UPDATE tasks SET {assignments} WHERE id = :id", {**fields, "id": task_id}
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self.get(task_id)
+
+    def delete(self, task_id: int) -> dict | None:
+        """Delete a task and return it, or None if no task has that id."""
+        task = self.get(task_id)
+        if task is not None:
+            self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return task
+
+    def list_by_status(
+        self, status: str, offset: int = 0, limit: int | None = None
+    ) -> list[dict]:
+        """
+        Return the tasks with that status ('all' for every task), ordered by id.
+        - offset/limit are applied by SQLite, so only that page is read.
+        """
+        where = "" if status == "all" else "WHERE status = :status"
+        return self.connection.execute(
+            f"SELECT {_COLUMNS} FROM tasks {where} ORDER BY id LIMIT :limit OFFSET :offset",
+            {"status": status, "limit": -1 if limit is None else limit, "offset": offset},
+        ).fetchall()
+
+    def iter_by_status(self, status: str):
+        """Yield the tasks with that status ('all' for every task) in id order, row by row."""
+        where = "" if status == "all" else "WHERE status = :status"
+        return self.connection.execute(
+            f"SELECT {_COLUMNS} FROM tasks {where} ORDER BY id", {"status": status}
+        )
+
+    def list_by_time(
+        self,
+        field: str,
+        status: str,
+        since: int | None = None,
+        until: int | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        Return the tasks with since <= field <= until ordered by 'field'
+        (createdAt or updatedAt), answered from the timestamp index.
+        """
+        column = _FIELDS[field]
+        conditions = []
+        if status != "all":
+            conditions.append("status = :status")
+        if since is not None:
+            conditions.append(f"{column} >= :since")
+        if until is not None:
+            conditions.append(f"{column} <= :until")
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return self.connection.execute(
+            f"SELECT {_COLUMNS} FROM tasks {where} "
+            f"ORDER BY {column}, id LIMIT :limit OFFSET :offset",
+            {
+                "status": status,
+                "since": since,
+                "until": until,
+                "limit": -1 if limit is None else limit,
+                "offset": offset,
+            },
+        ).fetchall()
+
+    def select_ids(
+        self,
+        ranges: list,
+        status: str | None = None,
+        before: int | None = None,
+    ) -> list[int]:
+        """
+        Return the ids (ascending) inside any of the (first, last) ranges
+        (all ids if there are none), with that status and created before
+        'before' (None means no filter).
+        """
+        conditions = []
+        params = {"status": status, "before": before}
+        if ranges:
+            parts = []
+            for i, (first, last) in enumerate(ranges):
+                parts.append(f"id BETWEEN :first{i} AND :last{i}")
+                params[f"first{i}"] = first
+                params[f"last{i}"] = last
+            conditions.append("(" + " OR ".join(parts) + ")")
+        if status is not None:
+            conditions.append("status = :status")
+        if before is not None:
+            conditions.append("created_at < :before")
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT id AS id FROM tasks {where} ORDER BY id", params
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def count_by_status(self) -> dict[str, int]:
+        """Return {status: number of tasks}, answered from the status index."""
+        rows = self.connection.execute(
+            "SELECT status AS status, COUNT(*) AS count FROM tasks GROUP BY status"
+        ).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 AS one FROM tasks LIMIT 1").fetchone() is None
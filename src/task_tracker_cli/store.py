@@ -0,0 +1,308 @@
+"""
+Library API: the task operations for other Python code.
+
+    from task_tracker_cli.store import TaskStore
+
+    store = TaskStore("work/tasks.json")
+    task = store.add_task("Buy milk")
+    store.set_task_status(task["id"], "done")
+    done = store.list_tasks_by_status("done")
+
+A TaskStore owns its tasks file: it keeps the loaded tasks in memory between
+calls and reloads them only when the file changes on disk. Its file and
+storage mode travel with every call (cli.TasksSource), so stores of different
+files work in parallel and never touch the CLI's settings. Saves go through
+the same locking and conflict retries as 'task-cli', so stores, the CLI and
+other processes can share one file. Returned tasks are plain dicts (copies).
+
+AsyncTaskStore wraps a TaskStore for asyncio services: disk work runs on a
+thread pool, and writes requested while a save is running are coalesced
+into the next single load + save.
+
+    async with AsyncTaskStore("tasks.json") as store:
+        tasks = await asyncio.gather(*(store.add_task(f"Task {n}") for n in range(100)))
+"""
+
+import asyncio
+import contextlib
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from task_tracker_cli import cli, locking
+
+# Write operations accepted by TaskStore.batch() -> domain function
+_WRITES = {
+    "add_task": cli.add_task,
+    "update_task": cli.update_task,
+    "delete_task": cli.delete_task,
+    "set_task_status": cli.set_task_status,
+}
+
+
+def _copy(task):
+    """Return a task as a new dict (None stays None)."""
+    return None if task is None else dict(task)
+
+
+def _check(name: str, args: tuple) -> tuple:
+    """
+    Raise ValueError/TypeError for an operation the CLI would reject too.
+    - Return the arguments to apply (descriptions stripped, like the CLI does).
+    """
+    if name not in _WRITES:
+        raise ValueError(f"unknown operation: {name!r}")
+    if name in ("add_task", "update_task"):
+        description = args[-1]
+        if not isinstance(description, str) or not description.strip():
+            raise ValueError("task description cannot be empty.")
+        args = (*args[:-1], description.strip())
+    if name == "set_task_status" and args[-1] not in cli.STATUSES:
+        raise ValueError(f"invalid status: {args[-1]!r}")
+    if name != "add_task" and not isinstance(args[0], int):
+        raise TypeError(f"task id must be an int, got {args[0]!r}")
+    return args
+
+
+class TaskStore:
+    """
+    Tasks of one file, with the operations of the domain layer.
+    - path: the tasks file (its journal, cache, shards... live next to it).
+    - storage: "json", "journal", "sqlite" or "sharded" (default: the
+      TASK_CLI_STORAGE setting); anything else raises ValueError.
+    - Thread-safe. Reads run in parallel ("json" and "journal"; a database
+      or shard store answers one at a time); a write runs alone.
+    """
+
+    def __init__(
+        self, path: str = "tasks.json", storage: str | None = None, use_cache: bool = True
+    ) -> None:
+        self.path = os.path.abspath(path)
+        self.storage = storage or cli.STORAGE
+        self.use_cache = use_cache
+        self.source = cli.TasksSource(self.path, self.storage, use_cache)
+        self._lock = locking.ReadWriteLock()
+        # Stores read their pages lazily (that changes them): one reader at a time
+        self._shared_reads = self.storage not in cli.STORE_MODES
+        self._data = None
+        self._stamp = None
+
+    def _load(self) -> dict:
+        """
+        Return the tasks in memory, reloading them if the file changed on disk.
+        - Called with the write hold of self._lock.
+        """
+        stamp = cli._file_stamp(self.source)
+        data = self._data
+        # Pending changes mean the last save lost a race: start over too
+        if data is None or data["_changes"] or stamp != self._stamp:
+            self._close_data()
+            data = self._data = cli.load_tasks(self.source)
+            self._stamp = stamp
+        return data
+
+    def _read(self, function):
+        """Return function(data) on the current tasks, alongside other readers."""
+        data = self._data
+        if data is None or data["_changes"] or cli._file_stamp(self.source) != self._stamp:
+            with self._lock.write():
+                self._load()
+        with self._lock.read() if self._shared_reads else self._lock.write():
+            data = self._data
+            if data is not None:
+                with cli._tasks_lock(source=self.source):
+                    return function(data)
+        # Released by reload() in between: load again, alone
+        with self._lock.write(), cli._tasks_lock(source=self.source):
+            return function(self._load())
+
+    def _close_data(self) -> None:
+        if self._data is not None and self._data.get("_store") is not None:
+            self._data["_store"].close()
+        self._data = None
+
+    def _apply(self, operations: list[tuple]) -> list:
+        """
+        Apply [(name, args), ...] with one load and at most one save.
+        - Same retries as the CLI: on a conflict every operation runs again
+          on fresh data; the last attempt holds the exclusive lock.
+        """
+        locked = cli._store_writes_locked(self.storage)
+        for attempt in range(1, cli.SAVE_ATTEMPTS + 1):
+            final = attempt == cli.SAVE_ATTEMPTS or locked
+            lock = cli._tasks_lock(exclusive=True, source=self.source)
+            with self._lock.write(), lock if final else contextlib.nullcontext():
+                data = self._load()
+                results = [_copy(_WRITES[name](data, *args)) for name, args in operations]
+                if not data["_changes"]:
+                    return results
+                try:
+                    cli.save_tasks(data)
+                except cli.ConflictError:
+                    continue
+                self._stamp = cli._file_stamp(self.source)
+                if (
+                    data.get("_store") is None
+                    and cli._disk_version(self.source) != data["version"]
+                ):
+                    # Someone saved right after us: the stamp is not ours
+                    self._stamp = None
+                return results
+
+    # --- writes ---
+    def batch(self, operations: list[tuple]) -> list:
+        """
+        Apply several writes with one load and one save, e.g.
+        batch([("add_task", ("Buy milk",)), ("set_task_status", (3, "done"))]).
+        - Return the result of each operation, in order.
+        - Raise ValueError before changing anything if one is invalid.
+        """
+        operations = [(name, _check(name, tuple(args))) for name, args in operations]
+        return self._apply(operations)
+
+    def add_task(self, description: str) -> dict:
+        """Add a task and return it."""
+        return self.batch([("add_task", (description,))])[0]
+
+    def update_task(self, task_id: int, description: str) -> dict | None:
+        """Change the description of a task; return it, or None if the id does not exist."""
+        return self.batch([("update_task", (task_id, description))])[0]
+
+    def delete_task(self, task_id: int) -> dict | None:
+        """Delete a task; return it, or None if the id does not exist."""
+        return self.batch([("delete_task", (task_id,))])[0]
+
+    def set_task_status(self, task_id: int, status: str) -> dict | None:
+        """Change the status of a task; return it, or None if the id does not exist."""
+        return self.batch([("set_task_status", (task_id, status))])[0]
+
+    # --- reads ---
+    def get_task(self, task_id: int) -> dict | None:
+        """Return one task, or None if the id does not exist."""
+
+        def find(data: dict) -> dict | None:
+            store = data.get("_store")
+            task = store.get(task_id) if store is not None else cli._find_task(data, task_id)
+            return _copy(task)
+
+        return self._read(find)
+
+    def list_tasks_by_status(
+        self, status: str = "all", offset: int = 0, limit: int | None = None
+    ) -> list[dict]:
+        """Return the tasks with that status ('all' for every task), ordered by id."""
+        return self._read(
+            lambda data: [
+                dict(task) for task in cli.list_tasks_by_status(data, status, offset, limit)
+            ]
+        )
+
+    def count_tasks_by_status(self) -> dict[str, int]:
+        """Return {status: number of tasks}, archived tasks included (like 'task-cli stats')."""
+        return self._read(
+            lambda data: cli._add_archived_counts(cli.count_tasks_by_status(data), self.source)
+        )
+
+    def reload(self) -> None:
+        """Forget the tasks in memory; the next call reads the file again."""
+        with self._lock.write():
+            self._close_data()
+
+    def close(self) -> None:
+        """Release the tasks in memory (and the database connection, if any)."""
+        self.reload()
+
+
+class AsyncTaskStore:
+    """
+    asyncio facade over a TaskStore.
+    - Every call runs on a thread pool, so the event loop never waits for
+      the disk.
+    - Writes are queued; a single flusher applies everything queued so far
+      with one TaskStore.batch() (one load, one save), then the next group.
+      Under load, N concurrent writes cost a few saves instead of N.
+    - Use from one event loop; close with 'await store.aclose()' or
+      'async with'.
+    """
+
+    def __init__(
+        self,
+        path: str = "tasks.json",
+        storage: str | None = None,
+        max_workers: int = 4,
+        store: TaskStore | None = None,
+    ) -> None:
+        self.store = store or TaskStore(path, storage)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="task-store")
+        self._pending: list[tuple] = []
+        self._flusher = None
+
+    async def __aenter__(self) -> "AsyncTaskStore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args))
+
+    def _write(self, name: str, args: tuple) -> asyncio.Future:
+        """Queue a write and return the future of its result."""
+        args = _check(name, args)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((name, args, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush())
+        return future
+
+    async def _flush(self) -> None:
+        while self._pending:
+            # Let the writes requested in this loop iteration join the group
+            await asyncio.sleep(0)
+            group, self._pending = self._pending, []
+            try:
+                results = await self._run(
+                    self.store.batch, [(name, args) for name, args, _ in group]
+                )
+            except Exception as error:
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for (_, _, future), result in zip(group, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    # --- writes ---
+    async def add_task(self, description: str) -> dict:
+        return await self._write("add_task", (description,))
+
+    async def update_task(self, task_id: int, description: str) -> dict | None:
+        return await self._write("update_task", (task_id, description))
+
+    async def delete_task(self, task_id: int) -> dict | None:
+        return await self._write("delete_task", (task_id,))
+
+    async def set_task_status(self, task_id: int, status: str) -> dict | None:
+        return await self._write("set_task_status", (task_id, status))
+
+    # --- reads ---
+    async def get_task(self, task_id: int) -> dict | None:
+        return await self._run(self.store.get_task, task_id)
+
+    async def list_tasks_by_status(
+        self, status: str = "all", offset: int = 0, limit: int | None = None
+    ) -> list[dict]:
+        return await self._run(self.store.list_tasks_by_status, status, offset, limit)
+
+    async def count_tasks_by_status(self) -> dict[str, int]:
+        return await self._run(self.store.count_tasks_by_status)
+
+    async def aclose(self) -> None:
+        """Wait for the queued writes, then stop the thread pool."""
+        while self._flusher is not None and not self._flusher.done():
+            await self._flusher
+        await self._run(self.store.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,91 @@
+"""
+Task timestamps.
+
+createdAt and updatedAt are stored as integers (seconds since the epoch), so
+they sort and compare without parsing. Older files stored them as local-time
+strings ("%d/%m/%Y %H:%M:%S"); those are converted when read.
+"""
+
+import time
+
+
+# Format of the old string timestamps, also used to display them
+DISPLAY_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+# Extra formats accepted on the command line (--since / --until)
+_INPUT_FORMATS = [
+    ("%Y-%m-%dT%H:%M:%S", False),
+    ("%Y-%m-%d %H:%M:%S", False),
+    ("%Y-%m-%dT%H:%M", False),
+    ("%Y-%m-%d %H:%M", False),
+    ("%Y-%m-%d", True),
+    (DISPLAY_FORMAT, False),
+    ("%d/%m/%Y", True),
+]
+
+# Timestamp fields of a task
+FIELDS = ("createdAt", "updatedAt")
+
+
+def now() -> int:
+    """Return the current time as a stored timestamp."""
+    return int(time.time())
+
+
+def to_epoch(value) -> int:
+    """
+    Return 'value' as a stored timestamp.
+    - Integers are returned as they are; old "%d/%m/%Y %H:%M:%S" strings are
+      read as local time.
+    - Raise ValueError for anything else.
+    """
+    if isinstance(value, int):
+        return value
+    from datetime import datetime
+
+    return int(datetime.strptime(value, DISPLAY_FORMAT).timestamp())
+
+
+def upgrade(task: dict) -> dict:
+    """Convert old string timestamps of 'task' in place and return it."""
+    for field in FIELDS:
+        value = task.get(field)
+        if isinstance(value, str):
+            try:
+                task[field] = to_epoch(value)
+            except ValueError:
+                # Unknown format: keep it, it is still shown as is
+                pass
+    return task
+
+
+def display(value) -> str:
+    """Return a stored timestamp as local time for the tables."""
+    if isinstance(value, int):
+        return time.strftime(DISPLAY_FORMAT, time.localtime(value))
+    return str(value)
+
+
+def parse(text: str, end_of_day: bool = False) -> int:
+    """
+    Parse a command-line date into a stored timestamp.
+    - Accepts epoch seconds, "YYYY-MM-DD[ HH:MM[:SS]]" (or with a "T") and
+      "DD/MM/YYYY[ HH:MM:SS]", in local time.
+    - With end_of_day, a date without a time means its last second
+      (so '--until 2024-05-31' includes the whole day).
+    - Raise ValueError if the text matches none of them.
+    """
+    text = text.strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    from datetime import datetime, timedelta
+
+    for pattern, date_only in _INPUT_FORMATS:
+        try:
+            moment = datetime.strptime(text, pattern)
+        except ValueError:
+            continue
+        if date_only and end_of_day:
+            return int((moment + timedelta(days=1)).timestamp()) - 1
+        return int(moment.timestamp())
+    raise ValueError(f"unknown date format: {text!r}")
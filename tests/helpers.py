@@ -0,0 +1,84 @@
+"""
+Shared helpers for the behavior tests (tests/test_*.py).
+
+- temp_tasks(): points the CLI at a tasks file in a new temporary
+  directory, so your real tasks.json is never touched.
+- cli(): runs one command through the regular parser and handlers, like
+  'task-cli' does, and returns what it printed.
+- run_tests(): runs the test_* functions of a module without pytest.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import timestamps
+
+
+@contextlib.contextmanager
+def temp_tasks(storage: str = "json"):
+    """Point the CLI at a tasks file in a new temporary directory (yields the directory)."""
+    saved = (app.TASKS_FILE, app.STORAGE, app.USE_CACHE, app.HISTORY)
+    with tempfile.TemporaryDirectory() as directory:
+        app.TASKS_FILE = os.path.join(directory, "tasks.json")
+        app.STORAGE = storage
+        app.USE_CACHE = True
+        app.HISTORY = True
+        try:
+            yield directory
+        finally:
+            app.TASKS_FILE, app.STORAGE, app.USE_CACHE, app.HISTORY = saved
+
+
+@contextlib.contextmanager
+def clock(moment: int):
+    """Make timestamps.now() return 'moment' (saves and history events are stamped with it)."""
+    now = timestamps.now
+    timestamps.now = lambda: moment
+    try:
+        yield
+    finally:
+        timestamps.now = now
+
+
+def cli(*argv: str) -> str:
+    """Run one command like 'task-cli ARGV...' and return what it printed."""
+    args = app.build_parser().parse_args(list(argv))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        args.func(args)
+    return out.getvalue()
+
+
+def ids(*argv: str) -> list[int]:
+    """Return the ids printed by 'task-cli list ARGV... --format ids'."""
+    return [int(line) for line in cli("list", *argv, "--format", "ids").split()]
+
+
+def stats() -> dict[str, int]:
+    """Return the counters printed by 'task-cli stats'."""
+    counts = {}
+    for line in cli("stats").splitlines():
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if len(cells) == 2 and cells[1].isdigit():
+            counts[cells[0]] = int(cells[1])
+    return counts
+
+
+def write_file(directory: str, name: str, text: str) -> str:
+    """Write 'text' to directory/name and return the path."""
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return path
+
+
+def run_tests(namespace: dict) -> None:
+    """Run every test_* function of a test module (for 'python tests/test_X.py')."""
+    tests = [value for name, value in sorted(namespace.items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"[OK] {test.__name__}")
+    print(f"[OK] {len(tests)} tests passed.")
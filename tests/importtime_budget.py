@@ -0,0 +1,181 @@
+"""
+Regression test: start-up cost of the everyday commands.
+
+- Runs 'task-cli mark-done 1', 'list', 'stats'... in fresh interpreters with
+  'python -X importtime' and adds up the import time of every module that a
+  bare 'python -c pass' does not load.
+- Fails if a command goes over the budget, or if it imports a module that
+  only other paths need (argparse, sockets, sqlite3, gzip...).
+- Also checks that the argv fast path builds the same arguments as the
+  full argparse parser for those commands.
+
+Run from the project root (imports are timed several times; the best run
+counts, so a busy machine does not fail the check):
+
+    python tests/importtime_budget.py
+    python tests/importtime_budget.py --budget-ms 40 --runs 7
+
+tests/test_importtime.py runs the same checks with the other tests.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import task_tracker_cli
+import task_tracker_cli.cli as app
+
+# Commands that must start fast (argv after 'task-cli')
+COMMANDS = [
+    ["add", "Buy milk"],
+    ["update", "1", "Buy oat milk"],
+    ["mark-in-progress", "1"],
+    ["mark-done", "1", "2"],
+    ["delete", "2"],
+    ["list"],
+    ["list", "done"],
+    ["list", "--format", "ndjson"],
+    ["list", "done", "--format", "ids"],
+    ["add", "Buy bread", "--format", "json"],
+    ["stats"],
+    ["undo"],
+]
+
+# Modules that none of COMMANDS may import
+FORBIDDEN = [
+    "argparse",
+    "shlex",
+    "shutil",
+    "typing",
+    "socket",
+    "socketserver",
+    "sqlite3",
+    "gzip",
+    "_hashlib",
+    "asyncio",
+    "datetime",
+    "glob",
+    "heapq",
+    "task_tracker_cli.shards",
+    "task_tracker_cli.sqlite_store",
+    "task_tracker_cli.fixtures",
+]
+
+# Commands that may import a module nothing else may: saves update the
+# search index and the history, lists and stats include the archive
+ALLOWED_FOR = {
+    "task_tracker_cli.archive": ("list", "stats"),
+    "task_tracker_cli.history": ("add", "update", "mark-in-progress", "mark-done", "delete", "undo"),
+    "task_tracker_cli.search": ("add", "update", "mark-in-progress", "mark-done", "delete", "undo"),
+}
+
+# Import time allowed per command (ms) on top of the interpreter's own
+BUDGET_MS = 30.0
+
+# Runs 'task-cli ARGS...' the way the installed entry point does
+ENTRY = "import sys; from task_tracker_cli.cli import main; sys.argv[0] = 'task-cli'; main()"
+
+
+def import_times(argv: list[str], cwd: str, env: dict) -> dict[str, int]:
+    """Return {module: self import time in microseconds} for one run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(own)
+    return times
+
+
+def check_fast_path() -> list[str]:
+    """Compare _fast_parse() with the full parser; return the differences."""
+    parser = app.build_parser()
+    problems = []
+    for argv in COMMANDS:
+        fast = app._fast_parse(argv)
+        if fast is None:
+            problems.append(f"{' '.join(argv)}: not handled by the fast path")
+        elif vars(fast) != vars(parser.parse_args(argv)):
+            problems.append(f"{' '.join(argv)}: fast path arguments differ from argparse")
+    return problems
+
+
+def check_imports(budget_ms: float = BUDGET_MS, runs: int = 5) -> list[str]:
+    """Time the imports of every command in fresh interpreters; return the problems found."""
+    problems = []
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(task_tracker_cli.__file__)))
+    env = dict(os.environ, PYTHONPATH=package_root)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.pop("TASK_CLI_TRACE", None)
+    env.pop("TASK_CLI_STORAGE", None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Warm-up: write the .pyc files and a few tasks to work on
+        for argv in (["add", "first"], ["add", "second"], ["add", "third"]):
+            subprocess.run(
+                [sys.executable, "-c", ENTRY, *argv],
+                cwd=directory,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+        baseline = set(import_times(["-c", "pass"], directory, env))
+
+        for command in COMMANDS:
+            best = None
+            for _ in range(runs):
+                times = import_times(["-c", ENTRY, *command], directory, env)
+                extra = {name: own for name, own in times.items() if name not in baseline}
+                total = sum(extra.values()) / 1000
+                if best is None or total < best[0]:
+                    best = (total, extra)
+            total, extra = best
+
+            label = " ".join(command)
+            forbidden = FORBIDDEN + [
+                name for name, commands in ALLOWED_FOR.items() if command[0] not in commands
+            ]
+            loaded = [name for name in forbidden if name in extra]
+            if loaded:
+                problems.append(f"{label}: imports {', '.join(loaded)}")
+            status = "OK" if total <= budget_ms else "FAIL"
+            print(f"[{status}] {label}: {total:.1f} ms of imports ({len(extra)} modules)")
+            if total > budget_ms:
+                slowest = sorted(extra.items(), key=lambda item: item[1], reverse=True)[:5]
+                details = ", ".join(f"{name} {own / 1000:.1f}" for name, own in slowest)
+                problems.append(f"{label}: {total:.1f} ms > {budget_ms} ms ({details})")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=BUDGET_MS,
+        help="Import time allowed per command on top of the interpreter's own",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (best counts)")
+    args = parser.parse_args()
+
+    problems = check_fast_path() + check_imports(args.budget_ms, args.runs)
+    if problems:
+        for problem in problems:
+            print(f"[FAIL] {problem}")
+        sys.exit(1)
+    print(f"[OK] every command imports less than {args.budget_ms} ms of modules.")
+
+
+if __name__ == "__main__":
+    main()
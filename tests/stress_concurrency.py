@@ -0,0 +1,139 @@
+"""
+Stress test: many processes using the same tasks file at once.
+
+- Starts N worker processes; each runs a mix of add, update, mark-* and
+  list commands through run_command(), the same path as 'task-cli'.
+- Every worker remembers the ids it was given and the last description it
+  wrote to each of its tasks.
+- At the end the file must contain every added task exactly once, with
+  unique ids, the last description written by its worker and correct
+  per-status counters. Any lost update or duplicate id is reported.
+
+Run from the project root (Linux / macOS, the locks use fcntl):
+
+    python tests/stress_concurrency.py
+    python tests/stress_concurrency.py --processes 16 --operations 1000 --storage journal
+
+tests/test_concurrency.py runs a smaller version of it with the other tests.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+
+import task_tracker_cli.cli as app
+
+
+def worker(job: tuple) -> dict:
+    """Run 'operations' random commands; return the ids added and the final descriptions."""
+    number, tasks_file, storage, operations, seed = job
+    app.TASKS_FILE = tasks_file
+    app.STORAGE = storage
+    parser = app.build_parser()
+    rng = random.Random(seed)
+
+    added = []
+    descriptions = {}
+    for step in range(operations):
+        roll = rng.random()
+        if roll < 0.4 or not added:
+            description = f"w{number}-{step}"
+            result = app.run_command(parser.parse_args(["add", description]))
+            task_id = result["task"]["id"]
+            added.append(task_id)
+            descriptions[task_id] = description
+        elif roll < 0.65:
+            task_id = rng.choice(added)
+            description = f"w{number}-{step}-updated"
+            app.run_command(parser.parse_args(["update", str(task_id), description]))
+            descriptions[task_id] = description
+        elif roll < 0.8:
+            # Any task, not only ours: statuses are not checked at the end
+            command = rng.choice(["mark-done", "mark-in-progress"])
+            task_id = rng.randint(1, max(added))
+            app.run_command(parser.parse_args([command, str(task_id)]))
+        else:
+            app.run_command(parser.parse_args(["list", "--limit", "20"]))
+    return {"added": added, "descriptions": descriptions}
+
+
+def check(tasks_file: str, storage: str, results: list[dict]) -> list[str]:
+    """Compare the final tasks with what the workers did; return the problems found."""
+    app.TASKS_FILE = tasks_file
+    app.STORAGE = storage
+    data = app.load_tasks()
+    tasks = app.list_tasks_by_status(data, "all")
+    problems = []
+
+    added = [task_id for result in results for task_id in result["added"]]
+    if len(set(added)) != len(added):
+        problems.append(f"{len(added) - len(set(added))} ids were given out twice")
+
+    found = {task["id"]: task for task in tasks}
+    if len(found) != len(tasks):
+        problems.append("the file contains duplicate ids")
+    missing = set(added) - set(found)
+    if missing:
+        problems.append(f"{len(missing)} added tasks are missing (lost updates)")
+    if data["last_id"] != len(added):
+        problems.append(f"last_id is {data['last_id']}, expected {len(added)}")
+
+    stale = 0
+    for result in results:
+        for task_id, description in result["descriptions"].items():
+            task = found.get(task_id)
+            if task is not None and task["description"] != description:
+                stale += 1
+    if stale:
+        problems.append(f"{stale} tasks lost their last description (lost updates)")
+
+    counts = {status: 0 for status in app.STATUSES}
+    for task in tasks:
+        counts[task["status"]] += 1
+    saved_counts = app.read_task_counts()
+    if saved_counts is not None and saved_counts != counts:
+        problems.append(f"saved counters {saved_counts} do not match {counts}")
+    return problems
+
+
+def run(processes: int, operations: int, storage: str, seed: int = 1) -> tuple[int, list[str]]:
+    """Run the workers on a new tasks file; return (tasks added, problems found)."""
+    with tempfile.TemporaryDirectory() as directory:
+        tasks_file = os.path.join(directory, "tasks.json")
+        jobs = [
+            (number, tasks_file, storage, operations, seed + number)
+            for number in range(processes)
+        ]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(worker, jobs)
+
+        problems = check(tasks_file, storage, results)
+    return sum(len(result["added"]) for result in results), problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=500, help="per process")
+    parser.add_argument(
+        "--storage", default="json", choices=["json", "journal", "sqlite", "sharded"]
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{args.processes} processes x {args.operations} operations "
+        f"({args.storage} storage)..."
+    )
+    added, problems = run(args.processes, args.operations, args.storage, args.seed)
+    if problems:
+        for problem in problems:
+            print(f"[FAIL] {problem}")
+        sys.exit(1)
+    print(f"[OK] {added} tasks added, no lost update, every id unique.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Behavior tests for archive: archived tasks are listed and counted once.
+
+Run from the project root:
+
+    python -m pytest tests/test_archive.py
+    python tests/test_archive.py     # without pytest
+"""
+
+from helpers import cli, ids, run_tests, stats, temp_tasks
+
+
+def test_archived_tasks_are_listed_and_counted_once():
+    with temp_tasks():
+        for description in ("a", "b", "c"):
+            cli("add", description)
+        cli("mark-done", "1")
+        cli("mark-done", "2")
+        assert "Archived 2 done tasks" in cli("archive")
+
+        assert ids() == [1, 2, 3]
+        assert ids("done") == [1, 2]
+        assert ids("todo") == [3]
+        assert stats() == {"todo": 1, "in-progress": 0, "done": 2, "total": 3}
+
+        # Undoing the archive would bring the tasks back while they are
+        # still in the archive: it is refused and nothing changes
+        assert "cannot be undone" in cli("undo")
+        assert ids() == [1, 2, 3]
+        assert stats() == {"todo": 1, "in-progress": 0, "done": 2, "total": 3}
+
+        # Nothing left to archive
+        assert "no done tasks" in cli("archive")
+
+
+if __name__ == "__main__":
+    run_tests(globals())
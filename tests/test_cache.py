@@ -0,0 +1,56 @@
+"""
+Behavior tests for the parsed-state cache and the streamed list.
+
+Run from the project root:
+
+    python -m pytest tests/test_cache.py
+    python tests/test_cache.py     # without pytest
+"""
+
+import os
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import cache
+from helpers import cli, ids, run_tests, temp_tasks
+
+
+def test_warm_cache_is_reused_until_the_file_changes():
+    with temp_tasks():
+        cli("add", "a")
+        cli("add", "b")
+        assert os.path.exists(cache.cache_path(app.TASKS_FILE))
+        assert ids() == [1, 2]
+
+        # Edited by hand: the cache no longer matches and is not used
+        with open(app.TASKS_FILE, encoding="utf-8") as f:
+            text = f.read()
+        with open(app.TASKS_FILE, "w", encoding="utf-8") as f:
+            f.write(text.replace('"b"', '"b, edited"'))
+        tasks = app.list_tasks_by_status(app.load_tasks(), "all")
+        assert [task["description"] for task in tasks] == ["a", "b, edited"]
+
+
+def test_list_page_streams_past_the_cache_limit():
+    with temp_tasks():
+        for number in range(30):
+            cli("add", f"task {number}")
+        assert os.path.exists(cache.cache_path(app.TASKS_FILE))
+
+        def no_load(*args, **kwargs):
+            raise AssertionError("load_tasks() was called")
+
+        saved = app.CACHED_PAGE_MAX_BYTES, app.load_tasks
+        app.CACHED_PAGE_MAX_BYTES = 0
+        app.load_tasks = no_load
+        try:
+            assert ids("--limit", "10") == list(range(1, 11))
+            assert ids("--offset", "25", "--limit", "10") == list(range(26, 31))
+        finally:
+            app.CACHED_PAGE_MAX_BYTES, app.load_tasks = saved
+
+        # The whole list (no --limit) still comes from the cache
+        assert ids() == list(range(1, 31))
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,49 @@
+"""
+Concurrency test: a small run of tests/stress_concurrency.py for every
+storage mode (several processes adding and changing tasks in one file).
+
+Run from the project root:
+
+    python -m pytest tests/test_concurrency.py
+    python tests/test_concurrency.py     # without pytest
+"""
+
+from task_tracker_cli import locking
+from helpers import run_tests, temp_tasks
+from stress_concurrency import run
+
+
+def check_storage(storage: str) -> None:
+    # check() points the CLI at the stress file: temp_tasks() restores it
+    with temp_tasks():
+        added, problems = run(processes=4, operations=40, storage=storage)
+    assert added
+    assert problems == []
+
+
+def test_json_storage_loses_no_update():
+    if locking.fcntl is None:
+        return
+    check_storage("json")
+
+
+def test_journal_storage_loses_no_update():
+    if locking.fcntl is None:
+        return
+    check_storage("journal")
+
+
+def test_sqlite_storage_loses_no_update():
+    if locking.fcntl is None:
+        return
+    check_storage("sqlite")
+
+
+def test_sharded_storage_loses_no_update():
+    if locking.fcntl is None:
+        return
+    check_storage("sharded")
+
+
+if __name__ == "__main__":
+    run_tests(globals())
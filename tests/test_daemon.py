@@ -0,0 +1,114 @@
+"""
+Behavior tests for 'task-cli serve': forwarding and the stale-socket fallback.
+
+The daemon runs in a separate process, like it does for real; the commands
+are forwarded the way main() does it.
+
+Run from the project root:
+
+    python -m pytest tests/test_daemon.py
+    python tests/test_daemon.py     # without pytest
+"""
+
+import contextlib
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import task_tracker_cli
+import task_tracker_cli.cli as app
+from task_tracker_cli import daemon
+from helpers import cli, ids, run_tests, temp_tasks
+
+# Runs 'task-cli ARGS...' the way the installed entry point does
+ENTRY = "import sys; from task_tracker_cli.cli import main; sys.argv[0] = 'task-cli'; main()"
+
+
+@contextlib.contextmanager
+def running_daemon(directory: str):
+    """Run 'task-cli serve' for directory/tasks.json; stop it with SIGTERM on exit."""
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(task_tracker_cli.__file__)))
+    env = dict(os.environ, PYTHONPATH=package_root)
+    env.pop("TASK_CLI_STORAGE", None)
+    process = subprocess.Popen(
+        [sys.executable, "-c", ENTRY, "serve"],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    path = daemon.socket_path(app.TASKS_FILE)
+    try:
+        deadline = time.monotonic() + 10
+        while not daemon._is_listening(path):
+            assert process.poll() is None, "the daemon exited"
+            assert time.monotonic() < deadline, "the daemon did not start"
+            time.sleep(0.02)
+        yield process
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(10)
+
+
+def forwarded(*argv: str) -> str | None:
+    """Run 'task-cli ARGV...' through the daemon; return its output, or None if not forwarded."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        if not app._forward_to_daemon(list(argv)):
+            return None
+    return out.getvalue()
+
+
+def test_commands_are_forwarded_to_the_daemon():
+    if not daemon.is_supported():
+        return
+    with temp_tasks() as directory:
+        cli("add", "first")
+
+        with running_daemon(directory) as process:
+            assert "second" in forwarded("add", "second")
+            assert forwarded("mark-done", "1") is not None
+            assert forwarded("list", "done", "--format", "ids").split() == ["1"]
+            # Commands that need the terminal or the files run locally
+            assert forwarded("serve") is None
+
+            # Saved by the daemon
+            assert ids() == [1, 2]
+            assert ids("done") == [1]
+
+            # Written without the daemon: it reloads before the next command
+            cli("add", "third")
+            assert forwarded("list", "--format", "ids").split() == ["1", "2", "3"]
+
+        # SIGTERM stops it cleanly and removes the socket
+        assert process.returncode == 0
+        assert not os.path.exists(daemon.socket_path(app.TASKS_FILE))
+        assert forwarded("list") is None
+
+
+def test_stale_socket_falls_back_to_the_file():
+    if not daemon.is_supported():
+        return
+    with temp_tasks() as directory:
+        cli("add", "first")
+
+        # Socket file left behind by a daemon that was killed
+        path = daemon.socket_path(app.TASKS_FILE)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+        assert os.path.exists(path)
+
+        assert daemon.forward(path, ["list"]) is None
+        assert forwarded("add", "second") is None
+        assert ids() == [1]
+
+        # A new daemon replaces the stale socket
+        with running_daemon(directory):
+            assert forwarded("list", "--format", "ids").split() == ["1"]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
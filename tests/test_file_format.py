@@ -0,0 +1,99 @@
+"""
+Behavior tests for the file layouts (TASK_CLI_FORMAT) and skipped saves.
+
+Run from the project root:
+
+    python -m pytest tests/test_file_format.py
+    python tests/test_file_format.py     # without pytest
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import task_tracker_cli.cli as app
+from helpers import cli, ids, run_tests, temp_tasks
+
+
+@contextlib.contextmanager
+def file_format(value):
+    saved = app.FILE_FORMAT
+    app.FILE_FORMAT = value
+    try:
+        yield
+    finally:
+        app.FILE_FORMAT = saved
+
+
+def main(*argv: str) -> tuple[int, str]:
+    """Run 'task-cli ARGV...' through main(); return (exit status, output)."""
+    saved = sys.argv
+    sys.argv = ["task-cli", *argv]
+    out = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(out):
+            app.main()
+        return 0, out.getvalue()
+    except SystemExit as error:
+        return error.code, out.getvalue()
+    finally:
+        sys.argv = saved
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_layout_is_kept_unless_asked_for():
+    with temp_tasks():
+        with file_format("lines"):
+            cli("add", "a")
+            cli("add", "b")
+        lines = read(app.TASKS_FILE)
+        assert lines.count("\n") == 4  # header, two tasks, closing bracket
+
+        # Later saves keep the detected layout
+        cli("mark-done", "1")
+        assert read(app.TASKS_FILE).count("\n") == 4
+        with file_format("pretty"):
+            cli("mark-done", "2")
+        assert read(app.TASKS_FILE).startswith('{\n  "')
+        assert ids("done") == [1, 2]
+
+
+def test_no_op_commands_do_not_rewrite_the_file():
+    with temp_tasks():
+        cli("add", "a")
+        cli("mark-done", "1")
+        before = os.stat(app.TASKS_FILE).st_mtime_ns
+        cli("mark-done", "1")
+        cli("list")
+        assert os.stat(app.TASKS_FILE).st_mtime_ns == before
+
+
+def test_unknown_format_is_rejected():
+    with temp_tasks():
+        with file_format("lines"):
+            cli("add", "a")
+        before = read(app.TASKS_FILE)
+        with file_format("line"):
+            status, output = main("add", "b")
+            assert status == 1
+            assert "TASK_CLI_FORMAT must be one of pretty, compact, lines" in output
+            # Library saves check it too
+            data = app.load_tasks()
+            app.add_task(data, "c")
+            try:
+                app.save_tasks(data)
+            except app.SettingsError:
+                pass
+            else:
+                raise AssertionError("save_tasks() accepted an unknown layout")
+            app.close_tasks(data)
+        assert read(app.TASKS_FILE) == before
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,85 @@
+"""
+Behavior tests for the history: undo and list --as-of.
+
+Run from the project root:
+
+    python -m pytest tests/test_history.py
+    python tests/test_history.py     # without pytest
+"""
+
+import json
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import history, timestamps
+from helpers import cli, clock, ids, run_tests, temp_tasks, write_file
+
+
+def test_undo_reverts_one_save_at_a_time():
+    with temp_tasks() as directory:
+        cli("add", "first")
+        cli("add", "second")
+        cli("update", "1", "first, edited")
+        cli("mark-done", "2")
+        cli("delete", "1")
+
+        cli("undo")  # delete 1
+        assert ids() == [1, 2]
+        assert json.loads(cli("list", "--format", "json"))[0]["description"] == "first, edited"
+        cli("undo")  # mark-done 2
+        assert ids("done") == []
+        cli("undo")  # update 1
+        assert json.loads(cli("list", "--format", "json"))[0]["description"] == "first"
+
+        # A whole batch is one save, so one undo
+        commands = write_file(directory, "commands.txt", 'add "x"\nadd "y"\nmark-done 1\n')
+        cli("batch", commands)
+        assert ids() == [1, 2, 3, 4]
+        cli("undo")
+        assert ids() == [1, 2]
+        assert ids("done") == []
+
+
+def test_undo_counts_only_the_tasks_it_reverts():
+    with temp_tasks() as directory:
+        cli("batch", write_file(directory, "commands.txt", 'add "x"\nadd "y"\n'))
+
+        # Task 2 goes away without a history event (as if edited by hand)
+        record = history.record
+        history.record = lambda *args, **kwargs: None
+        try:
+            cli("delete", "2")
+        finally:
+            history.record = record
+
+        data = app.load_tasks()
+        assert app.undo_last_change(data)["changes"] == 1
+        app.save_tasks(data)
+        assert ids() == []
+
+
+def test_list_as_of_rebuilds_past_states():
+    with temp_tasks():
+        start = 1_700_000_000
+        with clock(start):
+            cli("add", "a")
+            cli("add", "b")
+        with clock(start + 3600):
+            cli("mark-done", "1")
+            cli("delete", "2")
+        with clock(start + 7200):
+            cli("add", "c")
+
+        def as_of(moment: int, *argv: str) -> list[int]:
+            date = timestamps.display(moment)
+            return ids(*argv, "--as-of", date)
+
+        assert as_of(start + 60) == [1, 2]
+        assert as_of(start + 60, "done") == []
+        assert as_of(start + 3600) == [1]
+        assert as_of(start + 3600, "done") == [1]
+        assert as_of(start + 7200) == [1, 3]
+        assert ids() == [1, 3]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
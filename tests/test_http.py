@@ -0,0 +1,137 @@
+"""
+Behavior tests for 'task-cli http': the endpoints and their errors.
+
+The server runs in a separate process, like it does for real.
+
+Run from the project root:
+
+    python -m pytest tests/test_http.py
+    python tests/test_http.py     # without pytest
+"""
+
+import contextlib
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import task_tracker_cli
+from task_tracker_cli import http_api
+from helpers import cli, ids, run_tests, temp_tasks
+
+# Runs 'task-cli ARGS...' the way the installed entry point does
+ENTRY = "import sys; from task_tracker_cli.cli import main; sys.argv[0] = 'task-cli'; main()"
+
+
+@contextlib.contextmanager
+def running_server(directory: str):
+    """Run 'task-cli http --port 0' for directory/tasks.json; yield a connection to it."""
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(task_tracker_cli.__file__)))
+    env = dict(os.environ, PYTHONPATH=package_root)
+    env.pop("TASK_CLI_STORAGE", None)
+    process = subprocess.Popen(
+        [sys.executable, "-c", ENTRY, "http", "--port", "0"],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        # "Serving tasks.json on http://127.0.0.1:PORT (Ctrl+C to stop)"
+        line = process.stdout.readline()
+        assert "http://" in line, f"the server did not start: {line!r}"
+        port = int(line.split("http://")[1].split()[0].rsplit(":", 1)[1])
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            yield connection
+        finally:
+            connection.close()
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(10)
+        process.stdout.close()
+    assert process.returncode == 0
+
+
+def call(connection, method: str, path: str, body=None) -> tuple[int, object]:
+    """Send one request; return (HTTP status, decoded JSON answer)."""
+    content = None if body is None else json.dumps(body).encode("utf-8")
+    connection.request(method, path, body=content)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_endpoints_list_add_change_and_delete_tasks():
+    with temp_tasks() as directory:
+        cli("add", "first")
+
+        with running_server(directory) as connection:
+            status, task = call(connection, "POST", "/tasks", {"description": "  second  "})
+            assert status == 201
+            assert (task["id"], task["description"], task["status"]) == (2, "second", "todo")
+
+            status, task = call(connection, "PATCH", "/tasks/1", {"status": "done"})
+            assert (status, task["status"]) == (200, "done")
+            status, task = call(connection, "PATCH", "/tasks/2", {"description": "2nd"})
+            assert (status, task["description"]) == (200, "2nd")
+
+            status, task = call(connection, "GET", "/tasks/2")
+            assert (status, task["description"]) == (200, "2nd")
+            status, answer = call(connection, "GET", "/tasks?status=done")
+            assert [task["id"] for task in answer["tasks"]] == [1]
+            status, answer = call(connection, "GET", "/tasks?offset=1&limit=5")
+            assert [task["id"] for task in answer["tasks"]] == [2]
+            status, counts = call(connection, "GET", "/stats")
+            assert (counts["done"], counts["todo"]) == (1, 1)
+
+            status, task = call(connection, "DELETE", "/tasks/1")
+            assert (status, task["id"]) == (200, 1)
+
+        # Saved to the tasks file
+        assert ids() == [2]
+
+
+def test_errors():
+    with temp_tasks() as directory:
+        cli("add", "first")
+
+        with running_server(directory) as connection:
+            # 400: invalid input
+            assert call(connection, "POST", "/tasks", {"description": " "})[0] == 400
+            assert call(connection, "POST", "/tasks", ["not", "an", "object"])[0] == 400
+            assert call(connection, "PATCH", "/tasks/1", {"status": "finished"})[0] == 400
+            assert call(connection, "PATCH", "/tasks/1", {})[0] == 400
+            assert call(connection, "GET", "/tasks?status=finished")[0] == 400
+            assert call(connection, "GET", "/tasks?limit=-1")[0] == 400
+            connection.request("POST", "/tasks", body=b"{not json")
+            response = connection.getresponse()
+            assert response.status == 400
+            response.read()
+
+            # 404: no such task or endpoint
+            status, answer = call(connection, "GET", "/tasks/99")
+            assert status == 404
+            assert "99" in answer["error"]
+            assert call(connection, "PATCH", "/tasks/99", {"status": "done"})[0] == 404
+            assert call(connection, "DELETE", "/tasks/99")[0] == 404
+            assert call(connection, "GET", "/nothing")[0] == 404
+
+            # 405: known endpoint, wrong method
+            assert call(connection, "DELETE", "/tasks")[0] == 405
+
+            # 413: refused from the header alone, before reading the body
+            connection.putrequest("POST", "/tasks")
+            connection.putheader("Content-Length", str(http_api.MAX_BODY + 1))
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == 413
+            response.read()
+
+        # None of them changed anything
+        assert ids() == [1]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
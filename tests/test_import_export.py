@@ -0,0 +1,78 @@
+"""
+Behavior tests for import and export: validation and the CSV round trip.
+
+Run from the project root:
+
+    python -m pytest tests/test_import_export.py
+    python tests/test_import_export.py     # without pytest
+"""
+
+import csv
+import io
+import json
+import os
+
+import task_tracker_cli.cli as app
+from helpers import cli, ids, run_tests, temp_tasks, write_file
+
+
+def test_import_is_all_or_nothing():
+    with temp_tasks() as directory:
+        cli("add", "existing")
+        bad = write_file(
+            directory,
+            "bad.ndjson",
+            '{"description": "ok"}\n'
+            '{"description": "   "}\n'
+            "not json\n"
+            '{"description": "wrong", "status": "later"}\n',
+        )
+        output = cli("import", bad)
+        assert "3 invalid records" in output
+        assert "line 2: description cannot be empty" in output
+        assert "line 3: not valid JSON" in output
+        assert "line 4: invalid status 'later'" in output
+        assert ids() == [1]
+
+        good = write_file(
+            directory,
+            "good.ndjson",
+            '{"id": 99, "description": "x", "status": "done"}\n\n{"description": "y"}\n',
+        )
+        assert "Imported 2 tasks (IDs 2-3)" in cli("import", good)
+        assert ids() == [1, 2, 3]
+        assert ids("done") == [2]
+
+        # The import is one save, so one undo
+        cli("undo")
+        assert ids() == [1]
+
+
+def test_csv_export_import_round_trip():
+    with temp_tasks() as directory:
+        for description in ('say "hi", then leave', "multi\nline", "plain"):
+            cli("add", description)
+        cli("mark-in-progress", "1")
+        cli("mark-done", "3")
+        exported = os.path.join(directory, "tasks.csv")
+        assert "Exported 3 tasks" in cli("export", "--format", "csv", "--output", exported)
+
+        with open(exported, encoding="utf-8", newline="") as f:
+            text = f.read()
+        original = list(csv.DictReader(io.StringIO(text, newline="")))
+        assert list(original[0]) == app.CSV_FIELDS
+
+    # Into another tasks file: new ids after the existing ones, same content
+    with temp_tasks() as directory:
+        cli("add", "already here")
+        assert "Imported 3 tasks (IDs 2-4)" in cli("import", write_file(directory, "in.csv", text))
+
+        tasks = json.loads(cli("list", "--format", "json"))[1:]
+        fields = ["description", "status", "createdAt", "updatedAt"]
+        assert [[str(task[field]) for field in fields] for task in tasks] == [
+            [row[field] for field in fields] for row in original
+        ]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
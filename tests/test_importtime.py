@@ -0,0 +1,24 @@
+"""
+Start-up test: the checks of tests/importtime_budget.py (argv fast path,
+forbidden imports and import-time budget of the everyday commands).
+
+Run from the project root:
+
+    python -m pytest tests/test_importtime.py
+    python tests/test_importtime.py     # without pytest
+"""
+
+from helpers import run_tests
+from importtime_budget import check_fast_path, check_imports
+
+
+def test_fast_path_builds_the_argparse_arguments():
+    assert check_fast_path() == []
+
+
+def test_everyday_commands_import_little():
+    assert check_imports(runs=3) == []
+
+
+if __name__ == "__main__":
+    run_tests(globals())
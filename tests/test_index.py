@@ -0,0 +1,44 @@
+"""
+Behavior tests for the id index: update, delete and mark-* after deletes
+(in one batch and across separate commands).
+
+Run from the project root:
+
+    python -m pytest tests/test_index.py
+    python tests/test_index.py     # without pytest
+"""
+
+import json
+
+from helpers import cli, ids, run_tests, stats, temp_tasks, write_file
+
+
+def test_index_follows_deletes_and_updates():
+    with temp_tasks() as directory:
+        # One batch: every line works on the same loaded tasks (and index)
+        commands = write_file(
+            directory,
+            "commands.txt",
+            'add "a"\nadd "b"\nadd "c"\ndelete 2\nupdate 2 "x"\n'
+            'update 3 "c2"\nmark-done 3\nadd "d"\n',
+        )
+        results = [json.loads(line) for line in cli("batch", commands).splitlines()]
+        assert [result["ok"] for result in results] == [
+            True, True, True, True, False, True, True, True,
+        ]
+        assert results[-1]["task"]["id"] == 4
+
+        # Separate commands: each one loads the saved file (or its cache)
+        assert ids() == [1, 3, 4]
+        assert ids("done") == [3]
+        assert "not found" in cli("mark-done", "2")
+        cli("delete", "1")
+        cli("update", "4", "d2")
+        assert ids() == [3, 4]
+        assert ids("todo") == [4]
+        assert json.loads(cli("add", "e", "--format", "json"))["id"] == 5
+        assert stats() == {"todo": 2, "in-progress": 0, "done": 1, "total": 3}
+
+
+if __name__ == "__main__":
+    run_tests(globals())
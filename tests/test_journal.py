@@ -0,0 +1,102 @@
+"""
+Behavior tests for the journal storage: replay and compaction.
+
+Run from the project root:
+
+    python -m pytest tests/test_journal.py
+    python tests/test_journal.py     # without pytest
+"""
+
+import json
+import os
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import journal
+from helpers import cli, ids, run_tests, stats, temp_tasks
+
+
+def snapshot_ids() -> list[int]:
+    """Return the ids stored in the tasks file itself (without the journal)."""
+    if not os.path.exists(app.TASKS_FILE):
+        return []
+    with open(app.TASKS_FILE, encoding="utf-8") as f:
+        return [task["id"] for task in json.load(f)["tasks"]]
+
+
+def test_changes_are_appended_and_replayed():
+    with temp_tasks("journal"):
+        cli("add", "a")
+        cli("add", "b")
+        cli("add", "c")
+        cli("update", "1", "a, edited")
+        cli("mark-done", "3")
+        cli("delete", "2")
+
+        # Nothing was written to the tasks file: every change is in the journal
+        assert snapshot_ids() == []
+        assert os.path.exists(journal.journal_path(app.TASKS_FILE))
+
+        # Replayed on top of the snapshot (without the cache, to be sure)
+        app.USE_CACHE = False
+        assert ids() == [1, 3]
+        assert ids("done") == [3]
+        tasks = app.list_tasks_by_status(app.load_tasks(), "all")
+        assert tasks[0]["description"] == "a, edited"
+        # 'stats' reads the counters of the last journal record
+        assert stats()["done"] == 1
+        assert stats()["todo"] == 1
+
+
+def test_torn_last_record_is_ignored():
+    with temp_tasks("journal"):
+        cli("add", "a")
+        cli("add", "b")
+        # An append interrupted halfway
+        with open(journal.journal_path(app.TASKS_FILE), "a", encoding="utf-8") as f:
+            f.write('{"op":"add","task":{"id":3,"desc')
+
+        app.USE_CACHE = False
+        assert ids() == [1, 2]
+
+
+def test_deleted_task_added_back_keeps_id_order():
+    with temp_tasks("journal"):
+        for name in ("a", "b", "c"):
+            cli("add", name)
+        cli("delete", "2")
+        cli("undo")
+
+        app.USE_CACHE = False
+        assert ids() == [1, 2, 3]
+
+
+def test_journal_is_folded_into_the_snapshot_past_the_threshold():
+    with temp_tasks("journal"):
+        saved = app.JOURNAL_COMPACT_BYTES
+        app.JOURNAL_COMPACT_BYTES = 400
+        try:
+            for number in range(10):
+                cli("add", f"task {number}")
+                path = journal.journal_path(app.TASKS_FILE)
+                # Never much larger than the threshold (one batch past it at most)
+                assert journal.journal_size(path) < 400 + 300
+        finally:
+            app.JOURNAL_COMPACT_BYTES = saved
+
+        # Some saves compacted: the snapshot holds the tasks they had seen
+        assert len(snapshot_ids()) > 1
+        app.USE_CACHE = False
+        assert ids() == list(range(1, 11))
+
+        # A save that compacts leaves no journal behind
+        app.JOURNAL_COMPACT_BYTES = 0
+        try:
+            cli("add", "last")
+        finally:
+            app.JOURNAL_COMPACT_BYTES = saved
+        assert not os.path.exists(journal.journal_path(app.TASKS_FILE))
+        assert snapshot_ids() == list(range(1, 12))
+
+
+if __name__ == "__main__":
+    run_tests(globals())
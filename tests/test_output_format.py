@@ -0,0 +1,97 @@
+"""
+Behavior tests for --format (json, ndjson, csv, ids) on list and the
+single-task commands.
+
+Run from the project root:
+
+    python -m pytest tests/test_output_format.py
+    python tests/test_output_format.py     # without pytest
+"""
+
+import csv
+import io
+import json
+
+import task_tracker_cli.cli as app
+from helpers import cli, clock, run_tests, temp_tasks
+
+MOMENT = 1_700_000_000
+
+
+def add_tasks() -> None:
+    """Add three tasks (one done) at MOMENT, with descriptions csv and json must escape."""
+    with clock(MOMENT):
+        cli("add", "plain")
+        cli("add", 'with "quotes", commas\nand a newline')
+        cli("add", "ünïcödé ✓")
+        cli("mark-done", "2")
+
+
+def test_list_formats():
+    with temp_tasks():
+        add_tasks()
+
+        tasks = json.loads(cli("list", "--format", "json"))
+        assert [task["id"] for task in tasks] == [1, 2, 3]
+        assert tasks[1]["description"] == 'with "quotes", commas\nand a newline'
+        assert tasks[2]["description"] == "ünïcödé ✓"
+        # Raw stored values, not the table's local-time strings
+        assert tasks[0]["createdAt"] == MOMENT
+        assert set(tasks[0]) == set(app.CSV_FIELDS)
+
+        lines = cli("list", "--format", "ndjson").splitlines()
+        assert [json.loads(line) for line in lines] == tasks
+
+        rows = list(csv.reader(io.StringIO(cli("list", "--format", "csv"))))
+        assert rows[0] == app.CSV_FIELDS
+        assert rows[2] == ["2", tasks[1]["description"], "done", str(MOMENT), str(MOMENT)]
+        assert len(rows) == 4
+
+        assert cli("list", "--format", "ids") == "1\n2\n3\n"
+        assert cli("list", "done", "--format", "ids") == "2\n"
+
+        # Nothing to list: still valid output, and no message
+        assert json.loads(cli("list", "in-progress", "--format", "json")) == []
+        assert cli("list", "in-progress", "--format", "ndjson") == ""
+        assert cli("list", "in-progress", "--format", "ids") == ""
+        assert cli("list", "in-progress", "--format", "csv") == ",".join(app.CSV_FIELDS) + "\n"
+
+
+def test_single_task_formats():
+    with temp_tasks():
+        add_tasks()
+
+        # json and ndjson: one object, not a list of one
+        task = json.loads(cli("add", "new", "--format", "json"))
+        assert (task["id"], task["description"], task["status"]) == (4, "new", "todo")
+        task = json.loads(cli("update", "4", "newer", "--format", "ndjson"))
+        assert (task["id"], task["description"]) == (4, "newer")
+        task = json.loads(cli("mark-in-progress", "4", "--format", "json"))
+        assert task["status"] == "in-progress"
+
+        rows = list(csv.reader(io.StringIO(cli("mark-done", "4", "--format", "csv"))))
+        assert rows[0] == app.CSV_FIELDS
+        assert rows[1][:3] == ["4", "newer", "done"]
+
+        # delete prints the task it removed
+        assert cli("delete", "4", "--format", "ids") == "4\n"
+        assert cli("list", "--format", "ids") == "1\n2\n3\n"
+
+
+def test_bulk_command_formats():
+    with temp_tasks():
+        add_tasks()
+
+        # Several ids: the ids that changed, or the summary as one object
+        assert cli("mark-in-progress", "1", "3", "--format", "ids") == "1\n3\n"
+        summary = json.loads(cli("mark-done", "1", "2", "3", "9", "--format", "json"))
+        assert summary == {"marked done": 2, "already done": 1, "not found": 1}
+        summary = json.loads(cli("mark-done", "1-3", "--format", "ndjson"))
+        assert summary == {"marked done": 0, "already done": 3, "not found": 0}
+        rows = list(csv.reader(io.StringIO(cli("delete", "1-2", "--format", "csv"))))
+        assert rows == [["deleted", "not found"], ["2", "0"]]
+        assert cli("list", "--format", "ids") == "3\n"
+
+
+if __name__ == "__main__":
+    run_tests(globals())
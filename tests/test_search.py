@@ -0,0 +1,33 @@
+"""
+Behavior tests for search: the on-disk index follows updates and deletes.
+
+Run from the project root:
+
+    python -m pytest tests/test_search.py
+    python tests/test_search.py     # without pytest
+"""
+
+import task_tracker_cli.cli as app
+from helpers import cli, run_tests, temp_tasks
+
+
+def test_search_follows_updates_and_deletes():
+    with temp_tasks():
+        cli("add", "buy milk")
+        cli("add", "buy bread")
+        cli("add", "review the milk order")
+        assert [task["id"] for task in app.search_tasks(["milk"])] == [1, 3]
+
+        # The index is built by now: later commands must keep it up to date
+        cli("update", "1", "walk the dog")
+        cli("delete", "3")
+        cli("mark-done", "2")
+        assert app.search_tasks(["milk"]) == []
+        assert [task["id"] for task in app.search_tasks(["walk", "dog"])] == [1]
+        assert [task["id"] for task in app.search_tasks(["buy"], "done")] == [2]
+        assert app.search_tasks(["buy"], "todo") == []
+        assert [task["id"] for task in app.search_tasks(["wa*"])] == [1]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
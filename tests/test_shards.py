@@ -0,0 +1,68 @@
+"""
+Behavior tests for the sharded storage mode (TASK_CLI_STORAGE=sharded).
+
+Run from the project root:
+
+    python -m pytest tests/test_shards.py
+    python tests/test_shards.py     # without pytest
+"""
+
+import os
+
+import task_tracker_cli.cli as app
+from task_tracker_cli import fileio, shards
+from helpers import cli, ids, run_tests, stats, temp_tasks
+
+
+def test_migrate_keeps_tasks_ids_and_counts():
+    with temp_tasks() as directory:
+        for number in range(10):
+            cli("add", f"task {number}")
+        cli("mark-done", "1", "5", "9")
+        cli("mark-in-progress", "2")
+        cli("delete", "10")
+        before = (ids(), ids("done"), ids("in-progress"), stats())
+
+        # Small shards, so the tasks span several files
+        saved = shards.SHARD_SIZE
+        shards.SHARD_SIZE = 4
+        try:
+            assert "Migrated 9 tasks" in cli("migrate", "--to", "sharded")
+        finally:
+            shards.SHARD_SIZE = saved
+        path = shards.shards_path(os.path.join(directory, "tasks.json"))
+        assert sorted(os.listdir(path)) == [
+            "manifest.json",
+            "shard-000000.json",
+            "shard-000001.json",
+            "shard-000002.json",
+        ]
+
+        app.STORAGE = "sharded"
+        assert (ids(), ids("done"), ids("in-progress"), stats()) == before
+
+        # New ids continue after the deleted one, like in the JSON file
+        cli("add", "last")
+        assert ids() == [1, 2, 3, 4, 5, 6, 7, 8, 9, 11]
+
+        # A change rewrites its shard and the manifest, nothing else
+        written = []
+        replace_file = fileio.replace_file
+
+        def record(name: str, content: bytes) -> None:
+            # The history next to the tasks file is written through fileio too
+            if os.path.dirname(name) == path:
+                written.append(os.path.basename(name))
+            replace_file(name, content)
+
+        fileio.replace_file = record
+        try:
+            cli("mark-done", "6")
+        finally:
+            fileio.replace_file = replace_file
+        assert sorted(written) == ["manifest.json", "shard-000001.json"]
+        assert stats()["done"] == 4
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,65 @@
+"""
+Behavior tests for the SQLite storage mode and the storage setting.
+
+Run from the project root:
+
+    python -m pytest tests/test_sqlite.py
+    python tests/test_sqlite.py     # without pytest
+"""
+
+import os
+
+import task_tracker_cli.cli as app
+from task_tracker_cli.store import TaskStore
+from helpers import cli, ids, run_tests, stats, temp_tasks
+
+
+def test_unknown_storage_is_rejected():
+    with temp_tasks() as directory:
+        cli("add", "a")
+        saved = app.STORAGE
+        app.STORAGE = "sqlte"
+        try:
+            app._check_settings()
+        except app.SettingsError as error:
+            assert "TASK_CLI_STORAGE must be one of" in str(error)
+        else:
+            raise AssertionError("an unknown TASK_CLI_STORAGE was accepted")
+        finally:
+            app.STORAGE = saved
+
+        try:
+            TaskStore(os.path.join(directory, "tasks.json"), storage="sqlte")
+        except ValueError as error:
+            assert "'sqlte'" in str(error)
+        else:
+            raise AssertionError("TaskStore accepted an unknown storage mode")
+        assert ids() == [1]
+
+
+def test_migrate_keeps_tasks_ids_and_counts():
+    with temp_tasks() as directory:
+        for name in ("a", "b", "c", "d"):
+            cli("add", name)
+        cli("mark-done", "1")
+        cli("mark-in-progress", "3")
+        cli("delete", "4")
+        before = (ids(), ids("done"), ids("in-progress"), stats())
+
+        assert "Migrated 3 tasks" in cli("migrate", "--to", "sqlite")
+        assert os.path.exists(os.path.join(directory, "tasks.db"))
+        app.STORAGE = "sqlite"
+        assert (ids(), ids("done"), ids("in-progress"), stats()) == before
+
+        # New ids continue after the deleted one, like in the JSON file
+        cli("add", "e")
+        assert ids() == [1, 2, 3, 5]
+        assert stats()["todo"] == 2
+
+        # A second migration would mix the tasks: refused
+        app.STORAGE = "json"
+        assert "already contains tasks" in cli("migrate", "--to", "sqlite")
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,82 @@
+"""
+Behavior tests for the status buckets: list by status stays in id order
+through every kind of change, without sorting the bucket on each list.
+
+Run from the project root:
+
+    python -m pytest tests/test_status.py
+    python tests/test_status.py     # without pytest
+"""
+
+import json
+import random
+
+import task_tracker_cli.cli as app
+from helpers import run_tests, stats, temp_tasks
+
+
+def expected(data: dict, status: str) -> list[int]:
+    """The ids with 'status' found by scanning every task."""
+    return sorted(
+        task.id for task in data["tasks"] if task is not None and task.status == status
+    )
+
+
+def test_buckets_stay_ordered_through_random_changes():
+    rng = random.Random(7)
+    with temp_tasks():
+        data = app.load_tasks()
+        for number in range(300):
+            app.add_task(data, f"task {number}")
+        for _ in range(2000):
+            task_id = rng.randint(1, 320)
+            action = rng.random()
+            if action < 0.6:
+                app.set_task_status(data, task_id, rng.choice(app.STATUSES))
+            elif action < 0.75:
+                app.delete_task(data, task_id)
+            elif action < 0.9:
+                app.add_task(data, "new")
+            else:
+                # Undo of a delete puts a task back with its old id
+                app._put_task(data, {
+                    "id": task_id, "description": "back", "status": "todo",
+                    "createdAt": 1, "updatedAt": 1,
+                })
+            if rng.random() < 0.1:
+                for status in app.STATUSES:
+                    page = app.list_tasks_by_status(data, status, 3, 5)
+                    assert [task.id for task in page] == expected(data, status)[3:8]
+        for status in app.STATUSES:
+            listed = [task.id for task in app.list_tasks_by_status(data, status)]
+            assert listed == expected(data, status)
+        app.save_tasks(data)
+        app.close_tasks(data)
+
+        # A new load comes from the cache with every bucket already in order
+        data = app.load_tasks()
+        index = app._get_index(data)
+        assert None not in index.ordered.values()
+        for status in app.STATUSES:
+            assert index.ids_with_status(status) == expected(data, status)
+        app.close_tasks(data)
+
+
+def test_file_out_of_id_order_is_listed_in_order():
+    with temp_tasks():
+        tasks = [
+            {"id": task_id, "description": f"t{task_id}", "status": status,
+             "createdAt": 1, "updatedAt": 1}
+            for task_id, status in [(5, "todo"), (3, "done"), (4, "todo"), (1, "todo")]
+        ]
+        with open(app.TASKS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"last_id": 5, "tasks": tasks}, f)
+        data = app.load_tasks()
+        assert [task.id for task in app.list_tasks_by_status(data, "todo")] == [1, 4, 5]
+        assert [task.id for task in app.list_tasks_by_status(data, "done")] == [3]
+        app.close_tasks(data)
+        assert stats() == {"todo": 3, "in-progress": 0, "done": 1, "total": 4}
+
+
+if __name__ == "__main__":
+    run_tests(globals())
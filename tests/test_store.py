@@ -0,0 +1,130 @@
+"""
+Behavior tests for the library API: TaskStore, AsyncTaskStore and the
+domain functions that take a TasksSource.
+
+Run from the project root:
+
+    python -m pytest tests/test_store.py
+    python tests/test_store.py     # without pytest
+"""
+
+import asyncio
+import os
+
+import task_tracker_cli.cli as app
+from task_tracker_cli.store import AsyncTaskStore, TaskStore
+from helpers import cli, ids, run_tests, temp_tasks
+
+
+def test_source_functions_read_their_own_file():
+    with temp_tasks() as directory:
+        cli("add", "the CLI file")
+
+        # Another file, written through a TasksSource only
+        source = app.TasksSource(os.path.join(directory, "other.json"), "json")
+        data = app.load_tasks(source)
+        app.add_task(data, "buy milk")
+        app.add_task(data, "buy bread")
+        app.set_task_status(data, 2, "done")
+        app.save_tasks(data)
+        app.close_tasks(data)
+        moment = app.timestamps.now()
+
+        def descriptions(tasks):
+            return [task["description"] for task in tasks]
+
+        assert descriptions(app.iter_tasks_by_status("all", source)) == ["buy milk", "buy bread"]
+        streamed = app.stream_tasks_by_status("done", use_cache=False, source=source)
+        assert descriptions(streamed) == ["buy bread"]
+        assert app.read_task_counts(source) == {"todo": 1, "in-progress": 0, "done": 1}
+        assert descriptions(app.search_tasks(["milk"], source=source)) == ["buy milk"]
+        assert descriptions(app.list_tasks_as_of(moment, source=source)) == [
+            "buy milk", "buy bread",
+        ]
+        assert [event["op"] for event in app.task_history(2, source)] == ["add", "update"]
+
+        # The module settings still point at the CLI file
+        assert descriptions(app.iter_tasks_by_status("all")) == ["the CLI file"]
+        assert app.search_tasks(["milk"]) == []
+        assert app.task_history(2) == []
+
+
+def test_gen_fixture_output_leaves_the_cli_file_alone():
+    with temp_tasks() as directory:
+        tasks_file = app.TASKS_FILE
+        output = os.path.join(directory, "fixture.json")
+        assert "Generated 50 tasks" in cli("gen-fixture", "--count", "50", "--output", output)
+        assert app.TASKS_FILE == tasks_file
+        assert not os.path.exists(tasks_file)
+        source = app.TasksSource(output, "json")
+        assert sum(app.read_task_counts(source).values()) == 50
+
+
+
+def test_store_rejects_invalid_writes_before_changing_anything():
+    with temp_tasks():
+        store = TaskStore(app.TASKS_FILE)
+        store.add_task("  padded  ")
+        for call in (
+            lambda: store.add_task(None),
+            lambda: store.add_task("   "),
+            lambda: store.update_task(1, 42),
+            lambda: store.set_task_status(1, "later"),
+            lambda: store.batch([("add_task", ("ok",)), ("delete_task", ("1",))]),
+        ):
+            try:
+                call()
+            except (ValueError, TypeError):
+                pass
+            else:
+                raise AssertionError("an invalid write was accepted")
+        assert store.list_tasks_by_status() == [store.get_task(1)]
+        assert store.get_task(1)["description"] == "padded"
+        store.close()
+
+
+def test_store_reloads_after_an_outside_write():
+    with temp_tasks():
+        store = TaskStore(app.TASKS_FILE)
+        store.add_task("from the store")
+        assert [task["id"] for task in store.list_tasks_by_status()] == [1]
+
+        # Another writer (here the CLI) changes the file behind the store
+        cli("add", "from the CLI")
+        cli("mark-done", "1")
+        assert [task["id"] for task in store.list_tasks_by_status()] == [1, 2]
+        assert store.count_tasks_by_status() == {"todo": 1, "in-progress": 0, "done": 1}
+
+        # And the store's next save builds on it instead of overwriting it
+        assert store.add_task("third")["id"] == 3
+        store.close()
+        assert ids() == [1, 2, 3]
+
+
+def test_async_store_coalesces_concurrent_adds_into_one_save():
+    with temp_tasks():
+        saves = []
+        save_tasks = app.save_tasks
+
+        def counting_save(data):
+            saves.append(len(data["_changes"]))
+            save_tasks(data)
+
+        async def add_many(count: int) -> list[dict]:
+            async with AsyncTaskStore(app.TASKS_FILE) as store:
+                return await asyncio.gather(
+                    *(store.add_task(f"Task {number}") for number in range(count))
+                )
+
+        app.save_tasks = counting_save
+        try:
+            tasks = asyncio.run(add_many(50))
+        finally:
+            app.save_tasks = save_tasks
+        assert [task["id"] for task in tasks] == list(range(1, 51))
+        assert saves == [50]
+        assert ids() == list(range(1, 51))
+
+
+if __name__ == "__main__":
+    run_tests(globals())